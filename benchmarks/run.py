@@ -0,0 +1,207 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import replace
+from pathlib import Path
+
+from benchmarks.treegen import PRESETS, generate
+
+
+ROOT = Path(__file__).resolve().parents[1]
+SPEC_PATH = ROOT / "data" / "life-os.spec.yaml"
+
+MOVE_ITEMS = 2000
+MOVE_COLLISIONS = 500
+
+
+def _context():
+    from life_os.context import Context
+
+    return Context(spec_path=SPEC_PATH, use_spec_cache=False)
+
+
+def _timed(fn, repeat: int, setup=None) -> dict:
+    samples = []
+    for _ in range(repeat):
+        state = setup() if setup else None
+        start = time.perf_counter()
+        fn(state)
+        samples.append(time.perf_counter() - start)
+    return {"median": statistics.median(samples), "min": min(samples), "repeat": repeat}
+
+
+def _move_setup(home: Path):
+    from commands._cleanup import CleanupItem
+
+    scratch = home / "bench-move"
+    shutil.rmtree(scratch, ignore_errors=True)
+    source = scratch / "source"
+    trash = scratch / "trash"
+    source.mkdir(parents=True)
+    trash.mkdir()
+    items = []
+    for index in range(MOVE_ITEMS):
+        path = source / f"item{index:05d}.bin"
+        path.write_bytes(b"")
+        items.append(CleanupItem(path=path, size=0, classification="trash"))
+    for index in range(MOVE_COLLISIONS):
+        (trash / f"item{index:05d}.bin").write_bytes(b"")
+    return items, trash
+
+
+def _init_setup():
+    home = Path(tempfile.mkdtemp(prefix="life-os-bench-init-"))
+    os.environ["HOME"] = str(home)
+    return home
+
+
+def run_suite(home: Path, repeat: int, only: str | None = None) -> dict:
+    from commands import _cleanup, _folders, _hygiene
+
+    os.environ["HOME"] = str(home)
+    benchmarks = []
+    for name, fn in _hygiene.build_hygiene_checks(_context()):
+        benchmarks.append((f"hygiene: {name}", lambda context, fn=fn: fn(context), _context))
+    for fn in (
+        _cleanup.desktop_candidates,
+        _cleanup.downloads_candidates,
+        _cleanup.caches_candidates,
+        _cleanup.large_files_candidates,
+    ):
+        benchmarks.append((f"cleanup: {fn.__name__}", fn, _context))
+    benchmarks.append(
+        (
+            "cleanup: move_to_trash",
+            lambda state: _cleanup.move_to_trash(state[0], state[1]),
+            lambda: _move_setup(home),
+        )
+    )
+
+    def init(init_home: Path) -> None:
+        context = _context()
+        for _, check in _folders.build_folder_checks(context):
+            result = check(context)
+            if result["fix"] is not None:
+                result["fix"]()
+        shutil.rmtree(init_home, ignore_errors=True)
+        os.environ["HOME"] = str(home)
+
+    benchmarks.append(("init", init, _init_setup))
+
+    results = {}
+    for name, fn, setup in benchmarks:
+        if only and only not in name:
+            continue
+        results[name] = _timed(fn, repeat, setup)
+        print(f"{name:45} {results[name]['median'] * 1000:10.2f} ms", file=sys.stderr)
+    shutil.rmtree(home / "bench-move", ignore_errors=True)
+    return results
+
+
+def compare(baseline: dict, current: dict, threshold: float, min_seconds: float) -> list[str]:
+    # Regressions above `threshold` percent; timings below `min_seconds`
+    # in both runs are noise and never flagged.
+    regressions = []
+    for name, result in current["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if before is None:
+            continue
+        old, new = before["median"], result["median"]
+        if max(old, new) < min_seconds or old <= 0:
+            continue
+        change = (new - old) / old * 100
+        if change > threshold:
+            regressions.append(f"{name}: {old * 1000:.2f} ms -> {new * 1000:.2f} ms (+{change:.1f}%)")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.run",
+        description="Time life-os checks against a generated filesystem tree",
+    )
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="small")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--files", type=int)
+    parser.add_argument("--width", type=int)
+    parser.add_argument("--depth", type=int)
+    parser.add_argument("--median-kb", type=float)
+    parser.add_argument("--sparse-ratio", type=float)
+    parser.add_argument(
+        "--tree-dir",
+        type=Path,
+        help="Where to build (or reuse) the tree; default is a temporary folder",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", help="Only run benchmarks whose name contains this")
+    parser.add_argument("--output", type=Path, help="Write results as a JSON baseline")
+    parser.add_argument("--compare", type=Path, help="Baseline JSON to compare against")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=10.0,
+        help="Percent slowdown that counts as a regression (default: 10)",
+    )
+    parser.add_argument(
+        "--min-ms",
+        type=float,
+        default=5.0,
+        help="Ignore benchmarks faster than this in both runs (default: 5)",
+    )
+    parsed = parser.parse_args()
+
+    sys.path.insert(0, str(ROOT))
+    overrides = {
+        key: value
+        for key, value in (
+            ("seed", parsed.seed),
+            ("files", parsed.files),
+            ("width", parsed.width),
+            ("depth", parsed.depth),
+            ("median_kb", parsed.median_kb),
+            ("sparse_ratio", parsed.sparse_ratio),
+        )
+        if value is not None
+    }
+    spec = replace(PRESETS[parsed.preset], **overrides)
+
+    temporary = parsed.tree_dir is None
+    home = parsed.tree_dir or Path(tempfile.mkdtemp(prefix="life-os-bench-"))
+    original_home = os.environ.get("HOME")
+    try:
+        print(f"Generating {spec.files} files under {home}", file=sys.stderr)
+        manifest = generate(home, spec)
+        current = {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "tree": manifest,
+            "results": run_suite(home, parsed.repeat, parsed.only),
+        }
+    finally:
+        if original_home is not None:
+            os.environ["HOME"] = original_home
+        if temporary:
+            shutil.rmtree(home, ignore_errors=True)
+
+    if parsed.output:
+        parsed.output.write_text(json.dumps(current, indent=2) + "\n", encoding="utf-8")
+
+    if parsed.compare:
+        baseline = json.loads(parsed.compare.read_text(encoding="utf-8"))
+        if baseline.get("tree", {}).get("spec") != current["tree"]["spec"]:
+            print("warning: baseline was recorded on a different tree", file=sys.stderr)
+        regressions = compare(baseline, current, parsed.threshold, parsed.min_ms / 1000)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
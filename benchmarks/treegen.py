@@ -0,0 +1,118 @@
+import json
+import math
+import os
+import random
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+
+MANIFEST = ".life-os-bench.json"
+
+# Where files land in the fake home, with relative weights.
+ROOT_WEIGHTS = {
+    "Downloads": 4,
+    "Desktop": 1,
+    "Library/Caches": 4,
+    "System/temp": 1,
+}
+
+EXTENSIONS = [".txt", ".pdf", ".jpg", ".png", ".json", ".py", ".mp4", ".zip", ".dmg", ".pkg"]
+
+
+@dataclass(frozen=True)
+class TreeSpec:
+    seed: int = 1
+    files: int = 10_000
+    width: int = 8
+    depth: int = 3
+    # File sizes are log-normal around `median_kb`; `large_ratio` of the
+    # files are instead 300 MB - 2 GB, which is what the large-file checks
+    # look for.
+    median_kb: float = 32.0
+    sigma: float = 1.5
+    large_ratio: float = 0.001
+    # Sparse files get their size from ftruncate and take no disk space.
+    # Large files are always sparse.
+    sparse_ratio: float = 0.9
+    max_age_days: int = 60
+
+
+PRESETS = {
+    "tiny": TreeSpec(files=500, width=4, depth=2),
+    "small": TreeSpec(files=10_000),
+    "medium": TreeSpec(files=200_000, width=12, depth=4),
+    "large": TreeSpec(files=2_000_000, width=16, depth=5),
+}
+
+
+def _directories(rng: random.Random, spec: TreeSpec) -> dict[str, list[str]]:
+    # Every root gets a tree `depth` levels deep whose folders have between
+    # one and `width` children.
+    by_root = {}
+    for root in ROOT_WEIGHTS:
+        level = [root]
+        directories = [root]
+        for _ in range(spec.depth):
+            next_level = []
+            for parent in level:
+                for index in range(rng.randint(1, spec.width)):
+                    next_level.append(f"{parent}/d{index:03d}")
+            directories.extend(next_level)
+            level = next_level
+        by_root[root] = directories
+    return by_root
+
+
+def _size(rng: random.Random, spec: TreeSpec) -> int:
+    if rng.random() < spec.large_ratio:
+        return rng.randint(300, 2048) * 1024 * 1024
+    return int(rng.lognormvariate(math.log(spec.median_kb * 1024), spec.sigma))
+
+
+def generate(root: Path, spec: TreeSpec) -> dict:
+    # Builds a fake home under `root` (reused as is when it was generated
+    # from the same spec) and returns its manifest.
+    root = Path(root)
+    manifest_path = root / MANIFEST
+    try:
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        if manifest.get("spec") == asdict(spec):
+            return manifest
+    except (OSError, ValueError):
+        pass
+
+    rng = random.Random(spec.seed)
+    by_root = _directories(rng, spec)
+    roots = list(ROOT_WEIGHTS)
+    weights = [ROOT_WEIGHTS[name] for name in roots]
+
+    root.mkdir(parents=True, exist_ok=True)
+    for directories in by_root.values():
+        for directory in directories:
+            (root / directory).mkdir(parents=True, exist_ok=True)
+
+    now = time.time()
+    total = 0
+    dense = bytes(64 * 1024)
+    for index in range(spec.files):
+        directory = rng.choice(by_root[rng.choices(roots, weights)[0]])
+        name = f"f{index:07d}{rng.choice(EXTENSIONS)}"
+        size = _size(rng, spec)
+        path = os.path.join(root, directory, name)
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            if size > len(dense) or rng.random() < spec.sparse_ratio:
+                os.ftruncate(fd, size)
+            else:
+                os.write(fd, dense[:size])
+        finally:
+            os.close(fd)
+        mtime = now - rng.random() * spec.max_age_days * 86400
+        os.utime(path, (mtime, mtime))
+        total += size
+
+    directories = sum(len(directories) for directories in by_root.values())
+    manifest = {"spec": asdict(spec), "directories": directories, "bytes": total}
+    manifest_path.write_text(json.dumps(manifest), encoding="utf-8")
+    return manifest
@@ -0,0 +1,239 @@
+import bz2
+import gzip
+import lzma
+import os
+import shutil
+import stat
+import tarfile
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+
+from commands._cleanup import CleanupItem
+
+
+# Tar format -> (tarfile write mode, reader for the compressed stream). Zip
+# is written and read by zipfile itself. Only standard-library codecs.
+TAR_FORMATS = {
+    "tar.gz": ("w:gz", gzip.open),
+    "tar.bz2": ("w:bz2", bz2.open),
+    "tar.xz": ("w:xz", lzma.open),
+}
+CHUNK = 1024 * 1024
+
+
+class ArchiveError(Exception):
+    pass
+
+
+@dataclass(frozen=True, slots=True)
+class ArchivedItem:
+    item: CleanupItem
+    archive: Path
+    archive_size: int
+
+    @property
+    def reclaimed(self) -> int:
+        # Negative when the item did not compress.
+        return self.item.size - self.archive_size
+
+
+def _write_tar(source: str, fileobj, mode: str) -> dict[str, tuple[str, int]]:
+    # Returns what went in: member name -> (type, size). tarfile copies
+    # file contents through in chunks, so nothing is held in memory.
+    manifest: dict[str, tuple[str, int]] = {}
+
+    def record(info: tarfile.TarInfo) -> tarfile.TarInfo:
+        manifest[info.name] = (info.type, info.size if info.isreg() else 0)
+        return info
+
+    with tarfile.open(fileobj=fileobj, mode=mode, bufsize=CHUNK) as tar:
+        tar.add(source, arcname=os.path.basename(source), filter=record)
+    return manifest
+
+
+def _write_zip(source: str, fileobj) -> dict[str, tuple[str, int]]:
+    manifest: dict[str, tuple[str, int]] = {}
+    base = os.path.dirname(source)
+    with zipfile.ZipFile(fileobj, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        paths = [source]
+        while paths:
+            path = paths.pop()
+            st = os.lstat(path)
+            name = os.path.relpath(path, base)
+            if stat.S_ISDIR(st.st_mode):
+                archive.write(path, name)
+                manifest[name + "/"] = (tarfile.DIRTYPE, 0)
+                with os.scandir(path) as it:
+                    paths.extend(sorted((entry.path for entry in it), reverse=True))
+            elif stat.S_ISREG(st.st_mode):
+                archive.write(path, name)
+                manifest[name] = (tarfile.REGTYPE, st.st_size)
+            else:
+                # Zip cannot hold links or special files; removing the
+                # original afterwards would lose them.
+                raise ArchiveError(f"{path}: not a regular file or folder; use a tar format")
+    return manifest
+
+
+def _read_member(stream) -> int:
+    total = 0
+    while chunk := stream.read(CHUNK):
+        total += len(chunk)
+    return total
+
+
+def _verify(path: str, fmt: str, manifest: dict[str, tuple[str, int]]) -> None:
+    # Reads the archive back in full: every member's data is decompressed
+    # (which checks the codec's CRC) and compared with what was written.
+    seen: dict[str, tuple[str, int]] = {}
+    if fmt == "zip":
+        with zipfile.ZipFile(path) as archive:
+            for info in archive.infolist():
+                if info.is_dir():
+                    seen[info.filename] = (tarfile.DIRTYPE, 0)
+                    continue
+                with archive.open(info) as member:
+                    seen[info.filename] = (tarfile.REGTYPE, _read_member(member))
+    else:
+        with TAR_FORMATS[fmt][1](path, "rb") as raw:
+            with tarfile.open(fileobj=raw, mode="r|") as tar:
+                for info in tar:
+                    size = 0
+                    if info.isreg():
+                        size = _read_member(tar.extractfile(info))
+                    seen[info.name] = (info.type, size)
+            # Drain the trailer so the codec checks its checksum.
+            _read_member(raw)
+    if seen != manifest:
+        missing = sorted(set(manifest) - set(seen))
+        changed = sorted(name for name in manifest if name in seen and seen[name] != manifest[name])
+        raise ArchiveError(f"archive check failed: missing {missing[:3]}, changed {changed[:3]}")
+
+
+def _snapshot(source: str) -> dict[str, tuple[int, int, int]]:
+    # Relative path -> (file type, size, mtime_ns) for everything under
+    # `source`, without following links. Taken before compressing and again
+    # before removing; any difference means the original changed meanwhile.
+    snapshot: dict[str, tuple[int, int, int]] = {}
+    paths = [source]
+    while paths:
+        path = paths.pop()
+        st = os.lstat(path)
+        kind = stat.S_IFMT(st.st_mode)
+        size = st.st_size if stat.S_ISREG(st.st_mode) else 0
+        snapshot[os.path.relpath(path, source)] = (kind, size, st.st_mtime_ns)
+        if stat.S_ISDIR(st.st_mode):
+            with os.scandir(path) as it:
+                paths.extend(entry.path for entry in it)
+    return snapshot
+
+
+def archive_one(source: str, target: str, fmt: str) -> tuple[int, dict]:
+    # Runs in a worker process. Writes `target` via a ".partial" file that is
+    # only renamed once it has been read back; returns the archive's size and
+    # a snapshot of `source` taken before anything was read.
+    partial = target + ".partial"
+    before = _snapshot(source)
+    try:
+        with open(partial, "wb") as fileobj:
+            if fmt == "zip":
+                manifest = _write_zip(source, fileobj)
+            else:
+                manifest = _write_tar(source, fileobj, TAR_FORMATS[fmt][0])
+            fileobj.flush()
+            os.fsync(fileobj.fileno())
+        _verify(partial, fmt, manifest)
+        os.rename(partial, target)
+    except BaseException:
+        try:
+            os.unlink(partial)
+        except OSError:
+            pass
+        raise
+    return os.path.getsize(target), before
+
+
+def _targets(items: list[CleanupItem], archive_dir: Path, fmt: str) -> list[Path]:
+    # "name.<fmt>", or "name.<timestamp>.<n>.<fmt>" when that is taken.
+    try:
+        taken = set(os.listdir(archive_dir))
+    except OSError:
+        taken = set()
+    timestamp = int(time.time())
+    targets = []
+    for item in items:
+        name = f"{item.path.name}.{fmt}"
+        counter = 1
+        while name in taken or f"{name}.partial" in taken:
+            name = f"{item.path.name}.{timestamp}.{counter}.{fmt}"
+            counter += 1
+        taken.add(name)
+        targets.append(archive_dir / name)
+    return targets
+
+
+def _remove(path: Path) -> None:
+    if path.is_dir() and not path.is_symlink():
+        shutil.rmtree(path)
+    else:
+        path.unlink()
+
+
+def archive_items(
+    items: list[CleanupItem],
+    archive_dir: Path,
+    fmt: str = "tar.gz",
+    jobs: int = 4,
+    max_in_flight: int = 1024 * 1024 * 1024,
+    dry_run: bool = False,
+) -> tuple[list[ArchivedItem], list[tuple[Path, str]]]:
+    # Compresses each item into its own archive on a process pool, keeping
+    # at most `max_in_flight` bytes of originals being compressed at once (a
+    # bigger item runs alone). Originals are removed only after their
+    # archive has been verified and the original walked again unchanged.
+    # Returns (archived, failed with reasons).
+    if dry_run or not items:
+        return [], []
+    # An item inside another selected item goes into that item's archive.
+    selected = {item.path for item in items}
+    items = [item for item in items if not any(parent in selected for parent in item.path.parents)]
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    pending = deque(zip(items, _targets(items, archive_dir, fmt)))
+    archived: list[ArchivedItem] = []
+    failed: list[tuple[Path, str]] = []
+    running = {}
+    in_flight = 0
+
+    with ProcessPoolExecutor(max_workers=max(jobs, 1)) as pool:
+        while pending or running:
+            while pending and (not running or in_flight + pending[0][0].size <= max_in_flight):
+                item, target = pending.popleft()
+                future = pool.submit(archive_one, os.fspath(item.path), os.fspath(target), fmt)
+                running[future] = (item, target)
+                in_flight += item.size
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                item, target = running.pop(future)
+                in_flight -= item.size
+                try:
+                    size, before = future.result()
+                except Exception as exc:
+                    # Whatever went wrong, the original has not been touched.
+                    failed.append((item.path, str(exc) or type(exc).__name__))
+                    continue
+                try:
+                    if _snapshot(os.fspath(item.path)) != before:
+                        failed.append(
+                            (item.path, f"changed while archiving to {target}; original kept")
+                        )
+                        continue
+                    _remove(item.path)
+                except OSError as exc:
+                    failed.append((item.path, f"archived to {target} but not removed: {exc}"))
+                    continue
+                archived.append(ArchivedItem(item=item, archive=target, archive_size=size))
+    return archived, failed
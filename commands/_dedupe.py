@@ -0,0 +1,172 @@
+import hashlib
+import mmap
+import os
+import stat
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from commands._cleanup import CleanupItem
+
+
+EDGE_BYTES = 4 * 1024
+
+
+@dataclass(frozen=True, slots=True)
+class DuplicateGroup:
+    size: int
+    digest: str
+    # Ordered by preference: the first path is kept, the rest are duplicates.
+    paths: tuple[Path, ...]
+
+    @property
+    def keeper(self) -> Path:
+        return self.paths[0]
+
+    @property
+    def losers(self) -> tuple[Path, ...]:
+        return self.paths[1:]
+
+    @property
+    def reclaimable(self) -> int:
+        return self.size * (len(self.paths) - 1)
+
+
+@dataclass
+class DedupeReport:
+    groups: list[DuplicateGroup] = field(default_factory=list)
+    files: int = 0
+    edge_hashed: int = 0
+    full_hashed: int = 0
+
+    @property
+    def reclaimable(self) -> int:
+        return sum(group.reclaimable for group in self.groups)
+
+
+def _collect_sizes(roots: list[Path], min_size: int) -> tuple[dict[int, list], int]:
+    # Stage one: group regular files by size. Each (st_dev, st_ino) is taken
+    # once, so hard links are not reported as reclaimable copies.
+    by_size: dict[int, list[tuple[int, str]]] = {}
+    seen: set[tuple[int, int]] = set()
+    files = 0
+    for rank, root in enumerate(roots):
+        stack = [os.fspath(root)]
+        while stack:
+            path = stack.pop()
+            try:
+                with os.scandir(path) as it:
+                    entries = list(it)
+            except OSError:
+                continue
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                        continue
+                    st = entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                if not stat.S_ISREG(st.st_mode) or st.st_size < min_size:
+                    continue
+                key = (st.st_dev, st.st_ino)
+                if key in seen:
+                    continue
+                seen.add(key)
+                files += 1
+                by_size.setdefault(st.st_size, []).append((rank, entry.path))
+    return by_size, files
+
+
+def _edge_digest(path: str, size: int, edge: int) -> str | None:
+    digest = hashlib.blake2b()
+    try:
+        with open(path, "rb") as f:
+            digest.update(f.read(edge))
+            if size > 2 * edge:
+                f.seek(size - edge)
+            digest.update(f.read(edge))
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+def _full_digest(path: str) -> str | None:
+    digest = hashlib.blake2b()
+    try:
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            digest.update(mapped)
+    except (OSError, ValueError):
+        return None
+    return digest.hexdigest()
+
+
+def _split(paths: list[tuple[int, str]], digests) -> dict[str, list[tuple[int, str]]]:
+    buckets: dict[str, list[tuple[int, str]]] = {}
+    for item, digest in zip(paths, digests):
+        if digest is not None:
+            buckets.setdefault(digest, []).append(item)
+    return {digest: bucket for digest, bucket in buckets.items() if len(bucket) > 1}
+
+
+def find_duplicates(
+    roots: list[Path],
+    min_size: int = 1,
+    edge: int = EDGE_BYTES,
+    jobs: int = 1,
+) -> DedupeReport:
+    by_size, files = _collect_sizes(roots, max(min_size, 1))
+    report = DedupeReport(files=files)
+
+    # Stage two: only files sharing a size are opened, and only their edges.
+    # A file no longer than both edges has been read whole, so its edge
+    # digest is already final.
+    final: list[tuple[int, str, list[tuple[int, str]]]] = []
+    pending: list[tuple[int, list[tuple[int, str]]]] = []
+    with ThreadPoolExecutor(max_workers=max(jobs, 1)) as pool:
+        for size, paths in by_size.items():
+            if len(paths) < 2:
+                continue
+            digests = list(pool.map(lambda item: _edge_digest(item[1], size, edge), paths))
+            report.edge_hashed += len(paths)
+            for digest, bucket in _split(paths, digests).items():
+                if size <= 2 * edge:
+                    final.append((size, digest, bucket))
+                else:
+                    pending.append((size, bucket))
+
+    # Stage three: full content hashes for what still collides.
+    flat = [item for _, bucket in pending for item in bucket]
+    if jobs > 1 and len(flat) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            digests = list(pool.map(_full_digest, [path for _, path in flat], chunksize=4))
+    else:
+        digests = [_full_digest(path) for _, path in flat]
+    report.full_hashed = len(flat)
+    offset = 0
+    for size, bucket in pending:
+        chunk = digests[offset : offset + len(bucket)]
+        offset += len(bucket)
+        final.extend((size, digest, group) for digest, group in _split(bucket, chunk).items())
+
+    for size, digest, bucket in final:
+        # Keep the copy in the earliest configured root, then the shortest path.
+        bucket.sort(key=lambda item: (item[0], len(item[1]), item[1]))
+        report.groups.append(
+            DuplicateGroup(size=size, digest=digest, paths=tuple(Path(p) for _, p in bucket))
+        )
+
+    report.groups.sort(key=lambda group: (-group.reclaimable, str(group.keeper)))
+    return report
+
+
+def dedupe_roots(context) -> list[Path]:
+    return [path for root in context.plan.dedupe.roots for path in root.paths()]
+
+
+def duplicate_items(report: DedupeReport) -> list[CleanupItem]:
+    return [
+        CleanupItem(path=path, size=group.size, classification="trash")
+        for group in report.groups
+        for path in group.losers
+    ]
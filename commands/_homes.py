@@ -0,0 +1,187 @@
+import glob
+import hashlib
+import multiprocessing
+import os
+import time
+from collections import deque
+from multiprocessing.connection import wait
+from pathlib import Path
+
+from commands._scheduler import check_timeouts, run_checks
+
+
+# Extra time the parent waits beyond the per-home limit before giving up on
+# a worker that is stuck outside the checks (e.g. loading the spec).
+_GRACE_SECONDS = 5.0
+
+
+def resolve_homes(raw: str) -> list[Path]:
+    # `raw` is a file with one home per line (# comments allowed) or a glob.
+    source = Path(raw).expanduser()
+    if source.is_file():
+        patterns = [
+            line.strip()
+            for line in source.read_text(encoding="utf-8").splitlines()
+            if line.strip() and not line.lstrip().startswith("#")
+        ]
+    else:
+        patterns = [raw]
+
+    homes: list[Path] = []
+    for pattern in patterns:
+        expanded = os.path.expanduser(pattern)
+        matches = sorted(glob.glob(expanded)) if glob.has_magic(expanded) else [expanded]
+        for match in matches:
+            path = Path(match)
+            if path.is_dir() and path not in homes:
+                homes.append(path)
+    return homes
+
+
+def doctor_home(
+    home: str,
+    spec_path: str,
+    target: str | None,
+    options: dict,
+) -> dict:
+    # Runs in a worker process: HOME points at the home being checked so
+    # every "~" in the spec (and expanduser in the checks) resolves there.
+    from commands._folders import build_folder_checks
+    from commands._hygiene import build_hygiene_checks
+    from life_os.context import Context
+
+    started = time.perf_counter()
+    os.environ["HOME"] = home
+    context = Context(spec_path=Path(spec_path), use_spec_cache=False, home=Path(home))
+    context.jobs = options.get("jobs")
+    context.budget = options.get("budget")
+    context.use_prune("hygiene")
+    index_dir = options.get("index_dir")
+    if index_dir is not None and not options.get("no_index"):
+        # The audited home is only read; its index lives with the auditor.
+        digest = hashlib.sha1(os.fsencode(home)).hexdigest()[:16]
+        context.index_path = Path(index_dir) / f"index-{digest}.sqlite"
+        context.open_index()
+    try:
+        checks = [
+            (name, fn)
+            for name, fn in build_folder_checks(context) + build_hygiene_checks(context)
+            if not target or name.lower() == target
+        ]
+        timeouts = check_timeouts(context, [name for name, _ in checks], options.get("timeout"))
+        limit = options.get("home_timeout")
+        if limit is not None:
+            # Checks share one start time, so capping each timeout caps the home.
+            timeouts = {name: min(timeouts.get(name, limit), limit) for name, _ in checks}
+        results = []
+        for name, result in run_checks(checks, context, timeouts):
+            results.append(
+                {"name": name, "ok": result["ok"], "issues": result["issues"]}
+            )
+    finally:
+        context.close()
+
+    failed = [result["name"] for result in results if not result["ok"]]
+    return {
+        "home": home,
+        "ok": not failed,
+        "checks": len(results),
+        "failed": failed,
+        "results": results,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 3),
+    }
+
+
+def _run_home(conn, home: str, spec_path: str, target: str | None, options: dict) -> None:
+    # Worker process entry point: sends ("ok", summary) or ("error", message).
+    try:
+        conn.send(("ok", doctor_home(home, spec_path, target, options)))
+    except Exception as exc:
+        conn.send(("error", f"Doctor failed: {exc}"))
+    finally:
+        conn.close()
+
+
+def _failed(home: Path, error: str) -> dict:
+    return {
+        "home": str(home),
+        "ok": False,
+        "checks": 0,
+        "failed": [],
+        "results": [],
+        "error": error,
+        "elapsed_ms": None,
+    }
+
+
+def _stop(process) -> None:
+    process.terminate()
+    process.join(1)
+    if process.is_alive():
+        process.kill()
+        process.join()
+
+
+def doctor_homes(
+    homes: list[Path],
+    spec_path: Path,
+    target: str | None,
+    options: dict,
+    workers: int,
+):
+    # Yields one summary per home, in the order given. Each home gets its own
+    # process, at most `workers` at a time, and its limit counts from when
+    # that process started. A home still running past its limit (plus a
+    # grace period) is terminated, which also ends any check threads it left.
+    limit = options.get("home_timeout")
+    mp = multiprocessing.get_context("spawn")
+    pending = deque(enumerate(homes))
+    running: dict[int, tuple[Path, object, object, float | None]] = {}
+    finished: dict[int, dict] = {}
+    next_index = 0
+    try:
+        while next_index < len(homes):
+            while pending and len(running) < max(workers, 1):
+                index, home = pending.popleft()
+                receiver, sender = mp.Pipe(duplex=False)
+                process = mp.Process(
+                    target=_run_home,
+                    args=(sender, str(home), str(spec_path), target, options),
+                    daemon=True,
+                )
+                process.start()
+                sender.close()
+                deadline = None
+                if limit is not None:
+                    deadline = time.monotonic() + limit + _GRACE_SECONDS
+                running[index] = (home, process, receiver, deadline)
+
+            deadlines = [entry[3] for entry in running.values() if entry[3] is not None]
+            timeout = max(min(deadlines) - time.monotonic(), 0) if deadlines else None
+            ready = wait([entry[2] for entry in running.values()], timeout)
+            now = time.monotonic()
+            for index, (home, process, receiver, deadline) in list(running.items()):
+                if receiver in ready:
+                    try:
+                        status, payload = receiver.recv()
+                    except EOFError:
+                        process.join()
+                        status = "error"
+                        payload = f"Doctor failed: worker exited with code {process.exitcode}"
+                    finished[index] = payload if status == "ok" else _failed(home, payload)
+                elif deadline is not None and now >= deadline:
+                    _stop(process)
+                    finished[index] = _failed(home, f"Timed out after {limit:g}s.")
+                else:
+                    continue
+                receiver.close()
+                process.join()
+                del running[index]
+
+            while next_index in finished:
+                yield finished.pop(next_index)
+                next_index += 1
+    finally:
+        for _, process, receiver, _ in running.values():
+            _stop(process)
+            receiver.close()
@@ -1,8 +1,10 @@
-import re
 import time
 from collections import defaultdict
 from pathlib import Path
 
+from life_os.plan import DAY, Root
+from life_os.scan import SizeEstimate, estimate_tree, scan_top
+
 
 def _human_bytes(value: int) -> str:
     if value < 1024:
@@ -16,68 +18,8 @@ def _human_bytes(value: int) -> str:
     return f"{size:.1f} EB"
 
 
-def _compile_allowlist(allowlist: dict) -> tuple[set[str], list[re.Pattern]]:
-    names = set(allowlist.get("names", []) or [])
-    patterns = []
-    for pattern in allowlist.get("patterns", []) or []:
-        try:
-            patterns.append(re.compile(pattern))
-        except re.error:
-            continue
-    return names, patterns
-
-
-def _is_allowed(name: str, names: set[str], patterns: list[re.Pattern]) -> bool:
-    if name in names:
-        return True
-    return any(pattern.search(name) for pattern in patterns)
-
-
-def _expand_paths(raw: str) -> list[Path]:
-    expanded = Path(raw).expanduser()
-    if "*" in raw or "?" in raw or "[" in raw:
-        return [Path(p) for p in expanded.parent.glob(expanded.name)]
-    return [expanded]
-
-
-def _item_size(path: Path) -> int:
-    if path.is_file():
-        return path.stat().st_size
-    if not path.exists():
-        return 0
-    total = 0
-    for root, _, files in path.walk():
-        root_path = Path(root)
-        for name in files:
-            try:
-                total += (root_path / name).stat().st_size
-            except OSError:
-                continue
-    return total
-
-
-def _dir_sizes(root: Path) -> dict[Path, int]:
-    sizes: dict[Path, int] = {}
-    if not root.exists():
-        return sizes
-    for current, dirs, files in root.walk(top_down=False):
-        current_path = Path(current)
-        total = 0
-        for name in files:
-            try:
-                total += (current_path / name).stat().st_size
-            except OSError:
-                continue
-        for name in dirs:
-            total += sizes.get(current_path / name, 0)
-        sizes[current_path] = total
-    return sizes
-
-
 def check_desktop_cleanliness(context) -> dict:
-    config = context.hygiene.get("desktop", {})
-    allowlist = config.get("allowlist", {})
-    allowed_names, allowed_patterns = _compile_allowlist(allowlist)
+    rules = context.plan.hygiene.desktop.rules
     path = context.desktop
 
     if not path.exists():
@@ -89,9 +31,10 @@ def check_desktop_cleanliness(context) -> dict:
         }
 
     items = [
-        item
-        for item in path.iterdir()
-        if not _is_allowed(item.name, allowed_names, allowed_patterns)
+        match.path.name
+        for match in rules.evaluate(
+            context.scan.list_dir(path), context.scan.entry_size, measure=False
+        )
     ]
 
     if not items:
@@ -99,7 +42,7 @@ def check_desktop_cleanliness(context) -> dict:
 
     issues = [f"Desktop has {len(items)} non-ignored item(s)."]
     if context.verbose:
-        issues.extend(f"{item.name}" for item in sorted(items, key=lambda p: p.name))
+        issues.extend(sorted(items))
 
     return {
         "ok": False,
@@ -110,20 +53,8 @@ def check_desktop_cleanliness(context) -> dict:
 
 
 def check_downloads_aging(context) -> dict:
-    config = context.hygiene.get("downloads", {})
-    age_days = int(config.get("age_days", 7))
-    top_n = int(config.get("top_n", 5))
-    allowlist = config.get("allowlist", {})
-    allowed_names, allowed_patterns = _compile_allowlist(allowlist)
-    groups = config.get(
-        "groups",
-        {"dmg": [".dmg"], "pkg": [".pkg"], "zip": [".zip"]},
-    )
-
-    ext_to_group = {}
-    for group, extensions in groups.items():
-        for ext in extensions or []:
-            ext_to_group[ext.lower()] = group
+    config = context.plan.hygiene.downloads
+    age_days = config.age_days
 
     path = context.downloads
     if not path.exists():
@@ -134,29 +65,18 @@ def check_downloads_aging(context) -> dict:
             "notes": ["Report-only: no files are deleted."],
         }
 
-    now = time.time()
-    cutoff = age_days * 24 * 60 * 60
-    old_items = []
-    for item in path.iterdir():
-        if _is_allowed(item.name, allowed_names, allowed_patterns):
-            continue
-        try:
-            age = now - item.stat().st_mtime
-        except OSError:
-            continue
-        if age < cutoff:
-            continue
-        ext = item.suffix.lower() if item.is_file() else ""
-        group = ext_to_group.get(ext, "other")
-        size = _item_size(item)
-        old_items.append(
-            {
-                "path": item,
-                "group": group,
-                "size": size,
-                "age_days": int(age // (24 * 60 * 60)),
-            }
+    # One pass: the rules select old items and tag each with its group.
+    old_items = [
+        {
+            "path": match.path,
+            "group": match.tags.get("group", "other"),
+            "size": match.size,
+            "age_days": int(match.age // DAY),
+        }
+        for match in config.rules.evaluate(
+            context.scan.list_dir(path), context.scan.entry_size
         )
+    ]
 
     if not old_items:
         return {"ok": True, "issues": [], "fix": None, "notes": []}
@@ -179,7 +99,7 @@ def check_downloads_aging(context) -> dict:
         )
 
     offenders = sorted(old_items, key=lambda i: i["size"], reverse=True)
-    offenders = offenders[: max(top_n, 1)]
+    offenders = offenders[: config.top_n]
 
     if context.verbose:
         for item in offenders:
@@ -198,76 +118,159 @@ def check_downloads_aging(context) -> dict:
         "issues": issues,
         "fix": None,
         "notes": ["Report-only: no files are deleted."],
+        "sizes": [
+            {
+                "path": str(item["path"]),
+                "size": item["size"],
+                "group": item["group"],
+                "age_days": item["age_days"],
+            }
+            for item in offenders
+        ],
     }
 
 
-def check_caches_reporting(context) -> dict:
-    config = context.hygiene.get("caches", {})
-    warn_over_mb = int(config.get("warn_over_mb", 0))
-    paths = config.get("paths", []) or []
+def _cache_usage(context, path: Path, root: Root, deadline: float | None, stop_over: int):
+    # Exact size through the scan session, or with a budget (doctor --budget)
+    # a time-boxed walk that stops once `stop_over` is known to be exceeded.
+    watched = None
+    if context.scan.watch is not None:
+        watched = context.scan.watch.size(path, root.one_filesystem, context.scan.prune)
+    if deadline is None or watched is not None:
+        size, allocated = context.scan.item_usage(
+            path,
+            jobs=root.workers(context.jobs),
+            one_filesystem=root.one_filesystem,
+            prune=True,
+        )
+        return SizeEstimate(size, size, size, allocated=allocated)
+    return estimate_tree(
+        path,
+        deadline,
+        stop_over=stop_over,
+        index=context.size_index,
+        one_filesystem=root.one_filesystem,
+        prune=context.scan.prune,
+    )
 
-    entries = []
-    for raw in paths:
-        for path in _expand_paths(raw):
-            if not path.exists():
-                continue
-            size = _item_size(path)
-            entries.append((path, size))
 
-    if not entries:
+def _describe_estimate(path: Path, usage: SizeEstimate) -> str:
+    if usage.exact:
+        line = f"{path}: {_human_bytes(usage.size)}"
+        if usage.allocated is not None and usage.allocated != usage.size:
+            line += f" ({_human_bytes(usage.allocated)} on disk)"
+        return line
+    if usage.stopped:
+        return f"{path}: over {_human_bytes(usage.low)} (estimate; stopped once over the limit)"
+    high = _human_bytes(usage.high) if usage.high is not None else "unknown"
+    return (
+        f"{path}: ~{_human_bytes(usage.size)} "
+        f"(estimate, 95% range {_human_bytes(usage.low)}–{high})"
+    )
+
+
+def check_caches_reporting(context) -> dict:
+    config = context.plan.hygiene.caches
+    threshold_bytes = config.warn_over
+
+    roots = [(path, root) for root in config.roots for path in root.paths() if path.exists()]
+    if not roots:
         return {"ok": True, "issues": [], "fix": None, "notes": []}
 
-    entries.sort(key=lambda item: item[1], reverse=True)
+    budget_end = None
+    if context.budget is not None:
+        budget_end = time.monotonic() + context.budget
+    entries = []
+    for position, (path, root) in enumerate(roots):
+        deadline = None
+        if budget_end is not None:
+            # Split what is left of the budget evenly over the remaining roots.
+            remaining = max(budget_end - time.monotonic(), 0)
+            deadline = time.monotonic() + remaining / (len(roots) - position)
+        entries.append((path, _cache_usage(context, path, root, deadline, threshold_bytes)))
+
+    entries.sort(key=lambda item: item[1].size, reverse=True)
     issues = []
     over_threshold = False
-    threshold_bytes = warn_over_mb * 1024 * 1024
-
-    for path, size in entries:
-        issues.append(f"{path}: {_human_bytes(size)}")
-        if size >= threshold_bytes:
+    uncertain = []
+    for path, usage in entries:
+        issues.append(_describe_estimate(path, usage))
+        if usage.size >= threshold_bytes:
             over_threshold = True
+        elif usage.high is None or usage.high >= threshold_bytes:
+            uncertain.append(path)
+
+    notes = ["Report-only: no files are deleted."]
+    for path in uncertain:
+        notes.append(f"{path} may be over {_human_bytes(threshold_bytes)}; run without --budget.")
+    if any(not usage.exact for _, usage in entries):
+        notes.append(
+            "Sizes marked as estimates come from a time-boxed scan (--budget); "
+            "unvisited folders were extrapolated from sampled ones."
+        )
+
+    sizes = []
+    for path, usage in entries:
+        record = {
+            "path": str(path),
+            "size": usage.size,
+            "allocated": usage.allocated,
+            "estimated": not usage.exact,
+        }
+        if not usage.exact:
+            record.update(low=usage.low, high=usage.high, stopped=usage.stopped)
+        sizes.append(record)
 
     return {
         "ok": not over_threshold,
         "issues": issues,
         "fix": None,
-        "notes": ["Report-only: no files are deleted."],
+        "notes": notes,
+        "sizes": sizes,
     }
 
 
 def check_large_files(context) -> dict:
-    config = context.hygiene.get("large_files", {})
-    min_size_mb = int(config.get("min_size_mb", 250))
-    top_n = int(config.get("top_n", 10))
-    roots = config.get("roots", []) or []
-
-    threshold_bytes = min_size_mb * 1024 * 1024
+    config = context.plan.hygiene.large_files
+    threshold_bytes = config.min_size
     candidates: list[tuple[int, str, Path]] = []
+    mounts: list[Path] = []
+    pruned = pruned_size = 0
 
-    for raw in roots:
-        for root in _expand_paths(raw):
+    for spec_root in config.roots:
+        for root in spec_root.paths():
             if not root.exists():
                 continue
-            dir_sizes = _dir_sizes(root)
-            for path, size in dir_sizes.items():
-                if size >= threshold_bytes:
-                    candidates.append((size, "folder", path))
-            for current, _, files in root.walk():
-                current_path = Path(current)
-                for name in files:
-                    file_path = current_path / name
-                    try:
-                        size = file_path.stat().st_size
-                    except OSError:
-                        continue
-                    if size >= threshold_bytes:
-                        candidates.append((size, "file", file_path))
+            if config.streaming:
+                candidates.extend(
+                    scan_top(
+                        root,
+                        threshold=threshold_bytes,
+                        top_n=config.top_n,
+                        collapse_ratio=config.collapse_ratio,
+                        index=context.size_index,
+                        one_filesystem=spec_root.one_filesystem,
+                        prune=context.scan.prune,
+                    )
+                )
+                continue
+            result = context.scan.scan_tree(
+                root,
+                threshold=threshold_bytes,
+                jobs=spec_root.workers(context.jobs),
+                one_filesystem=spec_root.one_filesystem,
+                prune=True,
+            )
+            candidates.extend(result.large)
+            mounts.extend(result.mounts)
+            pruned += result.pruned
+            pruned_size += result.pruned_size
 
     if not candidates:
         return {"ok": True, "issues": [], "fix": None, "notes": []}
 
-    candidates.sort(key=lambda item: item[0], reverse=True)
-    top_items = candidates[: max(top_n, 1)]
+    candidates.sort(key=lambda item: (-item[0], str(item[2])))
+    top_items = candidates[: config.top_n]
 
     issues = [
         f"Top {len(top_items)} item(s) over {_human_bytes(threshold_bytes)}:",
@@ -275,11 +278,21 @@ def check_large_files(context) -> dict:
     for size, kind, path in top_items:
         issues.append(f"{kind}: {path} — {_human_bytes(size)}")
 
+    notes = ["Report-only: no files are deleted."]
+    for mount in mounts:
+        notes.append(f"Skipped {mount} (another filesystem).")
+    if pruned:
+        estimate = f", ~{_human_bytes(pruned_size)} by cached size" if pruned_size else ""
+        notes.append(f"Pruned {pruned} folder(s) by spec rules{estimate}.")
+
     return {
         "ok": False,
         "issues": issues,
         "fix": None,
-        "notes": ["Report-only: no files are deleted."],
+        "notes": notes,
+        "sizes": [
+            {"path": str(path), "size": size, "kind": kind} for size, kind, path in top_items
+        ],
     }
 
 
@@ -0,0 +1,35 @@
+import argparse
+
+
+def add_scan_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--no-index",
+        action="store_true",
+        help="Scan from scratch without reading or updating the size index",
+    )
+    parser.add_argument(
+        "--rebuild-index",
+        action="store_true",
+        help="Discard the size index and rebuild it during this run",
+    )
+    parser.add_argument(
+        "--no-watch",
+        action="store_true",
+        help="Ignore the state kept by `life-os watch` and scan directly",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Scan each root with N threads (overrides per-root `jobs` in the spec)",
+    )
+
+
+def apply_scan_arguments(context, parsed: argparse.Namespace) -> None:
+    if parsed.jobs is not None:
+        context.jobs = max(parsed.jobs, 1)
+    if not parsed.no_index:
+        context.open_index(rebuild=parsed.rebuild_index)
+    if not parsed.no_watch:
+        context.load_watch_state()
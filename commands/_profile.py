@@ -0,0 +1,75 @@
+import argparse
+import json
+from pathlib import Path
+
+from rich.console import Console
+from rich.table import Table
+
+from commands._cleanup import _human_bytes
+from life_os import profile
+from life_os.profile import Profiler
+
+
+def add_profile_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print per-check timings and filesystem counters",
+    )
+    parser.add_argument(
+        "--profile-trace",
+        type=Path,
+        default=None,
+        metavar="FILE",
+        help="Also write a Chrome trace-event JSON file (implies --profile)",
+    )
+
+
+def start_profile(parsed: argparse.Namespace) -> Profiler | None:
+    if not (parsed.profile or parsed.profile_trace):
+        return None
+    return profile.enable()
+
+
+def report_profile(
+    console: Console, profiler: Profiler | None, parsed: argparse.Namespace
+) -> None:
+    if profiler is None:
+        return
+    profile.disable()
+
+    table = Table(title="Profile", title_justify="left")
+    for column in ("Step", "Wall ms", "CPU ms", "Walks", "Dirs", "Stats", "Bytes", "Errors"):
+        if column == "Step":
+            table.add_column(column, no_wrap=True)
+        else:
+            table.add_column(column, justify="right")
+    walks: dict[int, int] = {}
+    for span in profiler.spans:
+        if span.parent is not None and span.category == "walk":
+            top = span.parent
+            while top.parent is not None:
+                top = top.parent
+            walks[id(top)] = walks.get(id(top), 0) + 1
+    for span in profiler.top_level():
+        if span.category == "walk":
+            continue
+        table.add_row(
+            span.name,
+            f"{span.wall_ns / 1e6:.1f}",
+            f"{span.cpu_ns / 1e6:.1f}",
+            str(walks.get(id(span), 0)),
+            str(span.dirs),
+            str(span.stats),
+            _human_bytes(span.bytes),
+            str(span.errors),
+        )
+    console.print(table)
+
+    if parsed.profile_trace:
+        try:
+            parsed.profile_trace.write_text(json.dumps(profiler.chrome_trace()), encoding="utf-8")
+        except OSError as exc:
+            console.print(f"[yellow]⚠ Could not write trace: {exc}[/yellow]")
+        else:
+            console.print(f"[dim]Trace written to {parsed.profile_trace}[/dim]")
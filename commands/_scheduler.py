@@ -0,0 +1,97 @@
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeout
+
+from life_os import profile
+from life_os.scan import cancellable
+
+
+def _start(
+    name: str,
+    fn,
+    context,
+    timings: dict[str, float] | None,
+    category: str = "check",
+    cancel: threading.Event | None = None,
+) -> Future:
+    future: Future = Future()
+
+    def runner():
+        if not future.set_running_or_notify_cancel():
+            return
+        started = time.perf_counter()
+        try:
+            with profile.span(name, category):
+                if cancel is None:
+                    result = fn(context)
+                else:
+                    with cancellable(cancel):
+                        result = fn(context)
+            if timings is not None:
+                timings[name] = time.perf_counter() - started
+            future.set_result(result)
+        except BaseException as exc:
+            future.set_exception(exc)
+
+    # Daemon threads: a check that overruns its timeout must not keep the
+    # process alive after the report has been printed.
+    threading.Thread(target=profile.in_context(runner), daemon=True).start()
+    return future
+
+
+def check_timeouts(context, names: list[str], override: float | None) -> dict[str, float]:
+    timeouts = {}
+    for name in names:
+        value = override if override is not None else context.plan.doctor.timeout_for(name)
+        if value is not None:
+            timeouts[name] = value
+    return timeouts
+
+
+def run_checks(
+    checks: list[tuple[str, callable]],
+    context,
+    timeouts: dict[str, float],
+    timings: dict[str, float] | None = None,
+):
+    # Start every check at once, then hand results back in declared order as
+    # each one becomes available. Timeouts count from the shared start time.
+    # With `timings`, each finished check's wall time is stored under its name.
+    started = time.monotonic()
+    futures = [(name, _start(name, fn, context, timings)) for name, fn in checks]
+
+    for name, future in futures:
+        timeout = timeouts.get(name)
+        remaining = None
+        if timeout is not None:
+            remaining = max(timeout - (time.monotonic() - started), 0)
+        try:
+            result = future.result(timeout=remaining)
+        except FutureTimeout:
+            result = {
+                "ok": False,
+                "issues": [f"Timed out after {timeout:g}s."],
+                "fix": None,
+                "notes": ["The check was abandoned; its result is unknown."],
+            }
+        except Exception as exc:
+            result = {
+                "ok": False,
+                "issues": [f"Check failed: {exc}"],
+                "fix": None,
+                "notes": [],
+            }
+        yield name, result
+
+
+def prefetch(steps: list[tuple[str, callable]], context, category: str = "cleanup"):
+    # Start every step in the background at once and hand back
+    # (label, future, cancel event) in declared order. Setting a step's event
+    # stops its scans at the next folder (its future then raises
+    # ScanCancelled).
+    started = []
+    for label, fn in steps:
+        cancel = threading.Event()
+        started.append((label, _start(fn.__name__, fn, context, None, category, cancel), cancel))
+    return started
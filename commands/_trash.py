@@ -0,0 +1,227 @@
+import itertools
+import json
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+
+RENAME_JOBS = 8
+
+
+def _free_names(names: list[str], taken: set[str], timestamp: int) -> list[str]:
+    # Same naming as before ("name", then "name.<timestamp>.<n>"), but probed
+    # against one listing of the trash instead of a stat per attempt.
+    assigned = []
+    for name in names:
+        target = name
+        counter = 1
+        while target in taken:
+            target = f"{name}.{timestamp}.{counter}"
+            counter += 1
+        taken.add(target)
+        assigned.append(target)
+    return assigned
+
+
+class TrashJournal:
+    # Append-only JSON lines. A batch is written as one "move" record per
+    # item before anything is renamed, then a "done" record naming the items
+    # that did not move. Undo adds a "restore" record per item it put back
+    # and an "undo" record once nothing in the batch is left to restore.
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def append(self, records: list[dict]) -> None:
+        # Raises OSError when the journal cannot be written, so callers do
+        # not promise an undo that was never recorded.
+        if not records:
+            return
+        data = "".join(json.dumps(record, separators=(",", ":")) + "\n" for record in records)
+        with self._lock:
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+            try:
+                os.write(fd, data.encode("utf-8"))
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    def read(self) -> list[dict]:
+        records = []
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        # A torn last line from an interrupted run.
+                        continue
+        except OSError:
+            return []
+        return records
+
+    def _open_batches(self, records: list[dict]) -> dict[str, list[dict]]:
+        # Batch id -> move records still in the trash, in journal order.
+        undone = set()
+        settled: set[tuple[str, str]] = set()
+        for record in records:
+            op = record.get("op")
+            if op == "undo":
+                undone.add(record["batch"])
+            elif op == "done":
+                settled.update((record["batch"], path) for path in record.get("failed", []))
+            elif op == "restore":
+                settled.add((record["batch"], record["from"]))
+        batches: dict[str, list[dict]] = {}
+        for record in records:
+            if record.get("op") != "move" or record["batch"] in undone:
+                continue
+            if (record["batch"], record["from"]) in settled:
+                continue
+            batches.setdefault(record["batch"], []).append(record)
+        return batches
+
+    def last_batch(self) -> str | None:
+        batches = self._open_batches(self.read())
+        return next(reversed(batches), None)
+
+    def batch(self, batch_id: str) -> list[dict]:
+        return self._open_batches(self.read()).get(batch_id, [])
+
+
+_batches = itertools.count(1)
+
+
+def new_batch_id() -> str:
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{next(_batches)}"
+
+
+def commit_to_trash(
+    paths: list[Path],
+    trash_dir: Path,
+    journal: TrashJournal | None = None,
+    batch_id: str | None = None,
+    jobs: int = RENAME_JOBS,
+) -> list[Path]:
+    # Moves `paths` into `trash_dir` as one batch and returns the ones moved.
+    trash_dir.mkdir(parents=True, exist_ok=True)
+    trash_dev = os.stat(trash_dir).st_dev
+    try:
+        taken = set(os.listdir(trash_dir))
+    except OSError:
+        taken = set()
+
+    present: list[tuple[Path, int]] = []
+    for path in paths:
+        try:
+            present.append((path, os.lstat(path).st_dev))
+        except OSError:
+            continue
+    targets = _free_names([path.name for path, _ in present], taken, int(time.time()))
+    batch_id = batch_id or new_batch_id()
+    jobs_list = [(path, device, name) for (path, device), name in zip(present, targets)]
+    if journal is not None:
+        # Recorded before any rename, so an interrupted run can still be undone.
+        journal.append(
+            [
+                {"op": "move", "batch": batch_id, "from": str(path), "to": str(trash_dir / name)}
+                for path, _, name in jobs_list
+            ]
+        )
+    moved: list[Path] = []
+    lock = threading.Lock()
+
+    def rename(job: tuple[Path, int, str]) -> None:
+        path, device, name = job
+        target = trash_dir / name
+        # The name was picked from an earlier listing; never replace
+        # something that has appeared there since.
+        if os.path.lexists(target):
+            return
+        try:
+            if device == trash_dev:
+                os.rename(path, target)
+            else:
+                shutil.move(str(path), str(target))
+        except OSError:
+            return
+        with lock:
+            moved.append(path)
+
+    try:
+        if jobs > 1 and len(jobs_list) > 1:
+            with ThreadPoolExecutor(max_workers=jobs) as pool:
+                list(pool.map(rename, jobs_list))
+        else:
+            for job in jobs_list:
+                rename(job)
+    finally:
+        if journal is not None and jobs_list:
+            # Judged from the disk, so a rename interrupted after it happened
+            # still counts as moved.
+            failed = [str(path) for path, _, _ in jobs_list if os.path.lexists(path)]
+            try:
+                journal.append([{"op": "done", "batch": batch_id, "failed": failed}])
+            except OSError:
+                # Undo still works without it: unmoved items are recognised
+                # by their trash copy being absent.
+                pass
+
+    order = {path: index for index, path in enumerate(paths)}
+    moved.sort(key=lambda path: order[path])
+    return moved
+
+
+def undo_batch(
+    journal: TrashJournal, batch_id: str, jobs: int = RENAME_JOBS
+) -> tuple[list[Path], list[Path]]:
+    # Renames a batch back out of the trash. Returns (restored, skipped);
+    # items are skipped when the trash copy is gone or the original path is
+    # taken again. Skipped items stay in the batch so undo can be retried.
+    records = journal.batch(batch_id)
+    restored: list[Path] = []
+    skipped: list[Path] = []
+    settled: list[dict] = []
+    lock = threading.Lock()
+
+    def restore(record: dict) -> None:
+        source = Path(record["to"])
+        target = Path(record["from"])
+        ok = False
+        if not os.path.lexists(source) and os.path.lexists(target):
+            # Never moved: the run stopped before its "done" record.
+            with lock:
+                settled.append(record)
+            return
+        if not os.path.lexists(target):
+            try:
+                target.parent.mkdir(parents=True, exist_ok=True)
+                try:
+                    os.rename(source, target)
+                except OSError:
+                    shutil.move(str(source), str(target))
+                ok = True
+            except OSError:
+                ok = False
+        with lock:
+            (restored if ok else skipped).append(target)
+            if ok:
+                settled.append(record)
+
+    if jobs > 1 and len(records) > 1:
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            list(pool.map(restore, records))
+    else:
+        for record in records:
+            restore(record)
+
+    closing = [] if skipped else [{"op": "undo", "batch": batch_id, "time": time.time()}]
+    journal.append(
+        [{"op": "restore", "batch": batch_id, "from": record["from"]} for record in settled]
+        + closing
+    )
+    return restored, skipped
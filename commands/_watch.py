@@ -0,0 +1,222 @@
+import os
+import stat
+
+from commands._inotify import (
+    IN_ATTRIB,
+    IN_CREATE,
+    IN_DELETE,
+    IN_DELETE_SELF,
+    IN_IGNORED,
+    IN_ISDIR,
+    IN_MOVE_SELF,
+    IN_MOVED_FROM,
+    IN_MOVED_TO,
+    IN_Q_OVERFLOW,
+)
+from life_os.scan import list_dir
+
+
+def _is_under(path: str, root: str) -> bool:
+    return path.startswith(root) and path[len(root) : len(root) + 1] == os.sep
+
+
+class WatchModel:
+    # In-memory mirror of the watched roots: per-directory file sizes and
+    # mtimes plus the subdirectory names, with one inotify watch per directory.
+    # Events patch the mirror in place; anything the kernel could not deliver
+    # (queue overflow) or watch (out of watches) falls back to a rescan.
+    # The mirror sums every file and follows every folder; each snapshot
+    # root says where scans would differ (mount points, hard links, folder
+    # names a prune rule could match) so readers can tell when to walk.
+
+    def __init__(self, inotify, floor: int):
+        self.inotify = inotify
+        self.floor = floor
+        self.roots: dict[str, bool] = {}
+        # name -> (size, mtime, link count) for each file.
+        self.files: dict[str, dict[str, tuple[int, float, int]]] = {}
+        self.subdirs: dict[str, set[str]] = {}
+        self.mtimes: dict[str, float] = {}
+        self.devices: dict[str, int] = {}
+        self.wds: dict[int, str] = {}
+        self.unwatched: set[str] = set()
+        self.rescans = 0
+        self.dirty = True
+
+    def add_root(self, path: str, listing: bool = False) -> None:
+        self.roots[path] = self.roots.get(path, False) or listing
+
+    def _top_roots(self) -> list[str]:
+        tops: list[str] = []
+        for root in sorted(self.roots):
+            if not any(root == top or _is_under(root, top) for top in tops):
+                tops.append(root)
+        return tops
+
+    def start(self) -> None:
+        for root in self._top_roots():
+            self.rescan(root)
+
+    def rescan(self, path: str) -> None:
+        self.rescans += 1
+        self._drop(path)
+        self._scan(path)
+
+    def _scan(self, top: str) -> None:
+        stack = [top]
+        while stack:
+            path = stack.pop()
+            try:
+                st = os.lstat(path)
+            except OSError:
+                continue
+            if not stat.S_ISDIR(st.st_mode):
+                continue
+            # Watch before listing so nothing created mid-listing is missed.
+            try:
+                self.wds[self.inotify.add_watch(path)] = path
+            except OSError:
+                self.unwatched.add(path)
+            files: dict[str, tuple[int, float, int]] = {}
+            subdirs: set[str] = set()
+            for entry in list_dir(path):
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.add(entry.name)
+                        stack.append(entry.path)
+                        continue
+                    entry_stat = entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                files[entry.name] = (
+                    entry_stat.st_size,
+                    entry_stat.st_mtime,
+                    entry_stat.st_nlink,
+                )
+            self.files[path] = files
+            self.subdirs[path] = subdirs
+            self.mtimes[path] = st.st_mtime
+            self.devices[path] = st.st_dev
+        self.dirty = True
+
+    def _drop(self, top: str) -> None:
+        for path in [p for p in self.files if p == top or _is_under(p, top)]:
+            del self.files[path]
+            del self.subdirs[path]
+            del self.mtimes[path]
+            del self.devices[path]
+        self.unwatched = {p for p in self.unwatched if not (p == top or _is_under(p, top))}
+        for wd in [wd for wd, p in self.wds.items() if p == top or _is_under(p, top)]:
+            self.inotify.rm_watch(wd)
+            del self.wds[wd]
+
+    def _refresh_mtime(self, directory: str) -> None:
+        try:
+            self.mtimes[directory] = os.lstat(directory).st_mtime
+        except OSError:
+            pass
+
+    def apply(self, events: list[tuple[int, int, str]]) -> None:
+        overflowed = False
+        for wd, mask, name in events:
+            if mask & IN_Q_OVERFLOW:
+                overflowed = True
+                continue
+            directory = self.wds.get(wd)
+            if directory is None:
+                continue
+            if mask & IN_IGNORED:
+                del self.wds[wd]
+                continue
+            self.dirty = True
+            if mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                if directory in self.roots:
+                    self._drop(directory)
+                continue
+            if directory not in self.files:
+                continue
+
+            path = os.path.join(directory, name)
+            if mask & (IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO):
+                self._refresh_mtime(directory)
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    self.subdirs[directory].add(name)
+                    self.rescan(path)
+                elif mask & (IN_DELETE | IN_MOVED_FROM):
+                    self.subdirs[directory].discard(name)
+                    self._drop(path)
+                elif mask & IN_ATTRIB:
+                    self._refresh_mtime(path)
+                continue
+
+            if mask & (IN_DELETE | IN_MOVED_FROM):
+                self.files[directory].pop(name, None)
+                continue
+            try:
+                st = os.lstat(path)
+            except OSError:
+                self.files[directory].pop(name, None)
+                continue
+            self.files[directory][name] = (st.st_size, st.st_mtime, st.st_nlink)
+
+        if overflowed:
+            # Events were dropped and we cannot tell where; rescan every root.
+            for root in self._top_roots():
+                self.rescan(root)
+
+    def _rollup(self) -> dict[str, int]:
+        sizes = {
+            path: sum(size for size, _, _ in files.values())
+            for path, files in self.files.items()
+        }
+        for path in sorted(sizes, key=lambda p: p.count(os.sep), reverse=True):
+            parent = os.path.dirname(path)
+            if parent in sizes and os.path.basename(path) in self.subdirs[parent]:
+                sizes[parent] += sizes[path]
+        return sizes
+
+    def snapshot(self) -> dict[str, dict]:
+        sizes = self._rollup()
+        roots: dict[str, dict] = {}
+        for root, listing in self.roots.items():
+            if root not in self.files:
+                continue
+            if any(p == root or _is_under(p, root) for p in self.unwatched):
+                # Part of this root is not live; let doctor scan it instead.
+                continue
+            large = []
+            names: set[str] = set()
+            mounts = links = False
+            for path in self.files:
+                if not (path == root or _is_under(path, root)):
+                    continue
+                if path != root:
+                    names.add(os.path.basename(path))
+                mounts = mounts or self.devices[path] != self.devices[root]
+                if sizes[path] >= self.floor:
+                    large.append([sizes[path], "folder", path])
+                for name, (size, _, nlink) in self.files[path].items():
+                    links = links or nlink > 1
+                    if size >= self.floor:
+                        large.append([size, "file", os.path.join(path, name)])
+            entries = None
+            if listing:
+                entries = [
+                    [name, False, size, mtime]
+                    for name, (size, mtime, _) in self.files[root].items()
+                ]
+                for name in self.subdirs[root]:
+                    child = os.path.join(root, name)
+                    if child in sizes:
+                        entries.append([name, True, sizes[child], self.mtimes[child]])
+            roots[root] = {
+                "size": sizes[root],
+                "floor": self.floor,
+                "large": large,
+                "entries": entries,
+                "mounts": mounts,
+                "links": links,
+                "dirs": sorted(names),
+            }
+        return roots
@@ -3,6 +3,7 @@ import sys
 from pathlib import Path
 from rich.console import Console
 
+from commands._archive import archive_items
 from commands._cleanup import (
     caches_candidates,
     desktop_candidates,
@@ -10,9 +11,15 @@ from commands._cleanup import (
     format_top_items,
     large_files_candidates,
     move_to_trash,
+    recheck,
     summarize,
     _human_bytes,
 )
+from commands._options import add_scan_arguments, apply_scan_arguments
+from commands._profile import add_profile_arguments, report_profile, start_profile
+from commands._scheduler import prefetch
+from commands._trash import TrashJournal, undo_batch
+from life_os import profile
 
 
 console = Console()
@@ -20,12 +27,14 @@ console = Console()
 
 def _prompt_step(label: str) -> str:
     while True:
-        response = input(f"Proceed with {label}? (y/n/s=safe-only) ").strip().lower()
-        if response in {"y", "n", "t"}:
+        response = (
+            input(f"Proceed with {label}? (y/n/s=safe-only/a=archive/q=quit) ").strip().lower()
+        )
+        if response in {"y", "n", "t", "a", "q"}:
             return response
         if response in {"s"}:
             return "t"
-        print("Please enter y, n, or s.")
+        print("Please enter y, n, s, a, or q.")
 
 
 def _run_step(
@@ -35,10 +44,15 @@ def _run_step(
     dry_run: bool,
     assume_yes: bool,
     verbose: bool,
-) -> bool:
+    context,
+    journal: TrashJournal | None = None,
+    archive_by_default: bool = False,
+) -> str:
+    # Returns the user's choice ("y", "n", "t", "a" or "q"). With "a",
+    # might-need items are archived and the rest go to Trash.
     if not items:
         console.print(f"[green]{label}: no items[/green]")
-        return True
+        return "y"
 
     summary = summarize(items)
     console.print(
@@ -54,24 +68,94 @@ def _run_step(
         else:
             console.print(f"  Top: {', '.join(top_items)}")
 
-    choice = "y" if assume_yes else _prompt_step(label)
-    if choice == "n":
+    if assume_yes:
+        choice = "a" if archive_by_default else "y"
+    else:
+        choice = _prompt_step(label)
+    if choice in {"n", "q"}:
         console.print("[cyan]↷ Skipped.[/cyan]")
-        return False
+        return choice
+
+    # The list was built in the background; make sure it still holds.
+    items, gone, resized = recheck(items, index=context.size_index, prune=context.scan.prune)
+    if gone or resized:
+        console.print(
+            f"[dim]Re-checked: {gone} item(s) gone, {resized} changed size "
+            f"(now {_human_bytes(sum(item.size for item in items))}).[/dim]"
+        )
+
+    to_archive = []
+    if choice == "a":
+        to_archive = [item for item in items if item.classification == "might-need"]
+        items = [item for item in items if item.classification != "might-need"]
 
     trash_only = choice == "t"
-    moved = move_to_trash(items, trash_dir, dry_run=dry_run, trash_only=trash_only)
+    with profile.span(f"move_to_trash ({label})", "trash"):
+        try:
+            moved = move_to_trash(
+                items, trash_dir, dry_run=dry_run, trash_only=trash_only, journal=journal
+            )
+        except OSError as exc:
+            # The batch is journaled before anything moves; without a record
+            # there would be nothing for --undo to restore.
+            console.print(f"[red]✖ Nothing moved to Trash: {exc}[/red]")
+            moved = []
+    archive = context.plan.cleanup.archive
+    with profile.span(f"archive ({label})", "archive"):
+        archived, failed = archive_items(
+            to_archive,
+            archive.dir,
+            fmt=archive.format,
+            jobs=archive.jobs,
+            max_in_flight=archive.max_in_flight,
+            dry_run=dry_run,
+        )
+    # Later steps reuse this run's scans; drop what is no longer there.
+    for item in [*moved, *(done.item for done in archived)]:
+        context.scan.forget(item.path, item.size)
 
     if dry_run:
+        if to_archive:
+            console.print(f"[dim]Would archive {len(to_archive)} item(s) into {archive.dir}[/dim]")
         console.print("[cyan]↷ Dry run: no changes made.[/cyan]")
-        return True
+        return choice
 
-    if not moved:
+    for path, reason in failed:
+        console.print(f"[yellow]⚠ Not archived: {path}: {reason}[/yellow]")
+
+    if not moved and not archived:
         console.print("[cyan]↷ No changes made.[/cyan]")
-        return True
+        return choice
+
+    if moved:
+        console.print(f"[green]✔ Moved to Trash: {len(moved)} item(s)[/green]")
+    if archived:
+        original = sum(done.item.size for done in archived)
+        compressed = sum(done.archive_size for done in archived)
+        reclaimed = max(sum(done.reclaimed for done in archived), 0)
+        console.print(
+            f"[green]✔ Archived {len(archived)} item(s) into {archive.dir}: "
+            f"{_human_bytes(original)} → {_human_bytes(compressed)}, "
+            f"reclaimed {_human_bytes(reclaimed)}[/green]"
+        )
+    return choice
+
 
-    console.print(f"[green]✔ Moved to Trash: {len(moved)} item(s)[/green]")
-    return True
+def _undo(journal: TrashJournal | None, batch_id: str) -> None:
+    if journal is None:
+        console.print("[yellow]No cleanup.actions.journal configured; nothing to undo.[/yellow]")
+        sys.exit(2)
+    if batch_id == "last":
+        batch_id = journal.last_batch()
+    if not batch_id or not journal.batch(batch_id):
+        console.print("[yellow]No batch to undo.[/yellow]")
+        sys.exit(1)
+
+    restored, skipped = undo_batch(journal, batch_id)
+    console.print(f"[green]✔ Restored {len(restored)} item(s) from batch {batch_id}[/green]")
+    for path in skipped:
+        console.print(f"[yellow]⚠ Not restored: {path}[/yellow]")
+    sys.exit(0 if not skipped else 1)
 
 
 def run(context, args: list[str]) -> None:
@@ -94,14 +178,33 @@ def run(context, args: list[str]) -> None:
         action="store_true",
         help="Show detailed item lists",
     )
+    parser.add_argument(
+        "--archive",
+        action="store_true",
+        help="With --yes, archive might-need items (cleanup.actions.archive) instead of trashing",
+    )
+    parser.add_argument(
+        "--undo",
+        nargs="?",
+        const="last",
+        metavar="BATCH",
+        help="Move a batch back out of Trash (default: the most recent one)",
+    )
+    add_scan_arguments(parser)
+    add_profile_arguments(parser)
     parsed = parser.parse_args(args)
 
     if parsed.verbose:
         context.verbose = True
+    apply_scan_arguments(context, parsed)
+    context.use_prune("cleanup")
+    profiler = start_profile(parsed)
+
+    trash_dir = context.plan.cleanup.trash_dir
+    journal = TrashJournal(context.trash_journal_path) if context.trash_journal_path else None
 
-    cleanup_config = context.cleanup
-    actions = cleanup_config.get("actions", {})
-    trash_dir = Path(actions.get("trash_dir", "~/.Trash")).expanduser()
+    if parsed.undo:
+        _undo(journal, parsed.undo)
 
     console.print("[bold]life-os cleanup[/bold]")
     console.print("[dim]Cleanup uses Trash by default; no permanent delete.[/dim]")
@@ -116,15 +219,33 @@ def run(context, args: list[str]) -> None:
         ("Large Files", large_files_candidates),
     ]
 
-    for label, fn in steps:
-        items = fn(context)
-        _run_step(
+    # Every step scans in the background from the start, so later steps are
+    # usually ready by the time the current prompt is answered.
+    pending = prefetch(steps, context)
+    quit_early = False
+    for label, future, cancel in pending:
+        if quit_early:
+            cancel.set()
+            continue
+        if not future.done():
+            with console.status(f"Scanning {label}…"):
+                future.exception()
+        exception = future.exception()
+        if exception is not None:
+            console.print(f"[yellow]⚠ {label}: scan failed: {exception}[/yellow]")
+            continue
+        choice = _run_step(
             label=label,
-            items=items,
+            items=future.result(),
             trash_dir=trash_dir,
             dry_run=parsed.dry_run,
             assume_yes=parsed.yes,
             verbose=parsed.verbose,
+            context=context,
+            journal=journal,
+            archive_by_default=parsed.archive,
         )
+        quit_early = choice == "q"
 
+    report_profile(console, profiler, parsed)
     sys.exit(0)
@@ -0,0 +1,100 @@
+import argparse
+import sys
+from rich.console import Console
+
+from commands._cleanup import _human_bytes, move_to_trash
+from commands._dedupe import dedupe_roots, duplicate_items, find_duplicates
+from commands._trash import TrashJournal
+
+
+console = Console()
+
+
+def run(context, args: list[str]) -> None:
+    parser = argparse.ArgumentParser(
+        prog="life-os dedupe",
+        description="Find duplicate files and move the extra copies to Trash",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Report duplicates without moving anything",
+    )
+    parser.add_argument(
+        "--yes",
+        action="store_true",
+        help="Move duplicates without asking",
+    )
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="List every path in every group",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Worker processes for full-content hashing",
+    )
+    parsed = parser.parse_args(args)
+
+    config = context.plan.dedupe
+    roots = [root for root in dedupe_roots(context) if root.is_dir()]
+    jobs = parsed.jobs or config.jobs
+
+    console.print("[bold]life-os dedupe[/bold]")
+    if not roots:
+        console.print("[green]No dedupe roots found.[/green]")
+        sys.exit(0)
+
+    report = find_duplicates(roots, min_size=config.min_size, edge=config.edge, jobs=jobs)
+    console.print(
+        f"[dim]{report.files} files; {report.edge_hashed} edge-hashed; "
+        f"{report.full_hashed} fully hashed[/dim]"
+    )
+    if not report.groups:
+        console.print("[green]✔ No duplicates found.[/green]")
+        sys.exit(0)
+
+    shown = report.groups if parsed.verbose or context.verbose else report.groups[: config.top_n]
+    for group in shown:
+        console.print(
+            f"{len(group.paths)} × {_human_bytes(group.size)} "
+            f"→ reclaim {_human_bytes(group.reclaimable)}"
+        )
+        console.print(f"  keep: {group.keeper}")
+        for path in group.losers:
+            console.print(f"  dup:  {path}")
+    hidden = len(report.groups) - len(shown)
+    if hidden:
+        console.print(f"  [dim]… {hidden} more group(s) (use --verbose)[/dim]")
+
+    items = duplicate_items(report)
+    console.print(
+        f"[yellow]⚠ {len(report.groups)} duplicate group(s), "
+        f"{_human_bytes(report.reclaimable)} reclaimable[/yellow]"
+    )
+
+    if parsed.dry_run:
+        console.print("[cyan]↷ Dry run: no changes made.[/cyan]")
+        sys.exit(0)
+
+    if not parsed.yes:
+        response = input(f"Move {len(items)} duplicate(s) to Trash? (y/n) ").strip().lower()
+        if response != "y":
+            console.print("[cyan]↷ Skipped.[/cyan]")
+            sys.exit(0)
+
+    trash_dir = context.plan.cleanup.trash_dir
+    journal = TrashJournal(context.trash_journal_path) if context.trash_journal_path else None
+    try:
+        moved = move_to_trash(items, trash_dir, journal=journal)
+    except OSError as exc:
+        console.print(f"[red]✖ Nothing moved to Trash: {exc}[/red]")
+        sys.exit(1)
+    console.print(
+        f"[green]✔ Moved to Trash: {len(moved)} item(s) "
+        f"({_human_bytes(sum(item.size for item in moved))})[/green]"
+    )
+    sys.exit(0)
@@ -1,12 +1,150 @@
 import argparse
+import json
+import os
 import sys
+import time
 from rich.console import Console
+from rich.table import Table
 
 from commands._folders import build_folder_checks
+from commands._homes import doctor_homes, resolve_homes
 from commands._hygiene import build_hygiene_checks
+from commands._options import add_scan_arguments, apply_scan_arguments
+from commands._profile import add_profile_arguments, report_profile, start_profile
+from commands._scheduler import check_timeouts, run_checks
 
 console = Console()
 
+
+def _emit(record: dict, status: int = 0) -> None:
+    # One JSON object per line, flushed as soon as the check is done. If the
+    # reader goes away (`doctor --json | head -3`), stop quietly with `status`.
+    try:
+        sys.stdout.write(json.dumps(record, default=str) + "\n")
+        sys.stdout.flush()
+    except BrokenPipeError:
+        # Point stdout at devnull so the flush at exit does not fail again.
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        os.close(devnull)
+        sys.exit(status)
+
+
+def _run_json(checks, context, timeouts, profiler, parsed) -> None:
+    started = time.perf_counter()
+    timings: dict[str, float] = {}
+    issues_found = False
+    for name, result in run_checks(checks, context, timeouts, timings):
+        issues_found = issues_found or not result["ok"]
+        elapsed = timings.get(name)
+        _emit(
+            {
+                "type": "check",
+                "name": name,
+                "ok": result["ok"],
+                "issues": result["issues"],
+                "notes": result.get("notes", []),
+                "sizes": result.get("sizes", []),
+                "fixable": result.get("fix") is not None,
+                "elapsed_ms": round(elapsed * 1000, 3) if elapsed is not None else None,
+            },
+            1 if issues_found else 0,
+        )
+    _emit(
+        {
+            "type": "summary",
+            "ok": not issues_found,
+            "checks": len(checks),
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 3),
+        },
+        1 if issues_found else 0,
+    )
+    report_profile(Console(stderr=True), profiler, parsed)
+    sys.exit(1 if issues_found else 0)
+
+
+def _run_homes(context, parsed, target: str | None) -> None:
+    homes = resolve_homes(parsed.homes)
+    if not homes:
+        console.print(f"[red]✖ No home directories match {parsed.homes}[/red]")
+        sys.exit(2)
+
+    limit = parsed.home_timeout
+    if limit is None:
+        limit = context.plan.doctor.home_timeout
+    # Each home's size index is kept in the auditor's cache, never in the home.
+    index_dir = context.home / ".cache" / "life-os" / "homes"
+    try:
+        index_dir.mkdir(parents=True, exist_ok=True)
+    except OSError:
+        index_dir = None
+    options = {
+        "timeout": parsed.timeout,
+        "home_timeout": limit,
+        "jobs": parsed.jobs,
+        "no_index": parsed.no_index,
+        "budget": parsed.budget,
+        "index_dir": str(index_dir) if index_dir is not None else None,
+    }
+    workers = parsed.home_jobs or os.cpu_count() or 1
+
+    started = time.perf_counter()
+    summaries = []
+    if not parsed.json:
+        console.print(f"[bold]life-os doctor[/bold] [dim]({len(homes)} homes)[/dim]")
+    for summary in doctor_homes(homes, context.spec_path, target, options, workers):
+        summaries.append(summary)
+        if parsed.json:
+            status = 0 if all(earlier["ok"] for earlier in summaries) else 1
+            _emit({"type": "home", **summary}, status)
+        elif summary["ok"]:
+            console.print(f"[green]✔ {summary['home']}[/green]")
+        else:
+            console.print(f"[yellow]⚠ {summary['home']}[/yellow]")
+
+    failing = [summary for summary in summaries if not summary["ok"]]
+    elapsed_ms = round((time.perf_counter() - started) * 1000, 3)
+    if parsed.json:
+        _emit(
+            {
+                "type": "summary",
+                "ok": not failing,
+                "homes": len(summaries),
+                "failing": len(failing),
+                "elapsed_ms": elapsed_ms,
+            },
+            1 if failing else 0,
+        )
+        sys.exit(1 if failing else 0)
+
+    table = Table(title="Homes", title_justify="left")
+    table.add_column("Home", no_wrap=True)
+    table.add_column("Status")
+    table.add_column("Failed checks")
+    table.add_column("Time", justify="right")
+    for summary in summaries:
+        if summary.get("error"):
+            status, detail = "[red]error[/red]", summary["error"]
+        elif summary["ok"]:
+            status, detail = "[green]ok[/green]", ""
+        else:
+            status, detail = "[yellow]issues[/yellow]", ", ".join(summary["failed"])
+        elapsed = summary["elapsed_ms"]
+        table.add_row(
+            summary["home"],
+            status,
+            detail,
+            f"{elapsed / 1000:.1f}s" if elapsed is not None else "-",
+        )
+    console.print(table)
+
+    if not failing:
+        console.print(f"[green]✔ All {len(summaries)} homes OK[/green]")
+        sys.exit(0)
+    console.print(f"\n[yellow]⚠ {len(failing)} of {len(summaries)} homes have issues[/yellow]")
+    sys.exit(1)
+
+
 def run(context, args: list[str]) -> None:
     parser = argparse.ArgumentParser(
         prog="life-os doctor",
@@ -25,23 +163,71 @@ def run(context, args: list[str]) -> None:
     parser.add_argument(
         "--json",
         action="store_true",
-        help="Machine-readable output (not implemented yet)",
+        help="Stream one JSON object per check (NDJSON), then a summary line",
     )
     parser.add_argument(
         "--verbose",
         action="store_true",
         help="Include per-path details in report output",
     )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=None,
+        metavar="SECONDS",
+        help="Give up on any check that runs longer than this",
+    )
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=None,
+        metavar="SECONDS",
+        help="Size caches approximately: after this long, estimate unvisited folders",
+    )
+    parser.add_argument(
+        "--homes",
+        default=None,
+        metavar="GLOB|FILE",
+        help="Check every home matching a glob (or listed in a file, one per line)",
+    )
+    parser.add_argument(
+        "--home-jobs",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Check up to N homes at once (default: CPU count)",
+    )
+    parser.add_argument(
+        "--home-timeout",
+        type=float,
+        default=None,
+        metavar="SECONDS",
+        help="Give up on a home whose checks run longer than this",
+    )
+    add_scan_arguments(parser)
+    add_profile_arguments(parser)
     parsed = parser.parse_args(args)
 
-    if parsed.json:
-        console.print("[yellow]JSON output is not implemented yet.[/yellow]")
-        sys.exit(2)
+    target = parsed.target.lower() if parsed.target else None
+    if parsed.homes:
+        _run_homes(context, parsed, target)
 
     if parsed.verbose:
         context.verbose = True
+    context.budget = parsed.budget
+    apply_scan_arguments(context, parsed)
+    context.use_prune("hygiene")
+    profiler = start_profile(parsed)
 
-    target = parsed.target.lower() if parsed.target else None
+    checks = [
+        (name, fn)
+        for name, fn in build_folder_checks(context) + build_hygiene_checks(context)
+        if not target or name.lower() == target
+    ]
+    timeouts = check_timeouts(context, [name for name, _ in checks], parsed.timeout)
+
+    if parsed.json:
+        _run_json(checks, context, timeouts, profiler, parsed)
 
     console.print("[bold]life-os doctor[/bold]")
     console.print("[dim]Hygiene checks are report-only; no files are deleted.[/dim]")
@@ -51,13 +237,7 @@ def run(context, args: list[str]) -> None:
     if parsed.dry_run:
         console.print("[cyan]↷ Doctor is report-only; no changes will be made.[/cyan]")
 
-    checks = build_folder_checks(context) + build_hygiene_checks(context)
-    for name, fn in checks:
-        if target and name.lower() != target:
-            continue
-
-        result = fn(context)
-
+    for name, result in run_checks(checks, context, timeouts):
         if result["ok"]:
             console.print(f"[green]✔ {name}[/green]")
         else:
@@ -68,6 +248,8 @@ def run(context, args: list[str]) -> None:
             for note in result.get("notes", []):
                 console.print(f"  [dim]- {note}[/dim]")
 
+    report_profile(console, profiler, parsed)
+
     if not issues_found:
         console.print("[green]✔ System health: OK[/green]")
         sys.exit(0)
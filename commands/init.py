@@ -1,3 +1,4 @@
+import argparse
 import sys
 from rich.console import Console
 
@@ -6,7 +7,25 @@ from commands._folders import build_folder_checks
 console = Console()
 
 def run(context, args: list[str]) -> None:
-    target = args[0].lower() if args else None
+    parser = argparse.ArgumentParser(
+        prog="life-os init",
+        description="Create the folders the LifeOS spec requires",
+    )
+    parser.add_argument(
+        "target",
+        nargs="?",
+        help="Initialize a single area by name",
+    )
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="Enable verbose output",
+    )
+    parsed = parser.parse_args(args)
+
+    if parsed.verbose:
+        context.verbose = True
+    target = parsed.target.lower() if parsed.target else None
 
     console.print("[bold]life-os init[/bold]")
 
@@ -0,0 +1,112 @@
+import argparse
+import signal
+import sys
+import time
+from rich.console import Console
+
+from commands._watch import WatchModel
+from life_os.watchstate import HEARTBEAT_SECONDS, write_watch_state
+
+console = Console()
+
+
+def _floor(context) -> int:
+    # Large items are recorded down to the smallest threshold any check uses.
+    return context.plan.large_floor()
+
+
+def _roots(context) -> list[tuple[str, bool]]:
+    roots = [(str(context.desktop), True), (str(context.downloads), True)]
+    for root in context.plan.roots():
+        roots.extend((str(path), False) for path in root.paths())
+    return roots
+
+
+def run(context, args: list[str]) -> None:
+    parser = argparse.ArgumentParser(
+        prog="life-os watch",
+        description="Keep a live size/age model of the spec's roots for doctor (Linux only)",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=2.0,
+        metavar="SECONDS",
+        help="Write the state file at most this often while things change",
+    )
+    parser.add_argument(
+        "--once",
+        action="store_true",
+        help="Scan, write the state file and exit",
+    )
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="Enable verbose output",
+    )
+    parsed = parser.parse_args(args)
+    if parsed.verbose:
+        context.verbose = True
+
+    if not sys.platform.startswith("linux"):
+        console.print("[yellow]watch needs Linux inotify; not available here.[/yellow]")
+        sys.exit(2)
+
+    state_path = context.watch_state_path
+    if state_path is None:
+        console.print("[yellow]No watch.state_path configured in the spec.[/yellow]")
+        sys.exit(2)
+
+    from commands._inotify import Inotify
+
+    inotify = Inotify()
+    model = WatchModel(inotify, floor=_floor(context))
+    for path, listing in _roots(context):
+        model.add_root(path, listing=listing)
+
+    console.print("[bold]life-os watch[/bold]")
+    model.start()
+    try:
+        state_path.parent.mkdir(exist_ok=True)
+        write_watch_state(state_path, model.snapshot())
+    except OSError as exc:
+        console.print(f"[red]✖ Cannot write {state_path}: {exc}[/red] (run `life-os init` first?)")
+        inotify.close()
+        sys.exit(2)
+    model.dirty = False
+    console.print(f"[green]✔ Watching {len(model.wds)} folder(s)[/green] → {state_path}")
+    if model.unwatched:
+        console.print(
+            f"[yellow]⚠ {len(model.unwatched)} folder(s) could not be watched "
+            "(raise fs.inotify.max_user_watches); their roots are left to doctor.[/yellow]"
+        )
+
+    if parsed.once:
+        inotify.close()
+        sys.exit(0)
+
+    stopping = False
+
+    def stop(_signum, _frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    last_write = time.monotonic()
+    while not stopping:
+        events = inotify.read_events(timeout=parsed.interval)
+        if events:
+            model.apply(events)
+        now = time.monotonic()
+        due = model.dirty and now - last_write >= parsed.interval
+        if due or now - last_write >= HEARTBEAT_SECONDS:
+            write_watch_state(state_path, model.snapshot())
+            model.dirty = False
+            last_write = now
+
+    inotify.close()
+    state_path.unlink(missing_ok=True)
+    console.print("[cyan]↷ Stopped watching.[/cyan]")
+    sys.exit(0)
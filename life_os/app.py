@@ -1,11 +1,49 @@
+import importlib
+
+
+ENTRY_POINT_GROUP = "life_os.commands"
+
+
 class LifeOSApp:
     def __init__(self, context):
-        self.context = context
+        # `context` may be a Context or a zero-argument factory; a factory is
+        # only called once a command is actually dispatched.
+        self._context = context
         self.commands = {}
 
+    @property
+    def context(self):
+        if callable(self._context):
+            self._context = self._context()
+        return self._context
+
     def register(self, name: str, handler):
+        # `handler` is a callable, a "module:function" string or an entry
+        # point; the latter two are imported on first dispatch.
         self.commands[name] = handler
 
+    def _resolve(self, name: str):
+        handler = self.commands.get(name)
+        if handler is None:
+            handler = self._entry_point(name)
+            if handler is None:
+                return None
+        if isinstance(handler, str):
+            module_name, _, attr = handler.partition(":")
+            handler = getattr(importlib.import_module(module_name), attr or "run")
+        elif not callable(handler) and hasattr(handler, "load"):
+            handler = handler.load()
+        self.commands[name] = handler
+        return handler
+
+    def _entry_point(self, name: str):
+        # Plugins can add commands through the "life_os.commands" group.
+        from importlib.metadata import entry_points
+
+        for entry_point in entry_points(group=ENTRY_POINT_GROUP, name=name):
+            return entry_point
+        return None
+
     def run(self, argv: list[str]) -> None:
         if not argv:
             print("life-os: no command provided")
@@ -14,10 +52,14 @@ class LifeOSApp:
         name = argv[0]
         cmd_args = argv[1:]
 
-        handler = self.commands.get(name)
+        handler = self._resolve(name)
         if handler is None:
             print(f"life-os: unknown command '{name}'")
             print(f"available: {', '.join(sorted(self.commands.keys()))}")
             return
 
         handler(self.context, cmd_args)
+
+    def close(self) -> None:
+        if not callable(self._context) and hasattr(self._context, "close"):
+            self._context.close()
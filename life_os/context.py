@@ -1,37 +1,80 @@
+import sqlite3
 from pathlib import Path
-import yaml
+
+from life_os.index import SizeIndex
+from life_os.matcher import Allowlist
+from life_os.plan import SpecPlan, compile_plan
+from life_os.session import ScanSession
+from life_os.spec import load_spec
+from life_os.watchstate import load_watch_state
 
 
 class Context:
-    def __init__(self, verbose: bool = False, spec_path: Path | None = None):
+    def __init__(
+        self,
+        verbose: bool = False,
+        spec_path: Path | None = None,
+        use_spec_cache: bool = True,
+        home: Path | None = None,
+    ):
         self.verbose = verbose
         self.cwd = Path.cwd()
-        self.home = Path.home()
+        self.home = Path(home) if home is not None else Path.home()
 
         resolved_spec_path = spec_path or (
             Path(__file__).resolve().parent.parent / "data" / "life-os.spec.yaml"
         )
-        self.spec = self._load_spec(resolved_spec_path)
-
-        fs = self.spec["filesystem"]
-        self.workspace = self._expand(fs["workspace"]["path"])
-        self.system = self._expand(fs["system"]["path"])
-        self.documents = self._expand(fs["documents"]["path"])
-        self.desktop = self._expand(fs.get("desktop", {}).get("path", "~/Desktop"))
-        self.downloads = self._expand(fs.get("downloads", {}).get("path", "~/Downloads"))
-
-        self.expected_workspace_folders = set(fs["workspace"].get("required_folders", []))
-        self.expected_system_folders = set(fs["system"].get("required_folders", []))
-        self.expected_documents_folders = set(fs["documents"].get("required_folders", []))
-        self.expected_documents_subfolders = fs["documents"].get("subfolders", {})
-
-        self.hygiene = self.spec.get("hygiene", {})
-        self.cleanup = self.spec.get("cleanup", {})
-
-    def _load_spec(self, path: Path) -> dict:
-        with open(path, "r", encoding="utf-8") as f:
-            return yaml.safe_load(f)
-
-    def _expand(self, raw: str) -> Path:
-        # Expand "~" without relying on shell
-        return Path(raw.replace("~", str(self.home)))
+        self.spec_path = resolved_spec_path
+        cache_dir = self.home / ".cache" / "life-os" if use_spec_cache else None
+        loaded = load_spec(resolved_spec_path, cache_dir=cache_dir)
+        self.spec = loaded.spec
+        self.allowlists: dict[tuple[str, str], Allowlist] = loaded.allowlists
+        self.prunes: dict[str, Allowlist] = loaded.prunes
+        self.spec_errors: list[str] = loaded.errors
+
+        # Raises SpecError listing every problem before any command runs.
+        self.plan: SpecPlan = compile_plan(loaded, self.home)
+        self.workspace = self.plan.workspace
+        self.system = self.plan.system
+        self.documents = self.plan.documents
+        self.desktop = self.plan.desktop
+        self.downloads = self.plan.downloads
+
+        self.trash_journal_path = self.plan.cleanup.journal
+        self.index_path = self.plan.index_path
+        self.size_index: SizeIndex | None = None
+        self.jobs: int | None = None
+        # Seconds a size check may spend before it falls back to estimates.
+        self.budget: float | None = None
+        self.scan = ScanSession()
+
+        self.watch_state_path = self.plan.watch_state_path
+
+    def allowlist(self, section: str, key: str) -> Allowlist:
+        return self.allowlists.get((section, key)) or Allowlist()
+
+    def use_prune(self, section: str) -> None:
+        # Commands pick the spec section whose prune rules their cache and
+        # large-file walks follow; other sizing never prunes.
+        compiled = getattr(self.plan, section)
+        self.scan.prune = compiled.prune
+        self.scan.estimate_pruned = compiled.estimate_pruned
+
+    def open_index(self, rebuild: bool = False) -> None:
+        if self.index_path is None or self.size_index is not None:
+            return
+        try:
+            self.size_index = SizeIndex(self.index_path, rebuild=rebuild)
+        except (OSError, sqlite3.Error):
+            self.size_index = None
+        self.scan.index = self.size_index
+
+    def load_watch_state(self) -> None:
+        if self.watch_state_path is not None:
+            self.scan.watch = load_watch_state(self.watch_state_path)
+
+    def close(self) -> None:
+        if self.size_index is not None:
+            self.size_index.close()
+            self.size_index = None
+            self.scan.index = None
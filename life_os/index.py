@@ -0,0 +1,262 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+
+# Files at or above this size are remembered by name so large-file reports can
+# be answered from the index without listing the directory again.
+BIG_FILE_FLOOR = 1024 * 1024
+
+# Directories modified this recently are not trusted: a change landing in the
+# same mtime tick as the scan would otherwise go unnoticed on the next run.
+MTIME_SLACK_NS = 2 * 1_000_000_000
+
+# Bumped whenever the table layout changes; an older index is dropped and
+# rebuilt rather than migrated.
+INDEX_VERSION = 3
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS dirs (
+    path TEXT PRIMARY KEY,
+    dev INTEGER NOT NULL,
+    ino INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    files_size INTEGER NOT NULL,
+    files_allocated INTEGER NOT NULL,
+    file_count INTEGER NOT NULL,
+    max_file INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    subdirs TEXT NOT NULL,
+    big_files TEXT NOT NULL,
+    links TEXT NOT NULL
+)
+"""
+
+
+class DirRecord:
+    __slots__ = (
+        "dev",
+        "ino",
+        "mtime_ns",
+        "files_size",
+        "files_allocated",
+        "file_count",
+        "max_file",
+        "size",
+        "subdirs",
+        "big_files",
+        "links",
+    )
+
+    def __init__(
+        self,
+        dev: int,
+        ino: int,
+        mtime_ns: int,
+        files_size: int,
+        files_allocated: int,
+        file_count: int,
+        max_file: int,
+        size: int,
+        subdirs: list[str],
+        big_files: list[tuple[str, int]],
+        links: list[tuple[str, int, int, int, int]] = (),
+    ):
+        self.dev = dev
+        self.ino = ino
+        self.mtime_ns = mtime_ns
+        self.files_size = files_size
+        self.files_allocated = files_allocated
+        self.file_count = file_count
+        self.max_file = max_file
+        self.size = size
+        self.subdirs = subdirs
+        self.big_files = big_files
+        # Files with more than one link: (name, dev, ino, size, allocated).
+        # The totals above include them; a walk that already counted one of
+        # them elsewhere takes it off when it reads the record.
+        self.links = list(links)
+
+    def matches(self, st: os.stat_result) -> bool:
+        return (
+            self.mtime_ns == st.st_mtime_ns
+            and self.ino == st.st_ino
+            and self.dev == st.st_dev
+        )
+
+
+class SizeIndex:
+    def __init__(self, path: Path, rebuild: bool = False):
+        self.path = Path(path)
+        self.records: dict[str, DirRecord] = {}
+        self.dirty: set[str] = set()
+        self.seen: set[str] = set()
+        # Roots whose walk finished; records under them that no walk saw are
+        # dropped on close. Walks that stopped early leave theirs alone.
+        self.roots: set[str] = set()
+        # Pruned folders are never visited; their records are kept as is.
+        self.kept: set[str] = set()
+        self.hits = 0
+        self.misses = 0
+        self._started_ns = time.time_ns()
+        self._lock = threading.Lock()
+
+        # Only the index's own folder is created; a missing ~/System is left
+        # for `init` to report rather than being conjured up by a scan.
+        self.path.parent.mkdir(exist_ok=True)
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        if self._db.execute("PRAGMA user_version").fetchone()[0] != INDEX_VERSION:
+            self._db.execute("DROP TABLE IF EXISTS dirs")
+            self._db.execute(f"PRAGMA user_version = {INDEX_VERSION}")
+        self._db.execute(_SCHEMA)
+        if rebuild:
+            self._db.execute("DELETE FROM dirs")
+            self._db.commit()
+        else:
+            self._load()
+
+    def _load(self) -> None:
+        rows = self._db.execute(
+            "SELECT path, dev, ino, mtime_ns, files_size, files_allocated, file_count,"
+            " max_file, size, subdirs, big_files, links FROM dirs"
+        )
+        # Directory names cannot contain "/", so it doubles as the separator.
+        for (
+            path,
+            dev,
+            ino,
+            mtime_ns,
+            files_size,
+            files_allocated,
+            file_count,
+            max_file,
+            size,
+            subdirs,
+            big,
+            links,
+        ) in rows:
+            self.records[path] = DirRecord(
+                dev=dev,
+                ino=ino,
+                mtime_ns=mtime_ns,
+                files_size=files_size,
+                files_allocated=files_allocated,
+                file_count=file_count,
+                max_file=max_file,
+                size=size,
+                subdirs=subdirs.split("/") if subdirs else [],
+                big_files=[tuple(item) for item in json.loads(big)],
+                links=[tuple(item) for item in json.loads(links)],
+            )
+
+    def add_root(self, path: str) -> None:
+        with self._lock:
+            self.roots.add(path)
+
+    def lookup(self, path: str, st: os.stat_result) -> DirRecord | None:
+        with self._lock:
+            self.seen.add(path)
+            record = self.records.get(path)
+            if record is not None and record.matches(st):
+                self.hits += 1
+                return record
+            self.misses += 1
+            return None
+
+    def pruned(self, path: str) -> int | None:
+        # Size from the last walk that went inside `path`, if any.
+        with self._lock:
+            self.kept.add(path)
+            record = self.records.get(path)
+            return record.size if record is not None else None
+
+    def store(
+        self,
+        path: str,
+        st: os.stat_result,
+        files_size: int,
+        files_allocated: int,
+        file_count: int,
+        max_file: int,
+        subdirs: list[str],
+        big_files: list[tuple[str, int]],
+        links: list[tuple[str, int, int, int, int]],
+    ) -> None:
+        record = DirRecord(
+            dev=st.st_dev,
+            ino=st.st_ino,
+            mtime_ns=st.st_mtime_ns,
+            files_size=files_size,
+            files_allocated=files_allocated,
+            file_count=file_count,
+            max_file=max_file,
+            size=0,
+            subdirs=subdirs,
+            big_files=big_files,
+            links=links,
+        )
+        with self._lock:
+            self.dirty.add(path)
+            if st.st_mtime_ns > self._started_ns - MTIME_SLACK_NS:
+                self.records.pop(path, None)
+            else:
+                self.records[path] = record
+
+    def set_size(self, path: str, size: int) -> None:
+        with self._lock:
+            record = self.records.get(path)
+            if record is not None and record.size != size:
+                record.size = size
+                self.dirty.add(path)
+
+    def _is_stale(self, path: str) -> bool:
+        if path in self.seen:
+            return False
+        if self.kept and any(
+            path == kept or path.startswith(kept + os.sep) for kept in self.kept
+        ):
+            return False
+        return any(path == root or path.startswith(root + os.sep) for root in self.roots)
+
+    def close(self) -> None:
+        if self._db is None:
+            return
+        # A timed-out check may still be scanning; write a consistent snapshot.
+        with self._lock:
+            records = dict(self.records)
+            dirty = set(self.dirty)
+            stale = [path for path in records if self._is_stale(path)]
+        removed = [path for path in dirty if path not in records]
+        rows = []
+        for path in dirty:
+            record = records.get(path)
+            if record is None:
+                continue
+            rows.append(
+                (
+                    path,
+                    record.dev,
+                    record.ino,
+                    record.mtime_ns,
+                    record.files_size,
+                    record.files_allocated,
+                    record.file_count,
+                    record.max_file,
+                    record.size,
+                    "/".join(record.subdirs),
+                    json.dumps(record.big_files),
+                    json.dumps(record.links),
+                )
+            )
+        with self._db:
+            self._db.executemany(
+                "DELETE FROM dirs WHERE path = ?", [(path,) for path in stale + removed]
+            )
+            self._db.executemany(
+                "INSERT OR REPLACE INTO dirs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+        self._db.close()
+        self._db = None
@@ -0,0 +1,131 @@
+import fnmatch
+import re
+
+
+_META = set(".^$*+?{}[]|()")
+_GLOBAL_FLAGS = re.compile(r"^\(\?([aiLmsux]+)\)")
+_BACKREF = re.compile(r"\\[1-9]|\(\?P=")
+
+
+def _literal(body: str) -> str | None:
+    # The plain string `body` matches, or None if it uses any regex syntax.
+    out = []
+    escaped = False
+    for char in body:
+        if escaped:
+            if char.isalnum():
+                return None
+            out.append(char)
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        elif char in _META:
+            return None
+        else:
+            out.append(char)
+    if escaped:
+        return None
+    return "".join(out)
+
+
+def _split_anchors(pattern: str) -> tuple[bool, str, bool]:
+    start = pattern.startswith("^")
+    body = pattern[1:] if start else pattern
+    end = body.endswith("$") and not body.endswith("\\$")
+    if end:
+        body = body[:-1]
+    return start, body, end
+
+
+class Allowlist:
+    # One allowlist from the spec, compiled once. Patterns keep their
+    # `re.search` meaning, but the literal ones never reach the regex engine:
+    # "^name$" joins the name set, "^prefix", "suffix$" and bare "text" become
+    # startswith/endswith/`in` checks, and whatever is left is merged into a
+    # single alternation.
+    __slots__ = ("names", "prefixes", "suffixes", "substrings", "regex", "separate")
+
+    def __init__(self, names=(), patterns=()):
+        self.names = frozenset(names)
+        prefixes, suffixes, substrings, merged = [], [], [], []
+        self.separate: list[re.Pattern] = []
+        for pattern in patterns:
+            start, body, end = _split_anchors(pattern)
+            literal = _literal(body)
+            if literal is not None:
+                if start and end:
+                    self.names |= {literal}
+                elif start:
+                    prefixes.append(literal)
+                elif end:
+                    suffixes.append(literal)
+                else:
+                    substrings.append(literal)
+                continue
+            if _BACKREF.search(pattern):
+                # Group numbers shift inside an alternation.
+                self.separate.append(re.compile(pattern))
+                continue
+            flags = _GLOBAL_FLAGS.match(pattern)
+            if flags:
+                pattern = f"(?{flags.group(1)}:{pattern[flags.end():]})"
+            merged.append(f"(?:{pattern})")
+        self.prefixes = tuple(prefixes)
+        self.suffixes = tuple(suffixes)
+        self.substrings = tuple(substrings)
+        self.regex = None
+        if merged:
+            try:
+                self.regex = re.compile("|".join(merged))
+            except re.error:
+                self.separate.extend(re.compile(pattern[3:-1]) for pattern in merged)
+
+    def __contains__(self, name: str) -> bool:
+        if name in self.names:
+            return True
+        if self.prefixes and name.startswith(self.prefixes):
+            return True
+        if self.suffixes and name.endswith(self.suffixes):
+            return True
+        for text in self.substrings:
+            if text in name:
+                return True
+        if self.regex is not None and self.regex.search(name):
+            return True
+        return any(pattern.search(name) for pattern in self.separate)
+
+
+def compile_allowlist(config: dict | None, where: str = "allowlist") -> tuple[Allowlist, list[str]]:
+    # Returns the matcher plus one message per pattern that does not compile;
+    # those patterns are left out.
+    config = config or {}
+    valid = []
+    errors = []
+    for pattern in config.get("patterns", []) or []:
+        try:
+            re.compile(pattern)
+        except (re.error, TypeError) as exc:
+            errors.append(f"{where}: invalid pattern {pattern!r}: {exc}")
+            continue
+        valid.append(pattern)
+    return Allowlist(config.get("names", []) or [], valid), errors
+
+
+def compile_prune(config: dict | None, where: str = "prune") -> tuple[Allowlist, list[str]]:
+    # Prune rules take names, shell globs and regexes. Globs without wildcards
+    # are plain names; the rest become anchored patterns in the same matcher.
+    config = config or {}
+    names = list(config.get("names", []) or [])
+    patterns = []
+    for glob in config.get("globs", []) or []:
+        if not isinstance(glob, str):
+            continue
+        if any(char in glob for char in "*?["):
+            patterns.append("^" + fnmatch.translate(glob))
+        else:
+            names.append(glob)
+    matcher, errors = compile_allowlist(
+        {"names": names, "patterns": patterns + list(config.get("patterns", []) or [])},
+        where,
+    )
+    return matcher, errors
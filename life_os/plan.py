@@ -0,0 +1,493 @@
+import glob
+import os
+from collections.abc import Mapping
+from dataclasses import dataclass
+from pathlib import Path
+from types import MappingProxyType
+
+from life_os.matcher import Allowlist
+from life_os.reconcile import FolderTree, folder_tree
+from life_os.rules import DAY, MB, Rule, RuleSet, compile_rule
+from life_os.spec import LoadedSpec
+
+
+_EMPTY = Allowlist()
+_DEFAULT_GROUPS = {"dmg": [".dmg"], "pkg": [".pkg"], "zip": [".zip"]}
+_DEFAULT_DEDUPE_ROOTS = ["~/Documents", "~/Workspace/assets", "~/Downloads"]
+ARCHIVE_FORMATS = ("tar.gz", "tar.bz2", "tar.xz", "zip")
+
+
+class SpecError(ValueError):
+    # Raised by compile_plan with every problem found, one per line.
+    def __init__(self, errors: list[str]):
+        super().__init__("\n".join(errors))
+        self.errors = errors
+
+
+@dataclass(frozen=True, slots=True)
+class Root:
+    # One scan root. `path` has "~" expanded but may still hold glob
+    # characters, which are matched against the disk by paths().
+    path: Path
+    jobs: int = 1
+    one_filesystem: bool = True
+
+    def workers(self, override: int | None = None) -> int:
+        # `--jobs` on the command line wins over the root's own setting.
+        return max(override or self.jobs, 1)
+
+    def paths(self) -> list[Path]:
+        raw = os.fspath(self.path)
+        if glob.has_magic(raw):
+            return [Path(match) for match in sorted(glob.glob(raw))]
+        return [self.path]
+
+
+@dataclass(frozen=True, slots=True)
+class FolderPlan:
+    label: str
+    path: Path
+    tree: FolderTree
+
+
+@dataclass(frozen=True, slots=True)
+class DesktopHygiene:
+    allowlist: Allowlist
+    rules: RuleSet
+
+
+@dataclass(frozen=True, slots=True)
+class DownloadsHygiene:
+    age_days: int
+    top_n: int
+    allowlist: Allowlist
+    # Lower-case extension -> report group.
+    groups: Mapping[str, str]
+    # Selects items older than age_days and tags each with its "group".
+    rules: RuleSet
+
+
+@dataclass(frozen=True, slots=True)
+class CachesHygiene:
+    warn_over: int
+    roots: tuple[Root, ...]
+
+
+@dataclass(frozen=True, slots=True)
+class LargeFilesHygiene:
+    min_size: int
+    top_n: int
+    roots: tuple[Root, ...]
+    streaming: bool
+    collapse_ratio: float | None
+
+
+@dataclass(frozen=True, slots=True)
+class HygienePlan:
+    desktop: DesktopHygiene
+    downloads: DownloadsHygiene
+    caches: CachesHygiene
+    large_files: LargeFilesHygiene
+    prune: Allowlist | None
+    estimate_pruned: bool
+
+
+@dataclass(frozen=True, slots=True)
+class DesktopCleanup:
+    allowlist: Allowlist
+    # Selects everything and tags trash extensions with "classification".
+    rules: RuleSet
+
+
+@dataclass(frozen=True, slots=True)
+class DownloadsCleanup:
+    allowlist: Allowlist
+    max_age_days: int
+    large_min_size: int
+    # Selects old or large items and tags trash extensions with "classification".
+    rules: RuleSet
+
+
+@dataclass(frozen=True, slots=True)
+class ArchivePlan:
+    dir: Path
+    format: str
+    jobs: int
+    # Bytes of originals being compressed at once.
+    max_in_flight: int
+
+
+@dataclass(frozen=True, slots=True)
+class CleanupPlan:
+    trash_dir: Path
+    journal: Path | None
+    archive: ArchivePlan
+    # Lower-case extensions whose files are classified "trash".
+    trash_extensions: frozenset[str]
+    desktop: DesktopCleanup
+    downloads: DownloadsCleanup
+    cache_roots: tuple[Root, ...]
+    large_min_size: int
+    large_roots: tuple[Root, ...]
+    prune: Allowlist | None
+    estimate_pruned: bool
+
+
+@dataclass(frozen=True, slots=True)
+class DedupePlan:
+    roots: tuple[Root, ...]
+    min_size: int
+    edge: int
+    jobs: int
+    top_n: int
+
+
+@dataclass(frozen=True, slots=True)
+class DoctorPlan:
+    timeout: float | None
+    timeouts: Mapping[str, float]
+    home_timeout: float | None
+
+    def timeout_for(self, name: str) -> float | None:
+        return self.timeouts.get(name, self.timeout)
+
+
+@dataclass(frozen=True, slots=True)
+class SpecPlan:
+    # The spec compiled once per run: paths expanded against one home,
+    # sizes in bytes, matchers compiled and lookups built. Commands read
+    # this rather than the raw spec.
+    home: Path
+    workspace: Path
+    system: Path
+    documents: Path
+    desktop: Path
+    downloads: Path
+    folders: tuple[FolderPlan, ...]
+    hygiene: HygienePlan
+    cleanup: CleanupPlan
+    dedupe: DedupePlan
+    doctor: DoctorPlan
+    index_path: Path | None
+    watch_state_path: Path | None
+
+    def large_floor(self) -> int:
+        # Smallest large-file threshold any check or cleanup step uses.
+        return min(self.hygiene.large_files.min_size, self.cleanup.large_min_size)
+
+    def roots(self) -> list[Root]:
+        # Every cache and large-file root from both sections.
+        return [
+            *self.hygiene.caches.roots,
+            *self.hygiene.large_files.roots,
+            *self.cleanup.cache_roots,
+            *self.cleanup.large_roots,
+        ]
+
+
+class _Compiler:
+    # Reads values out of the raw spec, recording a message for anything of
+    # the wrong type so all problems can be reported at once.
+    def __init__(self, loaded: LoadedSpec, home: Path):
+        self.loaded = loaded
+        self.home = home
+        # Allowlists and prune rules were shape-checked while the spec loaded.
+        self.errors: list[str] = list(loaded.invalid)
+
+    def section(self, parent: dict, key: str, where: str) -> dict:
+        value = parent.get(key)
+        if value is None:
+            return {}
+        if not isinstance(value, dict):
+            self.errors.append(f"{where}.{key}: expected a mapping")
+            return {}
+        return value
+
+    def number(self, config: dict, key: str, default, where: str, kind=int):
+        # A key set to null (e.g. a blank `top_n:`) means "use the default".
+        value = config.get(key)
+        if value is None:
+            return default
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            self.errors.append(f"{where}.{key}: expected a number, got {value!r}")
+            return default
+        if value < 0:
+            self.errors.append(f"{where}.{key}: must not be negative")
+            return default
+        return kind(value)
+
+    def flag(self, config: dict, key: str, default: bool, where: str) -> bool:
+        value = config.get(key, default)
+        if not isinstance(value, bool):
+            self.errors.append(f"{where}.{key}: expected true or false, got {value!r}")
+            return default
+        return value
+
+    def strings(self, config: dict, key: str, default: list, where: str) -> list[str]:
+        value = config.get(key, default)
+        if value is None:
+            return []
+        if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+            self.errors.append(f"{where}.{key}: expected a list of strings")
+            return []
+        return value
+
+    def path(self, raw, where: str) -> Path | None:
+        if not isinstance(raw, str) or not raw:
+            self.errors.append(f"{where}: expected a path, got {raw!r}")
+            return None
+        # Only a leading "~" means the home folder.
+        if raw == "~" or raw.startswith("~/"):
+            return self.home / raw[2:] if raw != "~" else self.home
+        return Path(raw)
+
+    def roots(self, config: dict, key: str, where: str, default: list | None = None):
+        entries = config.get(key, default or [])
+        if entries is None:
+            return ()
+        if not isinstance(entries, list):
+            self.errors.append(f"{where}.{key}: expected a list of roots")
+            return ()
+        roots = []
+        for number, entry in enumerate(entries):
+            at = f"{where}.{key}[{number}]"
+            options = entry if isinstance(entry, dict) else {"path": entry}
+            path = self.path(options.get("path"), f"{at}.path")
+            jobs = self.number(options, "jobs", 1, at)
+            one_filesystem = self.flag(options, "one_filesystem", True, at)
+            if path is not None:
+                roots.append(Root(path, max(jobs or 1, 1), one_filesystem))
+        return tuple(roots)
+
+    def allowlist(self, section: str, key: str) -> Allowlist:
+        return self.loaded.allowlists.get((section, key)) or _EMPTY
+
+    def prune(self, section: str, config: dict) -> tuple[Allowlist | None, bool]:
+        prune = self.section(config, "prune", section)
+        estimate = self.flag(prune, "estimate_size", False, f"{section}.prune")
+        return self.loaded.prunes.get(section), estimate
+
+    def extensions(self, values: list[str]) -> frozenset[str]:
+        return frozenset(value.lower() for value in values)
+
+    def rules(self, config: dict, where: str) -> list[Rule]:
+        # Extra rules from the section's `match` list. They come before the
+        # built-in ones, so their tags win.
+        entries = config.get("match") or []
+        if not isinstance(entries, list):
+            self.errors.append(f"{where}.match: expected a list of rules")
+            return []
+        rules = []
+        for number, entry in enumerate(entries):
+            rule, errors = compile_rule(entry, f"{where}.match[{number}]")
+            self.errors.extend(errors)
+            if rule is not None:
+                rules.append(rule)
+        return rules
+
+
+def _tag(extensions: frozenset[str], key: str, value: str) -> Rule:
+    return Rule(extensions=extensions, select=False, tags=MappingProxyType({key: value}))
+
+
+def _folders(compiler: _Compiler, fs: dict) -> tuple[list[FolderPlan], dict[str, Path]]:
+    folders: list[FolderPlan] = []
+    paths: dict[str, Path] = {}
+    for key in ("workspace", "system", "documents"):
+        if key not in fs:
+            compiler.errors.append(f"filesystem.{key}.path: required")
+    for key, config in fs.items():
+        where = f"filesystem.{key}"
+        if not isinstance(config, dict):
+            compiler.errors.append(f"{where}: expected a mapping")
+            continue
+        if not config.get("path"):
+            compiler.errors.append(f"{where}.path: required")
+            continue
+        path = compiler.path(config["path"], f"{where}.path")
+        if path is None:
+            continue
+        paths[key] = path
+        try:
+            tree = folder_tree(config)
+        except ValueError as exc:
+            compiler.errors.append(f"{where}: {exc}")
+            continue
+        folders.append(FolderPlan(key.replace("_", " ").title(), path, tree))
+    return folders, paths
+
+
+def compile_plan(loaded: LoadedSpec, home: Path) -> SpecPlan:
+    spec = loaded.spec
+    c = _Compiler(loaded, Path(home))
+
+    fs = c.section(spec, "filesystem", "spec")
+    folders, paths = _folders(c, fs)
+
+    hygiene = c.section(spec, "hygiene", "spec")
+    h_downloads = c.section(hygiene, "downloads", "hygiene")
+    # An explicit `groups: {}` turns grouping off; only a missing key gets the defaults.
+    groups = c.section(h_downloads, "groups", "hygiene.downloads")
+    if "groups" not in h_downloads:
+        groups = _DEFAULT_GROUPS
+    ext_to_group = {}
+    for group in groups:
+        for ext in c.strings(groups, group, [], "hygiene.downloads.groups"):
+            ext_to_group[ext.lower()] = group
+    h_desktop = c.section(hygiene, "desktop", "hygiene")
+    age_days = c.number(h_downloads, "age_days", 7, "hygiene.downloads")
+    group_rules = [
+        _tag(frozenset(ext for ext, name in ext_to_group.items() if name == group), "group", group)
+        for group in dict.fromkeys(ext_to_group.values())
+    ]
+    h_caches = c.section(hygiene, "caches", "hygiene")
+    h_large = c.section(hygiene, "large_files", "hygiene")
+    collapse = c.number(h_large, "collapse_ratio", None, "hygiene.large_files", float)
+    h_prune, h_estimate = c.prune("hygiene", hygiene)
+    hygiene_plan = HygienePlan(
+        desktop=DesktopHygiene(
+            allowlist=c.allowlist("hygiene", "desktop"),
+            rules=RuleSet(
+                [*c.rules(h_desktop, "hygiene.desktop"), Rule()],
+                exclude=c.allowlist("hygiene", "desktop"),
+            ),
+        ),
+        downloads=DownloadsHygiene(
+            age_days=age_days,
+            top_n=max(c.number(h_downloads, "top_n", 5, "hygiene.downloads"), 1),
+            allowlist=c.allowlist("hygiene", "downloads"),
+            groups=MappingProxyType(ext_to_group),
+            rules=RuleSet(
+                [
+                    *c.rules(h_downloads, "hygiene.downloads"),
+                    Rule(older_than=age_days * DAY),
+                    *group_rules,
+                ],
+                exclude=c.allowlist("hygiene", "downloads"),
+            ),
+        ),
+        caches=CachesHygiene(
+            warn_over=c.number(h_caches, "warn_over_mb", 0, "hygiene.caches") * MB,
+            roots=c.roots(h_caches, "paths", "hygiene.caches"),
+        ),
+        large_files=LargeFilesHygiene(
+            min_size=c.number(h_large, "min_size_mb", 250, "hygiene.large_files") * MB,
+            top_n=max(c.number(h_large, "top_n", 10, "hygiene.large_files"), 1),
+            roots=c.roots(h_large, "roots", "hygiene.large_files"),
+            streaming=c.flag(h_large, "streaming", False, "hygiene.large_files"),
+            collapse_ratio=collapse or None,
+        ),
+        prune=h_prune,
+        estimate_pruned=h_estimate,
+    )
+
+    cleanup = c.section(spec, "cleanup", "spec")
+    actions = c.section(cleanup, "actions", "cleanup")
+    trash_dir = c.path(actions.get("trash_dir", "~/.Trash"), "cleanup.actions.trash_dir")
+    journal = actions.get("journal")
+    archive = c.section(actions, "archive", "cleanup.actions")
+    archive_format = archive.get("format", "tar.gz")
+    if archive_format not in ARCHIVE_FORMATS:
+        c.errors.append(
+            f"cleanup.actions.archive.format: expected one of {', '.join(ARCHIVE_FORMATS)}, "
+            f"got {archive_format!r}"
+        )
+    archive_dir = c.path(archive.get("dir", "~/Workspace/archive"), "cleanup.actions.archive.dir")
+    c_downloads = c.section(cleanup, "downloads", "cleanup")
+    rules = c.section(c_downloads, "rules", "cleanup.downloads")
+    c_desktop = c.section(cleanup, "desktop", "cleanup")
+    trash_extensions = c.extensions(
+        c.strings(rules, "trash_extensions", [], "cleanup.downloads.rules")
+    )
+    trash_rules = [_tag(trash_extensions, "classification", "trash")] if trash_extensions else []
+    max_age_days = c.number(rules, "max_age_days", 7, "cleanup.downloads.rules")
+    large_min_size = c.number(rules, "large_min_size_mb", 0, "cleanup.downloads.rules") * MB
+    download_rules = [
+        *c.rules(c_downloads, "cleanup.downloads"),
+        Rule(older_than=max_age_days * DAY),
+    ]
+    if large_min_size > 0:
+        download_rules.append(Rule(min_size=large_min_size))
+    c_caches = c.section(cleanup, "caches", "cleanup")
+    c_large = c.section(cleanup, "large_files", "cleanup")
+    c_prune, c_estimate = c.prune("cleanup", cleanup)
+    cleanup_plan = CleanupPlan(
+        trash_dir=trash_dir or c.home / ".Trash",
+        journal=c.path(journal, "cleanup.actions.journal") if journal else None,
+        archive=ArchivePlan(
+            dir=archive_dir or c.home / "Workspace" / "archive",
+            format=archive_format,
+            jobs=max(c.number(archive, "jobs", 4, "cleanup.actions.archive"), 1),
+            max_in_flight=c.number(archive, "max_in_flight_mb", 1024, "cleanup.actions.archive")
+            * MB,
+        ),
+        trash_extensions=trash_extensions,
+        desktop=DesktopCleanup(
+            allowlist=c.allowlist("cleanup", "desktop"),
+            rules=RuleSet(
+                [*c.rules(c_desktop, "cleanup.desktop"), Rule(), *trash_rules],
+                exclude=c.allowlist("cleanup", "desktop"),
+            ),
+        ),
+        downloads=DownloadsCleanup(
+            allowlist=c.allowlist("cleanup", "downloads"),
+            max_age_days=max_age_days,
+            large_min_size=large_min_size,
+            rules=RuleSet(
+                [*download_rules, *trash_rules],
+                exclude=c.allowlist("cleanup", "downloads"),
+            ),
+        ),
+        cache_roots=c.roots(c_caches, "paths", "cleanup.caches"),
+        large_min_size=c.number(c_large, "min_size_mb", 250, "cleanup.large_files") * MB,
+        large_roots=c.roots(c_large, "roots", "cleanup.large_files"),
+        prune=c_prune,
+        estimate_pruned=c_estimate,
+    )
+
+    dedupe = c.section(spec, "dedupe", "spec")
+    dedupe_plan = DedupePlan(
+        roots=c.roots(dedupe, "roots", "dedupe", _DEFAULT_DEDUPE_ROOTS),
+        min_size=c.number(dedupe, "min_size_kb", 1, "dedupe") * 1024,
+        edge=c.number(dedupe, "edge_kb", 4, "dedupe") * 1024,
+        jobs=max(c.number(dedupe, "jobs", 4, "dedupe"), 1),
+        top_n=max(c.number(dedupe, "top_n", 10, "dedupe"), 1),
+    )
+
+    doctor = c.section(spec, "doctor", "spec")
+    per_check = c.section(doctor, "timeouts", "doctor")
+    doctor_plan = DoctorPlan(
+        timeout=c.number(doctor, "timeout_seconds", None, "doctor", float),
+        timeouts=MappingProxyType(
+            {
+                name: c.number(per_check, name, None, "doctor.timeouts", float)
+                for name in per_check
+            }
+        ),
+        home_timeout=c.number(doctor, "home_timeout_seconds", None, "doctor", float),
+    )
+
+    index = c.section(spec, "index", "spec")
+    watch = c.section(spec, "watch", "spec")
+    index_path = c.path(index["path"], "index.path") if index.get("path") else None
+    state_path = watch.get("state_path")
+    watch_state_path = c.path(state_path, "watch.state_path") if state_path else None
+
+    if c.errors:
+        raise SpecError(c.errors)
+
+    return SpecPlan(
+        home=c.home,
+        workspace=paths["workspace"],
+        system=paths["system"],
+        documents=paths["documents"],
+        desktop=paths.get("desktop", c.home / "Desktop"),
+        downloads=paths.get("downloads", c.home / "Downloads"),
+        folders=tuple(folders),
+        hygiene=hygiene_plan,
+        cleanup=cleanup_plan,
+        dedupe=dedupe_plan,
+        doctor=doctor_plan,
+        index_path=index_path,
+        watch_state_path=watch_state_path,
+    )
@@ -0,0 +1,149 @@
+import contextvars
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+
+# Active profiler, or None. Everything below is a cheap no-op while it is None.
+_profiler: "Profiler | None" = None
+_current: contextvars.ContextVar["Span | None"] = contextvars.ContextVar(
+    "life_os_span", default=None
+)
+
+
+class Span:
+    # One timed region (a check, a cleanup step or a root walk) with the
+    # filesystem work done inside it. Counters of nested spans are folded
+    # into their parent when they close, so a check's numbers include its
+    # walks.
+    __slots__ = (
+        "name",
+        "category",
+        "parent",
+        "tid",
+        "start_ns",
+        "end_ns",
+        "cpu_ns",
+        "dirs",
+        "stats",
+        "bytes",
+        "errors",
+        "_lock",
+    )
+
+    def __init__(self, name: str, category: str, parent: "Span | None"):
+        self.name = name
+        self.category = category
+        self.parent = parent
+        self.tid = threading.get_ident()
+        self.start_ns = time.perf_counter_ns()
+        self.end_ns = self.start_ns
+        self.cpu_ns = 0
+        self.dirs = 0
+        self.stats = 0
+        self.bytes = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def add(self, dirs: int = 0, stats: int = 0, bytes: int = 0, errors: int = 0) -> None:
+        # Parallel walkers update the same span from several threads.
+        with self._lock:
+            self.dirs += dirs
+            self.stats += stats
+            self.bytes += bytes
+            self.errors += errors
+
+    @property
+    def wall_ns(self) -> int:
+        return self.end_ns - self.start_ns
+
+
+class Profiler:
+    def __init__(self):
+        self.origin_ns = time.perf_counter_ns()
+        self.spans: list[Span] = []
+        self._lock = threading.Lock()
+
+    def record(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def top_level(self) -> list[Span]:
+        return sorted(
+            (span for span in self.spans if span.parent is None),
+            key=lambda span: span.start_ns,
+        )
+
+    def chrome_trace(self) -> dict:
+        # Chrome trace-event format ("X" complete events, microseconds);
+        # load it in chrome://tracing or https://ui.perfetto.dev.
+        pid = os.getpid()
+        events = []
+        for span in sorted(self.spans, key=lambda span: span.start_ns):
+            events.append(
+                {
+                    "name": span.name,
+                    "cat": span.category,
+                    "ph": "X",
+                    "ts": (span.start_ns - self.origin_ns) / 1000,
+                    "dur": span.wall_ns / 1000,
+                    "pid": pid,
+                    "tid": span.tid,
+                    "args": {
+                        "cpu_ms": span.cpu_ns / 1e6,
+                        "dirs": span.dirs,
+                        "stats": span.stats,
+                        "bytes": span.bytes,
+                        "errors": span.errors,
+                    },
+                }
+            )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def enable() -> Profiler:
+    global _profiler
+    _profiler = Profiler()
+    return _profiler
+
+
+def disable() -> None:
+    global _profiler
+    _profiler = None
+
+
+@contextmanager
+def span(name: str, category: str = "walk"):
+    profiler = _profiler
+    if profiler is None:
+        yield None
+        return
+    parent = _current.get()
+    current = Span(name, category, parent)
+    token = _current.set(current)
+    cpu_start = time.thread_time_ns()
+    try:
+        yield current
+    finally:
+        # CPU time is the opening thread's; parallel walker threads only add
+        # to the counters.
+        current.cpu_ns = time.thread_time_ns() - cpu_start
+        current.end_ns = time.perf_counter_ns()
+        _current.reset(token)
+        profiler.record(current)
+        if parent is not None:
+            parent.add(current.dirs, current.stats, current.bytes, current.errors)
+
+
+def count(dirs: int = 0, stats: int = 0, bytes: int = 0, errors: int = 0) -> None:
+    current = _current.get()
+    if current is not None:
+        current.add(dirs, stats, bytes, errors)
+
+
+def in_context(fn):
+    # Threads do not inherit context variables. Wrap a thread's target with
+    # this (once per thread) so its work counts towards the caller's span.
+    context = contextvars.copy_context()
+    return lambda *args: context.run(fn, *args)
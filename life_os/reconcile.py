@@ -0,0 +1,135 @@
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from life_os import profile
+
+
+# A desired folder tree is a nested dict: folder name -> its own subtree.
+FolderTree = dict[str, "FolderTree"]
+
+
+def _add_path(tree: FolderTree, raw: str) -> FolderTree:
+    node = tree
+    for part in Path(raw).parts:
+        node = node.setdefault(part, {})
+    return node
+
+
+def _merge(tree: FolderTree, spec) -> None:
+    # Accepts a name ("a" or "a/b"), a list of names and mappings, or a
+    # mapping of name -> children (children may be null, a list or a mapping).
+    if spec is None:
+        return
+    if isinstance(spec, str):
+        _add_path(tree, spec)
+    elif isinstance(spec, dict):
+        for name, children in spec.items():
+            _merge(_add_path(tree, str(name)), children)
+    elif isinstance(spec, list):
+        for item in spec:
+            _merge(tree, item)
+    else:
+        raise ValueError(f"folder entries must be names, lists or mappings, not {spec!r}")
+
+
+def folder_tree(config: dict) -> FolderTree:
+    # `folders` nests to any depth; `required_folders` plus one level of
+    # `subfolders` are the older spellings and end up in the same tree.
+    tree: FolderTree = {}
+    _merge(tree, config.get("required_folders"))
+    subfolders = config.get("subfolders") or {}
+    if not isinstance(subfolders, dict):
+        raise ValueError("subfolders must map a folder name to its subfolders")
+    for parent, names in subfolders.items():
+        _merge(_add_path(tree, str(parent)), names)
+    _merge(tree, config.get("folders"))
+    return tree
+
+
+@dataclass
+class ReconcilePlan:
+    root: Path
+    root_missing: bool = False
+    # Folders to create, parents before children.
+    create: list[Path] = field(default_factory=list)
+    # Deepest folders of each missing branch; one os.makedirs each creates
+    # everything in `create`.
+    leaves: list[Path] = field(default_factory=list)
+    # Top of each missing branch, with how many folders sit below it.
+    missing: list[tuple[Path, int]] = field(default_factory=list)
+    # Desired folders whose name is taken by something that is not a folder.
+    conflicts: list[Path] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not (self.root_missing or self.create or self.conflicts)
+
+    def apply(self) -> list[str]:
+        for leaf in self.leaves:
+            os.makedirs(leaf, exist_ok=True)
+        created = [str(path) for path in self.create]
+        return [str(self.root), *created] if self.root_missing else created
+
+
+def _plan_missing(plan: ReconcilePlan, path: Path, tree: FolderTree) -> None:
+    # Nothing below a missing folder exists, so no syscalls are needed.
+    stack = [(path, tree)]
+    while stack:
+        current, node = stack.pop()
+        plan.create.append(current)
+        if not node:
+            plan.leaves.append(current)
+        # Reversed so names come out in spec order.
+        stack.extend((current / name, child) for name, child in reversed(node.items()))
+
+
+def plan_folders(root: Path, tree: FolderTree) -> ReconcilePlan:
+    # Diffs `tree` against the disk with one scandir per existing folder that
+    # has desired children; folders without children are only checked for
+    # by name in their parent's listing.
+    plan = ReconcilePlan(root=Path(root))
+    if not os.path.isdir(root):
+        if os.path.lexists(root):
+            plan.conflicts.append(plan.root)
+            return plan
+        plan.root_missing = True
+        if tree:
+            for name, child in tree.items():
+                _plan_missing(plan, plan.root / name, child)
+        else:
+            plan.leaves.append(plan.root)
+        return plan
+
+    stack = [(plan.root, tree)]
+    while stack:
+        current, node = stack.pop()
+        if not node:
+            continue
+        children = []
+        folders: set[str] = set()
+        others: set[str] = set()
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+                    (folders if is_dir else others).add(entry.name)
+        except OSError:
+            profile.count(errors=1)
+            continue
+        profile.count(dirs=1)
+        for name, child in node.items():
+            path = current / name
+            if name in folders:
+                children.append((path, child))
+            elif name in others:
+                plan.conflicts.append(path)
+            else:
+                before = len(plan.create)
+                _plan_missing(plan, path, child)
+                plan.missing.append((path, len(plan.create) - before - 1))
+        stack.extend(reversed(children))
+    return plan
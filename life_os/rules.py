@@ -0,0 +1,268 @@
+import os
+import time
+from collections.abc import Callable, Iterable, Mapping
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import MappingProxyType
+
+from life_os import profile
+from life_os.matcher import Allowlist, compile_prune
+
+
+MB = 1024 * 1024
+DAY = 24 * 60 * 60
+
+_RULE_KEYS = {
+    "names",
+    "globs",
+    "patterns",
+    "ext",
+    "type",
+    "older_than_days",
+    "newer_than_days",
+    "min_size_mb",
+    "max_size_mb",
+    "select",
+    "set",
+}
+
+
+@dataclass(frozen=True, slots=True)
+class Rule:
+    # Predicates left as None always pass. Extensions only match files.
+    names: Allowlist | None = None
+    extensions: frozenset[str] | None = None
+    kind: str | None = None  # "file" | "dir"
+    # Seconds since the last modification.
+    older_than: float | None = None
+    newer_than: float | None = None
+    # Bytes; folders are measured recursively.
+    min_size: int | None = None
+    max_size: int | None = None
+    # Selecting rules decide which entries match; the others only add tags.
+    select: bool = True
+    tags: Mapping[str, str] = field(default_factory=lambda: MappingProxyType({}))
+
+
+@dataclass(slots=True)
+class RuleMatch:
+    path: Path
+    is_file: bool
+    # Tags from every matching rule; the first rule to set a key wins.
+    tags: dict[str, str]
+    size: int | None = None
+    age: float | None = None
+
+
+class _Facts:
+    # What the predicates look at, read at most once per entry and only when
+    # some rule still alive needs it.
+    __slots__ = ("entry", "now", "size_of", "_ext", "_is_file", "_is_dir", "_age", "_size")
+
+    def __init__(self, entry: os.DirEntry, now: float, size_of: Callable):
+        self.entry = entry
+        self.now = now
+        self.size_of = size_of
+        self._ext = self._is_file = self._is_dir = self._age = self._size = None
+
+    @property
+    def ext(self) -> str:
+        if self._ext is None:
+            self._ext = os.path.splitext(self.entry.name)[1].lower()
+        return self._ext
+
+    @property
+    def is_file(self) -> bool:
+        if self._is_file is None:
+            try:
+                self._is_file = self.entry.is_file(follow_symlinks=False)
+            except OSError:
+                self._is_file = False
+        return self._is_file
+
+    @property
+    def is_dir(self) -> bool:
+        if self._is_dir is None:
+            try:
+                self._is_dir = self.entry.is_dir(follow_symlinks=False)
+            except OSError:
+                self._is_dir = False
+        return self._is_dir
+
+    @property
+    def age(self) -> float | None:
+        if self._age is None:
+            try:
+                self._age = self.now - self.entry.stat(follow_symlinks=False).st_mtime
+            except OSError:
+                profile.count(errors=1)
+                self._age = False
+        return self._age if self._age is not False else None
+
+    @property
+    def size(self) -> int:
+        if self._size is None:
+            self._size = self.size_of(self.entry)
+        return self._size
+
+
+def _name_ok(rule: Rule, facts: _Facts) -> bool:
+    return rule.names is None or facts.entry.name in rule.names
+
+
+def _ext_ok(rule: Rule, facts: _Facts) -> bool:
+    return rule.extensions is None or facts.ext in rule.extensions
+
+
+def _kind_ok(rule: Rule, facts: _Facts) -> bool:
+    if rule.extensions is not None and not facts.is_file:
+        return False
+    if rule.kind == "file":
+        return facts.is_file
+    if rule.kind == "dir":
+        return facts.is_dir
+    return True
+
+
+def _age_ok(rule: Rule, facts: _Facts) -> bool:
+    if rule.older_than is None and rule.newer_than is None:
+        return True
+    age = facts.age
+    if age is None:
+        return False
+    if rule.older_than is not None and age < rule.older_than:
+        return False
+    return rule.newer_than is None or age < rule.newer_than
+
+
+def _size_ok(rule: Rule, facts: _Facts) -> bool:
+    if rule.min_size is None and rule.max_size is None:
+        return True
+    size = facts.size
+    if rule.min_size is not None and size < rule.min_size:
+        return False
+    return rule.max_size is None or size <= rule.max_size
+
+
+# Cheapest first: the name, then d_type, then one lstat, then a recursive size.
+_STAGES = (_name_ok, _ext_ok, _kind_ok, _age_ok, _size_ok)
+
+
+def _surviving(rules: Iterable[Rule], facts: _Facts) -> list[Rule]:
+    # Each stage runs over every rule still alive before the next, dearer
+    # stage starts, so an entry no rule can match costs no syscalls.
+    alive = list(rules)
+    for stage in _STAGES:
+        alive = [rule for rule in alive if stage(rule, facts)]
+        if not alive:
+            break
+    return alive
+
+
+class RuleSet:
+    # The rules for one folder listing, compiled once. `evaluate` makes one
+    # pass over the entries; adding a rule adds predicates, not traversals.
+    __slots__ = ("exclude", "selecting", "tagging")
+
+    def __init__(self, rules: Iterable[Rule] = (), exclude: Allowlist | None = None):
+        rules = list(rules)
+        self.exclude = exclude
+        self.selecting = tuple(rule for rule in rules if rule.select)
+        self.tagging = tuple(rule for rule in rules if not rule.select)
+
+    def evaluate(
+        self,
+        entries: Iterable[os.DirEntry],
+        size_of: Callable[[os.DirEntry], int],
+        now: float | None = None,
+        measure: bool = True,
+    ) -> list[RuleMatch]:
+        # With `measure`, every match carries its size and age; entries whose
+        # age cannot be read are left out.
+        now = time.time() if now is None else now
+        matches: list[RuleMatch] = []
+        for entry in entries:
+            if self.exclude is not None and entry.name in self.exclude:
+                continue
+            facts = _Facts(entry, now, size_of)
+            selected = _surviving(self.selecting, facts)
+            if not selected:
+                continue
+            tags: dict[str, str] = {}
+            for rule in (*selected, *_surviving(self.tagging, facts)):
+                for key, value in rule.tags.items():
+                    tags.setdefault(key, value)
+            match = RuleMatch(path=Path(entry.path), is_file=facts.is_file, tags=tags)
+            if measure:
+                match.age = facts.age
+                if match.age is None:
+                    continue
+                match.size = facts.size
+            matches.append(match)
+        return matches
+
+
+def _number(config: dict, key: str, where: str, errors: list[str]) -> float | None:
+    value = config.get(key)
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0:
+        errors.append(f"{where}.{key}: expected a non-negative number, got {value!r}")
+        return None
+    return value
+
+
+def compile_rule(config, where: str) -> tuple[Rule | None, list[str]]:
+    # One rule from the spec, e.g. {"ext": [".iso"], "older_than_days": 30,
+    # "set": {"group": "disk images"}}. Returns None with the problems found.
+    if not isinstance(config, dict):
+        return None, [f"{where}: expected a mapping"]
+    errors = [f"{where}: unknown key {key!r}" for key in config if key not in _RULE_KEYS]
+
+    names = None
+    if any(key in config for key in ("names", "globs", "patterns")):
+        names, pattern_errors = compile_prune(config, where)
+        errors.extend(pattern_errors)
+
+    extensions = None
+    ext = config.get("ext")
+    if ext is not None:
+        values = [ext] if isinstance(ext, str) else ext
+        if not isinstance(values, list) or not all(isinstance(item, str) for item in values):
+            errors.append(f"{where}.ext: expected an extension or a list of them")
+        else:
+            extensions = frozenset(value.lower() for value in values)
+
+    kind = config.get("type")
+    if kind not in (None, "file", "dir"):
+        errors.append(f"{where}.type: expected file or dir, got {kind!r}")
+
+    select = config.get("select", True)
+    if not isinstance(select, bool):
+        errors.append(f"{where}.select: expected true or false, got {select!r}")
+
+    tags = config.get("set") or {}
+    if not isinstance(tags, dict):
+        errors.append(f"{where}.set: expected a mapping of tags")
+        tags = {}
+
+    older = _number(config, "older_than_days", where, errors)
+    newer = _number(config, "newer_than_days", where, errors)
+    min_size = _number(config, "min_size_mb", where, errors)
+    max_size = _number(config, "max_size_mb", where, errors)
+    if errors:
+        return None, errors
+    return (
+        Rule(
+            names=names,
+            extensions=extensions,
+            kind=kind,
+            older_than=older * DAY if older is not None else None,
+            newer_than=newer * DAY if newer is not None else None,
+            min_size=int(min_size * MB) if min_size is not None else None,
+            max_size=int(max_size * MB) if max_size is not None else None,
+            select=select,
+            tags=MappingProxyType({str(key): str(value) for key, value in tags.items()}),
+        ),
+        [],
+    )
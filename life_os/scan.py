@@ -0,0 +1,820 @@
+import contextvars
+import heapq
+import math
+import os
+import random
+import stat
+import statistics
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from life_os import profile
+from life_os.index import BIG_FILE_FLOOR, SizeIndex
+from life_os.matcher import Allowlist
+from life_os.tree import FLAG_FILE, CompactTree
+
+
+# Two-sided 95% normal quantile used for estimate intervals.
+Z_95 = 1.96
+
+# Set by `cancellable`; every directory read checks it, so a background scan
+# whose result is no longer wanted stops at the next folder.
+_cancel: contextvars.ContextVar["threading.Event | None"] = contextvars.ContextVar(
+    "life_os_scan_cancel", default=None
+)
+
+
+class ScanCancelled(Exception):
+    pass
+
+
+@contextmanager
+def cancellable(event: threading.Event):
+    token = _cancel.set(event)
+    try:
+        yield
+    finally:
+        _cancel.reset(token)
+
+
+# _read_dir reports into a "sink": anything with a `files` counter and an
+# add_file(path, name, size, mtime) method for files at or over the threshold.
+# ScanResult, the streaming top-N heap and the compact tree writer all are.
+
+
+@dataclass
+class ScanResult:
+    root: Path
+    size: int = 0
+    files: int = 0
+    dirs: int = 0
+    dir_sizes: dict[Path, int] = field(default_factory=dict)
+    large: list[tuple[int, str, Path]] = field(default_factory=list)
+    tree: CompactTree | None = None
+    # Bytes actually allocated on disk (st_blocks), or None when not known,
+    # e.g. for a folder answered from inside another root's scan.
+    allocated: int | None = None
+    device: int | None = None
+    # Directories left out because they sit on another filesystem.
+    mounts: list[Path] = field(default_factory=list)
+    # Directories skipped by prune rules, and the part of their size that
+    # the index still remembered from an earlier walk.
+    pruned: int = 0
+    pruned_size: int = 0
+
+    def add_file(self, path: str, name: str, size: int, mtime: int) -> None:
+        self.large.append((size, "file", Path(path)))
+
+
+class _TreeSink:
+    __slots__ = ("tree", "node", "files")
+
+    def __init__(self, tree: CompactTree):
+        self.tree = tree
+        self.node = 0
+        self.files = 0
+
+    def add_file(self, path: str, name: str, size: int, mtime: int) -> None:
+        self.tree.add(self.node, name, size, mtime, FLAG_FILE)
+
+
+@dataclass
+class SizeEstimate:
+    # Size of a tree walked under a deadline. `exact` means every folder was
+    # read; otherwise `size` adds sampled estimates for unvisited folders and
+    # [low, high] is an approximate 95% interval (high is None when there were
+    # too few finished folders to extrapolate from). `stopped` means the walk
+    # ended early because the total was already past `stop_over`.
+    size: int
+    low: int
+    high: int | None
+    exact: bool = True
+    stopped: bool = False
+    allocated: int | None = None
+    unvisited: int = 0
+
+
+class _Walk:
+    # Per-walk state shared by every directory read: inodes with more than one
+    # link that were already counted, the root's device, the running
+    # allocated-bytes total and the prune rules. Parallel walkers share one
+    # instance.
+    __slots__ = (
+        "device",
+        "one_filesystem",
+        "seen",
+        "allocated",
+        "mounts",
+        "prune",
+        "estimate",
+        "pruned",
+        "pruned_size",
+        "_lock",
+    )
+
+    def __init__(
+        self,
+        device: int,
+        one_filesystem: bool = True,
+        prune: Allowlist | None = None,
+        estimate: bool = False,
+    ):
+        self.device = device
+        self.one_filesystem = one_filesystem
+        self.seen: set[tuple[int, int]] = set()
+        self.allocated = 0
+        self.mounts: list[str] = []
+        self.prune = prune
+        self.estimate = estimate
+        self.pruned = 0
+        self.pruned_size = 0
+        self._lock = threading.Lock()
+
+    def skip(self, path: str, index: SizeIndex | None) -> None:
+        size = index.pruned(path) if index is not None and self.estimate else None
+        with self._lock:
+            self.pruned += 1
+            self.pruned_size += size or 0
+
+    def crosses(self, path: str, st: os.stat_result) -> bool:
+        if not self.one_filesystem or st.st_dev == self.device:
+            return False
+        with self._lock:
+            self.mounts.append(path)
+        return True
+
+    def claim(self, dev: int, ino: int) -> bool:
+        # Only hard-linked files can be reached twice, so the set stays small.
+        key = (dev, ino)
+        with self._lock:
+            if key in self.seen:
+                return False
+            self.seen.add(key)
+            return True
+
+    def add(self, allocated: int) -> None:
+        with self._lock:
+            self.allocated += allocated
+
+    def finish(self, result: ScanResult) -> None:
+        result.allocated = self.allocated
+        result.device = self.device
+        result.mounts = [Path(path) for path in self.mounts]
+        result.pruned = self.pruned
+        result.pruned_size = self.pruned_size
+
+
+def list_dir(path: Path) -> list[os.DirEntry]:
+    try:
+        with os.scandir(path) as it:
+            entries = list(it)
+    except OSError:
+        profile.count(errors=1)
+        return []
+    profile.count(dirs=1)
+    return entries
+
+
+def entry_size(entry: os.DirEntry, index: SizeIndex | None = None, jobs: int = 1) -> int:
+    # DirEntry caches d_type and its stat result, so callers that already
+    # looked at entry.stat() do not pay for a second syscall here.
+    try:
+        if entry.is_dir(follow_symlinks=False):
+            return scan_tree(Path(entry.path), index=index, jobs=jobs).size
+        return entry.stat(follow_symlinks=False).st_size
+    except OSError:
+        profile.count(errors=1)
+        return 0
+
+
+def allocated_size(st: os.stat_result) -> int:
+    return st.st_blocks * 512
+
+
+def item_size(path: Path, index: SizeIndex | None = None, jobs: int = 1) -> int:
+    try:
+        st = path.lstat()
+    except OSError:
+        profile.count(errors=1)
+        return 0
+    if stat.S_ISDIR(st.st_mode):
+        return scan_tree(path, index=index, jobs=jobs).size
+    return st.st_size
+
+
+def _read_cached(
+    path: str,
+    st: os.stat_result,
+    threshold: int | None,
+    sink,
+    index: SizeIndex,
+    walk: _Walk | None,
+) -> tuple[int, list[str]] | None:
+    record = index.lookup(path, st)
+    if record is None:
+        return None
+    if threshold is not None and threshold < BIG_FILE_FLOOR and record.max_file >= threshold:
+        # The index only remembers files over BIG_FILE_FLOOR by name.
+        return None
+    # Records hold every file; links this walk has already counted come off
+    # here, so the answer does not depend on which root stored the record.
+    files_size = record.files_size
+    files_allocated = record.files_allocated
+    file_count = record.file_count
+    counted_elsewhere = set()
+    if walk is not None:
+        for name, dev, ino, size, allocated in record.links:
+            if not walk.claim(dev, ino):
+                counted_elsewhere.add(name)
+                files_size -= size
+                files_allocated -= allocated
+                file_count -= 1
+        walk.add(files_allocated)
+    sink.files += file_count
+    if threshold is not None:
+        for name, size in record.big_files:
+            if size >= threshold and name not in counted_elsewhere:
+                sink.add_file(os.path.join(path, name), name, size, 0)
+    subdirs = []
+    for name in record.subdirs:
+        child = os.path.join(path, name)
+        if walk is not None and walk.prune is not None and name in walk.prune:
+            walk.skip(child, index)
+        else:
+            subdirs.append(child)
+    return files_size, subdirs
+
+
+def _read_dir(
+    path: str,
+    threshold: int | None,
+    sink,
+    index: SizeIndex | None = None,
+    walk: _Walk | None = None,
+) -> tuple[int, list[str]]:
+    # With `walk`, a hard-linked file is counted the first time one of
+    # its links is met, allocated bytes are tallied next to apparent sizes,
+    # and a directory on another device is skipped before it is listed.
+    # Subdirectories matching the prune rules are never opened; the index
+    # still records them so an unpruned walk can use this listing.
+    cancel = _cancel.get()
+    if cancel is not None and cancel.is_set():
+        raise ScanCancelled(path)
+    st = None
+    if index is not None or (walk is not None and walk.one_filesystem):
+        # Stat before listing so a change made mid-listing bumps the mtime
+        # past what gets recorded, and the next run looks again.
+        try:
+            st = os.lstat(path)
+        except OSError:
+            profile.count(errors=1)
+            return 0, []
+        if walk is not None and walk.crosses(path, st):
+            return 0, []
+    if index is not None:
+        cached = _read_cached(path, st, threshold, sink, index, walk)
+        if cached is not None:
+            return cached
+
+    prune = walk.prune if walk is not None else None
+    files_size = 0
+    files_allocated = 0
+    file_count = 0
+    max_file = 0
+    subdirs: list[str] = []
+    subdir_names: list[str] = []
+    big_files: list[tuple[str, int]] = []
+    links: list[tuple[str, int, int, int, int]] = []
+    # Hard-linked files this walk already counted under another folder. They
+    # stay in the index record (see _read_cached) but not in the result.
+    shared_size = shared_blocks = shared_count = 0
+    errors = 0
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdir_names.append(entry.name)
+                        if prune is not None and entry.name in prune:
+                            walk.skip(entry.path, index)
+                        else:
+                            subdirs.append(entry.path)
+                        continue
+                    entry_stat = entry.stat(follow_symlinks=False)
+                except OSError:
+                    errors += 1
+                    continue
+                size = entry_stat.st_size
+                blocks = entry_stat.st_blocks
+                file_count += 1
+                files_size += size
+                files_allocated += blocks
+                max_file = max(max_file, size)
+                if size >= BIG_FILE_FLOOR:
+                    big_files.append((entry.name, size))
+                if entry_stat.st_nlink > 1:
+                    dev, ino = entry_stat.st_dev, entry_stat.st_ino
+                    links.append((entry.name, dev, ino, size, blocks * 512))
+                    if walk is not None and not walk.claim(dev, ino):
+                        shared_size += size
+                        shared_blocks += blocks
+                        shared_count += 1
+                        continue
+                if threshold is not None and size >= threshold:
+                    sink.add_file(entry.path, entry.name, size, int(entry_stat.st_mtime))
+    except OSError:
+        counted = files_size - shared_size
+        profile.count(dirs=1, stats=file_count, bytes=counted, errors=errors + 1)
+        if walk is not None:
+            walk.add((files_allocated - shared_blocks) * 512)
+        return counted, subdirs
+
+    counted = files_size - shared_size
+    profile.count(dirs=1, stats=file_count + errors, bytes=counted, errors=errors)
+    sink.files += file_count - shared_count
+    if walk is not None:
+        walk.add((files_allocated - shared_blocks) * 512)
+    if index is not None:
+        index.store(
+            path,
+            st,
+            files_size,
+            files_allocated * 512,
+            file_count,
+            max_file,
+            subdir_names,
+            big_files,
+            links,
+        )
+    return counted, subdirs
+
+
+def scan_tree(
+    root: Path,
+    threshold: int | None = None,
+    keep_dir_sizes: bool = False,
+    index: SizeIndex | None = None,
+    jobs: int = 1,
+    reuse: Callable[[str], int | None] | None = None,
+    tree: CompactTree | None = None,
+    one_filesystem: bool = True,
+    prune: Allowlist | None = None,
+    estimate_pruned: bool = False,
+) -> ScanResult:
+    options = (one_filesystem, prune, estimate_pruned)
+    with profile.span(os.fspath(root), "walk"):
+        return _scan_tree(root, threshold, keep_dir_sizes, index, jobs, reuse, tree, options)
+
+
+def _scan_tree(
+    root: Path,
+    threshold: int | None,
+    keep_dir_sizes: bool,
+    index: SizeIndex | None,
+    jobs: int,
+    reuse: Callable[[str], int | None] | None,
+    tree: CompactTree | None,
+    walk_options: tuple[bool, Allowlist | None, bool],
+) -> ScanResult:
+    # Single post-order walk: folder totals roll up into their parent as each
+    # directory is finished, and anything at or over `threshold` is collected.
+    # With `tree`, folders and qualifying files are written into it as nodes
+    # instead of being collected as Path tuples in `result.large`.
+    root = Path(root)
+    result = ScanResult(root=root, tree=tree)
+    try:
+        st = root.lstat()
+    except OSError:
+        profile.count(errors=1)
+        return result
+
+    if not stat.S_ISDIR(st.st_mode):
+        result.size = st.st_size
+        result.allocated = allocated_size(st)
+        result.device = st.st_dev
+        result.files = 1
+        if tree is not None:
+            tree.size[0] = st.st_size
+            tree.flags[0] = FLAG_FILE
+        elif threshold is not None and st.st_size >= threshold:
+            result.large.append((st.st_size, "file", root))
+        return result
+
+    root_str = os.fspath(root)
+    walk = _Walk(st.st_dev, *walk_options)
+    if jobs > 1:
+        _scan_parallel(
+            root_str, threshold, keep_dir_sizes, index, jobs, reuse, result, walk
+        )
+        walk.finish(result)
+        _completed(index, root_str)
+        return result
+
+    sink = result if tree is None else _TreeSink(tree)
+    folder_threshold = threshold if tree is None else None
+
+    # Each frame is [path, accumulated size, subdirectories still to visit, tree node].
+    stack = [[root_str, *_read_dir(root_str, threshold, sink, index, walk), 0]]
+    while stack:
+        frame = stack[-1]
+        pending = frame[2]
+        if pending:
+            child = pending.pop()
+            # `reuse` lets a caller splice in a subtree it has already sized.
+            known = reuse(child) if reuse is not None else None
+            if known is not None:
+                frame[1] += known
+                continue
+            node = 0
+            if tree is not None:
+                node = sink.node = tree.add(frame[3], os.path.basename(child))
+            stack.append([child, *_read_dir(child, threshold, sink, index, walk), node])
+            continue
+
+        stack.pop()
+        current, total, _, node = frame
+        _finish_dir(current, total, folder_threshold, keep_dir_sizes, index, result)
+        if tree is not None:
+            tree.size[node] = total
+        if stack:
+            stack[-1][1] += total
+        else:
+            result.size = total
+
+    if tree is not None:
+        result.files = sink.files
+    walk.finish(result)
+    _completed(index, root_str)
+    return result
+
+
+def _completed(index: SizeIndex | None, root: str) -> None:
+    # Only a walk that reached every folder may have the index drop records
+    # it did not see; a cancelled or timed-out walk never gets here.
+    if index is not None:
+        index.add_root(root)
+
+
+def _finish_dir(
+    path: str,
+    total: int,
+    threshold: int | None,
+    keep_dir_sizes: bool,
+    index: SizeIndex | None,
+    result: ScanResult,
+) -> None:
+    result.dirs += 1
+    if keep_dir_sizes:
+        result.dir_sizes[Path(path)] = total
+    if index is not None:
+        index.set_size(path, total)
+    if threshold is not None and total >= threshold:
+        result.large.append((total, "folder", Path(path)))
+
+
+class _Node:
+    __slots__ = ("path", "parent", "size", "pending", "tree_node")
+
+    def __init__(self, path: str, parent: "_Node | None", tree_node: int = 0):
+        self.path = path
+        self.parent = parent
+        self.size = 0
+        self.pending = 0
+        self.tree_node = tree_node
+
+
+def _scan_parallel(
+    root: str,
+    threshold: int | None,
+    keep_dir_sizes: bool,
+    index: SizeIndex | None,
+    jobs: int,
+    reuse: Callable[[str], int | None] | None,
+    result: ScanResult,
+    walk: _Walk,
+) -> None:
+    # Every worker owns a deque: it pushes the subdirectories it discovers and
+    # pops its own work newest-first (depth-first, so queues stay short). An
+    # idle worker steals the oldest entry from someone else's deque, which
+    # tends to be the largest untouched subtree. A directory's total is known
+    # once its last child finishes, so rollups propagate upwards from
+    # whichever worker completes that child.
+    tree = result.tree
+    folder_threshold = threshold if tree is None else None
+    queues = [deque() for _ in range(jobs)]
+    lock = threading.Condition()
+    outstanding = 1
+    queues[0].append(_Node(root, None))
+    cancelled: list[ScanCancelled] = []
+    partials = [ScanResult(root=result.root) for _ in range(jobs)]
+    sinks = partials if tree is None else [_TreeSink(tree) for _ in range(jobs)]
+
+    def take(worker: int) -> _Node | None:
+        with lock:
+            while True:
+                if cancelled:
+                    return None
+                if queues[worker]:
+                    return queues[worker].pop()
+                for offset in range(1, jobs):
+                    victim = queues[(worker + offset) % jobs]
+                    if victim:
+                        return victim.popleft()
+                if outstanding == 0:
+                    return None
+                lock.wait()
+
+    def finish(node: _Node, partial: ScanResult) -> None:
+        while True:
+            _finish_dir(node.path, node.size, folder_threshold, keep_dir_sizes, index, partial)
+            if tree is not None:
+                tree.size[node.tree_node] = node.size
+            parent = node.parent
+            if parent is None:
+                result.size = node.size
+                return
+            with lock:
+                parent.size += node.size
+                parent.pending -= 1
+                if parent.pending:
+                    return
+            node = parent
+
+    def work(worker: int) -> None:
+        nonlocal outstanding
+        partial = partials[worker]
+        sink = sinks[worker]
+        while (node := take(worker)) is not None:
+            if tree is not None:
+                sink.node = node.tree_node
+            try:
+                files_size, subdirs = _read_dir(node.path, threshold, sink, index, walk)
+            except ScanCancelled as exc:
+                # Wake every worker so they all stop; the caller re-raises.
+                with lock:
+                    cancelled.append(exc)
+                    lock.notify_all()
+                return
+            if reuse is not None:
+                to_walk = []
+                for path in subdirs:
+                    known = reuse(path)
+                    if known is None:
+                        to_walk.append(path)
+                    else:
+                        files_size += known
+                subdirs = to_walk
+            children = [
+                _Node(
+                    path,
+                    node,
+                    tree.add(node.tree_node, os.path.basename(path)) if tree is not None else 0,
+                )
+                for path in subdirs
+            ]
+            with lock:
+                node.size += files_size
+                node.pending = len(children)
+                queues[worker].extend(children)
+                outstanding += len(children)
+                if children:
+                    lock.notify_all()
+            if not children:
+                finish(node, partial)
+            with lock:
+                outstanding -= 1
+                if outstanding == 0:
+                    lock.notify_all()
+
+    threads = [
+        threading.Thread(target=profile.in_context(work), args=(worker,))
+        for worker in range(jobs)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if cancelled:
+        raise cancelled[0]
+
+    for partial, sink in zip(partials, sinks):
+        result.files += sink.files
+        result.dirs += partial.dirs
+        result.dir_sizes.update(partial.dir_sizes)
+        result.large.extend(partial.large)
+
+
+class _TopN:
+    # Bounded min-heap used as a _read_dir sink, so the streaming walk reuses
+    # the same directory reader. `largest` is the biggest item since reset().
+    def __init__(self, limit: int):
+        self.limit = max(limit, 1)
+        self.heap: list[tuple[int, str, str, str]] = []
+        self.files = 0
+        self.largest = 0
+
+    def add_file(self, path: str, name: str, size: int, mtime: int) -> None:
+        self.offer(size, "file", path)
+
+    def offer(self, size: int, kind: str, path: str) -> None:
+        self.largest = max(self.largest, size)
+        # The path doubles as a tie-breaker so equal sizes order stably.
+        entry = (size, path, kind, path)
+        if len(self.heap) < self.limit:
+            heapq.heappush(self.heap, entry)
+        elif entry > self.heap[0]:
+            heapq.heapreplace(self.heap, entry)
+
+    def reset(self) -> None:
+        self.largest = 0
+
+    def items(self) -> list[tuple[int, str, Path]]:
+        ordered = sorted(self.heap, key=lambda entry: (-entry[0], entry[1]))
+        return [(size, kind, Path(path)) for size, _, kind, path in ordered]
+
+
+def scan_top(
+    root: Path,
+    threshold: int,
+    top_n: int,
+    collapse_ratio: float | None = None,
+    index: SizeIndex | None = None,
+    one_filesystem: bool = True,
+    prune: Allowlist | None = None,
+) -> list[tuple[int, str, Path]]:
+    with profile.span(os.fspath(root), "walk"):
+        return _scan_top(root, threshold, top_n, collapse_ratio, index, one_filesystem, prune)
+
+
+def _scan_top(
+    root: Path,
+    threshold: int,
+    top_n: int,
+    collapse_ratio: float | None,
+    index: SizeIndex | None,
+    one_filesystem: bool,
+    prune: Allowlist | None,
+) -> list[tuple[int, str, Path]]:
+    # Streaming variant of scan_tree for large-item reports: only the open
+    # directory stack and a heap of `top_n` items are held, never a per-folder
+    # map. With `collapse_ratio`, a folder is left out when a single child that
+    # is already reported accounts for at least that share of its size.
+    root = Path(root)
+    top = _TopN(top_n)
+    try:
+        st = root.lstat()
+    except OSError:
+        profile.count(errors=1)
+        return []
+    if not stat.S_ISDIR(st.st_mode):
+        if st.st_size >= threshold:
+            top.offer(st.st_size, "file", os.fspath(root))
+        return top.items()
+
+    walk = _Walk(st.st_dev, one_filesystem, prune)
+
+    def open_frame(path: str) -> list:
+        top.reset()
+        files_size, subdirs = _read_dir(path, threshold, top, index, walk)
+        # [path, size, pending subdirs, biggest child size, biggest child reported]
+        return [path, files_size, subdirs, top.largest, top.largest >= threshold]
+
+    root_str = os.fspath(root)
+    stack = [open_frame(root_str)]
+    while stack:
+        frame = stack[-1]
+        if frame[2]:
+            stack.append(open_frame(frame[2].pop()))
+            continue
+
+        stack.pop()
+        current, total, _, child_size, child_reported = frame
+        if index is not None:
+            index.set_size(current, total)
+        reported = False
+        if total >= threshold:
+            collapsed = (
+                collapse_ratio is not None
+                and child_reported
+                and child_size >= total * collapse_ratio
+            )
+            if not collapsed:
+                top.offer(total, "folder", current)
+            reported = True
+        if stack:
+            parent = stack[-1]
+            parent[1] += total
+            if total > parent[3]:
+                parent[3] = total
+                parent[4] = reported
+
+    _completed(index, root_str)
+    return top.items()
+
+
+def estimate_tree(
+    root: Path,
+    deadline: float,
+    stop_over: int | None = None,
+    index: SizeIndex | None = None,
+    one_filesystem: bool = True,
+    prune: Allowlist | None = None,
+    seed: int | None = None,
+) -> SizeEstimate:
+    with profile.span(os.fspath(root), "walk"):
+        return _estimate_tree(root, deadline, stop_over, index, one_filesystem, prune, seed)
+
+
+def _estimate_tree(
+    root: Path,
+    deadline: float,
+    stop_over: int | None,
+    index: SizeIndex | None,
+    one_filesystem: bool,
+    prune: Allowlist | None,
+    seed: int | None,
+) -> SizeEstimate:
+    # Depth-first walk that visits children in random order until
+    # `deadline` (a time.monotonic() value). Folders finished by then are a
+    # random sample of their depth, so each unvisited folder is estimated
+    # as the mean finished folder one level below its parent.
+    try:
+        st = Path(root).lstat()
+    except OSError:
+        profile.count(errors=1)
+        return SizeEstimate(0, 0, 0)
+    if not stat.S_ISDIR(st.st_mode):
+        return SizeEstimate(st.st_size, st.st_size, st.st_size, allocated=allocated_size(st))
+
+    rng = random.Random(seed)
+    walk = _Walk(st.st_dev, one_filesystem, prune)
+    sink = ScanResult(root=Path(root))
+    samples: dict[int, list[int]] = {}
+
+    def open_frame(path: str, depth: int) -> list:
+        files_size, subdirs = _read_dir(path, None, sink, index, walk)
+        rng.shuffle(subdirs)
+        # [path, size so far, subdirs still to visit, depth]
+        return [path, files_size, subdirs, depth]
+
+    stack = [open_frame(os.fspath(root), 0)]
+    known = stack[0][1]
+    stopped = False
+    while stack:
+        if stop_over is not None and known >= stop_over:
+            stopped = True
+            break
+        if time.monotonic() >= deadline:
+            break
+        frame = stack[-1]
+        if frame[2]:
+            child = open_frame(frame[2].pop(), frame[3] + 1)
+            known += child[1]
+            stack.append(child)
+            continue
+        stack.pop()
+        path, total, _, depth = frame
+        samples.setdefault(depth, []).append(total)
+        if stack:
+            stack[-1][1] += total
+        else:
+            return SizeEstimate(total, total, total, allocated=walk.allocated)
+
+    pooled = [size for sizes in samples.values() for size in sizes]
+    extra = 0.0
+    variance = 0.0
+    unvisited = 0
+    unknown = False
+    for frame in stack:
+        pending = len(frame[2])
+        if not pending:
+            continue
+        unvisited += pending
+        sample = samples.get(frame[3] + 1, [])
+        if len(sample) < 2:
+            sample = pooled
+        if len(sample) < 2:
+            unknown = True
+            continue
+        mean = statistics.fmean(sample)
+        spread = statistics.variance(sample)
+        # Prediction variance for the sum of `pending` new folders: their own
+        # spread plus the uncertainty of the sampled mean.
+        extra += pending * mean
+        variance += pending * spread + pending * pending * spread / len(sample)
+
+    margin = Z_95 * math.sqrt(variance)
+    size = int(known + extra)
+    return SizeEstimate(
+        size=size,
+        low=max(known, int(size - margin)),
+        high=None if unknown else int(size + margin),
+        exact=False,
+        stopped=stopped,
+        unvisited=unvisited,
+    )
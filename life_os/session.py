@@ -0,0 +1,292 @@
+import os
+import stat
+import threading
+from pathlib import Path
+
+from life_os import profile
+from life_os.index import BIG_FILE_FLOOR, SizeIndex
+from life_os.matcher import Allowlist
+from life_os.scan import ScanResult, allocated_size, list_dir, scan_tree
+from life_os.tree import CompactTree
+from life_os.watchstate import WatchedEntry, WatchState
+
+
+def _is_under(path: str, root: str) -> bool:
+    return path.startswith(root) and path[len(root) : len(root) + 1] == os.sep
+
+
+def _ancestors(path: str):
+    while True:
+        yield path
+        parent = os.path.dirname(path)
+        if parent == path:
+            return
+        path = parent
+
+
+class ScanSession:
+    # One session per run, shared by every check and cleanup step. Directory
+    # listings and whole-subtree scans are remembered so overlapping roots are
+    # read once: sizing a folder inside an already-scanned root is answered
+    # from that scan, and scanning a root splices in subtrees sized earlier.
+    # Each scan is kept as a CompactTree holding every folder plus the files
+    # over BIG_FILE_FLOOR; callers asking for a smaller threshold get a direct,
+    # uncached scan instead. `prune` holds the rules for the cache and
+    # large-file root walks that ask for them (prune=True); other sizing, such
+    # as a Downloads entry, always looks inside every folder. Trees are keyed
+    # by (one_filesystem, prune, path), so a walk that stopped at mount points
+    # or pruned folders never answers for one that did not, or the reverse.
+
+    def __init__(self, index: SizeIndex | None = None, watch: WatchState | None = None):
+        self.index = index
+        # Answers from a running `life-os watch` take precedence when present.
+        self.watch = watch
+        self.prune: Allowlist | None = None
+        self.estimate_pruned = False
+        self._lock = threading.Lock()
+        self._listings: dict[str, list[os.DirEntry]] = {}
+        self._trees: dict[tuple[bool, bool, str], ScanResult] = {}
+        self._running: dict[tuple[bool, bool, str], threading.Event] = {}
+
+    def list_dir(self, path: Path) -> list[os.DirEntry]:
+        key = os.fspath(path)
+        entries = self._listings.get(key)
+        if entries is None and self.watch is not None:
+            entries = self.watch.listing(path)
+        if entries is None:
+            entries = list_dir(path)
+            with self._lock:
+                self._listings[key] = entries
+        return entries
+
+    def entry_size(self, entry: os.DirEntry, jobs: int = 1) -> int:
+        # Sizes count towards the active profile span. A fresh walk credits
+        # its own span, which folds into this one; answers already on hand
+        # are credited here.
+        if isinstance(entry, WatchedEntry):
+            profile.count(bytes=entry.size)
+            return entry.size
+        try:
+            if entry.is_dir(follow_symlinks=False):
+                with self._lock:
+                    known = self._covering(entry.path, (True, False)) is not None
+                size = self._tree(entry.path, jobs, sized_only=True).size
+                if known:
+                    profile.count(bytes=size)
+                return size
+            size = entry.stat(follow_symlinks=False).st_size
+            profile.count(stats=1, bytes=size)
+            return size
+        except OSError:
+            profile.count(errors=1)
+            return 0
+
+    def item_size(
+        self, path: Path, jobs: int = 1, one_filesystem: bool = True, prune: bool = False
+    ) -> int:
+        return self.item_usage(path, jobs, one_filesystem, prune)[0]
+
+    def item_usage(
+        self, path: Path, jobs: int = 1, one_filesystem: bool = True, prune: bool = False
+    ) -> tuple[int, int | None]:
+        # Apparent size and allocated bytes. Allocated is None when the answer
+        # comes from the watch state or from inside another root's scan.
+        if self.watch is not None:
+            size = self.watch.size(path, one_filesystem, self.prune if prune else None)
+            if size is not None:
+                return size, None
+        try:
+            st = path.lstat()
+        except OSError:
+            profile.count(errors=1)
+            return 0, None
+        if stat.S_ISDIR(st.st_mode):
+            scanned = self._tree(
+                os.fspath(path),
+                jobs,
+                sized_only=True,
+                one_filesystem=one_filesystem,
+                prune=prune,
+            )
+            return scanned.size, scanned.allocated
+        return st.st_size, allocated_size(st)
+
+    def scan_tree(
+        self,
+        root: Path,
+        threshold: int | None = None,
+        jobs: int = 1,
+        one_filesystem: bool = True,
+        prune: bool = False,
+    ) -> ScanResult:
+        if self.watch is not None:
+            watched = self.watch.scan(
+                root, threshold, one_filesystem, self.prune if prune else None
+            )
+            if watched is not None:
+                return watched
+        if threshold is not None and threshold < BIG_FILE_FLOOR:
+            return self._scan(root, threshold, jobs, one_filesystem, prune)
+        try:
+            if not stat.S_ISDIR(Path(root).lstat().st_mode):
+                return scan_tree(root, threshold=threshold)
+        except OSError:
+            profile.count(errors=1)
+            return ScanResult(root=Path(root))
+
+        key = os.fspath(root)
+        scanned = self._tree(key, jobs, one_filesystem=one_filesystem, prune=prune)
+        tree = scanned.tree
+        node = tree.find(key)
+        if node is None:
+            return self._scan(root, threshold, jobs, one_filesystem, prune)
+        result = ScanResult(root=Path(root), size=tree.size[node])
+        if node == 0:
+            result.files = scanned.files
+            result.dirs = scanned.dirs
+            result.allocated = scanned.allocated
+            result.device = scanned.device
+            result.mounts = scanned.mounts
+            result.pruned = scanned.pruned
+            result.pruned_size = scanned.pruned_size
+        if threshold is not None:
+            result.large = tree.items_over(node, threshold)
+        return result
+
+    def _scan(
+        self, root: Path, threshold: int | None, jobs: int, one_filesystem: bool, prune: bool
+    ) -> ScanResult:
+        return scan_tree(
+            root,
+            threshold=threshold,
+            index=self.index,
+            jobs=jobs,
+            one_filesystem=one_filesystem,
+            prune=self.prune if prune else None,
+            estimate_pruned=prune and self.estimate_pruned,
+        )
+
+    def forget(self, path: Path, size: int | None = None) -> None:
+        # Called after `path` has been moved away. Cached scans below it are
+        # dropped; enclosing scans are corrected in place.
+        key = os.fspath(path)
+        parent = os.path.dirname(key)
+        if self.watch is not None:
+            self.watch.discard(key)
+        with self._lock:
+            for cached in list(self._listings):
+                if cached in (key, parent) or _is_under(cached, key):
+                    del self._listings[cached]
+            for cached in list(self._trees):
+                root = cached[2]
+                if root == key or _is_under(root, key):
+                    del self._trees[cached]
+                    continue
+                if not _is_under(key, root):
+                    continue
+                scanned = self._trees[cached]
+                node = scanned.tree.find(key)
+                if node is not None:
+                    scanned.tree.detach(node)
+                else:
+                    # Small files are not nodes; take their size off the folder.
+                    folder = scanned.tree.find(parent)
+                    if folder is None or size is None:
+                        del self._trees[cached]
+                        continue
+                    scanned.tree.shrink(folder, size)
+                scanned.size = scanned.tree.size[0]
+                # Blocks are only tallied per walk, so the total is now unknown.
+                scanned.allocated = None
+
+    def _covering(self, path: str, mode: tuple[bool, bool]) -> tuple[str, ScanResult] | None:
+        for candidate in _ancestors(path):
+            tree = self._trees.get((*mode, candidate))
+            if tree is not None:
+                return candidate, tree
+        return None
+
+    def _running_over(self, path: str, mode: tuple[bool, bool]) -> threading.Event | None:
+        for candidate in _ancestors(path):
+            event = self._running.get((*mode, candidate))
+            if event is not None:
+                return event
+        return None
+
+    def _tree(
+        self,
+        root: str,
+        jobs: int,
+        sized_only: bool = False,
+        one_filesystem: bool = True,
+        prune: bool = False,
+    ) -> ScanResult:
+        # Without rules to apply, a pruned walk is an ordinary one.
+        mode = (one_filesystem, prune and self.prune is not None)
+        while True:
+            with self._lock:
+                covering = self._covering(root, mode)
+                blocker = None if covering else self._running_over(root, mode)
+                if covering is None and blocker is None:
+                    done = threading.Event()
+                    self._running[(*mode, root)] = done
+            if covering is not None:
+                found, scanned = covering
+                if found == root or not sized_only:
+                    return scanned
+                node = scanned.tree.find(root)
+                if node is None:
+                    # Inside a finished scan but missing from it (created since).
+                    return self._scan(Path(root), None, 1, one_filesystem, prune)
+                return ScanResult(root=Path(root), size=scanned.tree.size[node])
+            if blocker is None:
+                break
+            # Someone is already scanning this root or one enclosing it.
+            blocker.wait()
+
+        reused: list[tuple[bool, bool, str]] = []
+        try:
+            scanned = scan_tree(
+                Path(root),
+                threshold=BIG_FILE_FLOOR,
+                index=self.index,
+                jobs=jobs,
+                reuse=lambda path: self._reuse((*mode, path), reused),
+                tree=CompactTree(root),
+                one_filesystem=one_filesystem,
+                prune=self.prune if mode[1] else None,
+                estimate_pruned=mode[1] and self.estimate_pruned,
+            )
+            with self._lock:
+                for child in reused:
+                    nested = self._trees.pop(child, None)
+                    folder = scanned.tree.find(os.path.dirname(child[2]))
+                    if nested is not None and folder is not None:
+                        scanned.tree.graft(folder, nested.tree)
+                        scanned.files += nested.files
+                        scanned.dirs += nested.dirs
+                        if scanned.allocated is not None and nested.allocated is not None:
+                            scanned.allocated += nested.allocated
+                        scanned.mounts.extend(nested.mounts)
+                        scanned.pruned += nested.pruned
+                        scanned.pruned_size += nested.pruned_size
+                self._trees[(*mode, root)] = scanned
+            return scanned
+        finally:
+            with self._lock:
+                self._running.pop((*mode, root), None)
+            done.set()
+
+    def _reuse(
+        self, key: tuple[bool, bool, str], reused: list[tuple[bool, bool, str]]
+    ) -> int | None:
+        if key not in self._running and key not in self._trees:
+            return None
+        event = self._running.get(key)
+        if event is not None:
+            event.wait()
+        scanned = self._trees.get(key)
+        if scanned is None:
+            return None
+        reused.append(key)
+        return scanned.size
@@ -0,0 +1,137 @@
+import hashlib
+import os
+import pickle
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from life_os.matcher import Allowlist, compile_allowlist, compile_prune
+
+
+# Bump when LoadedSpec or the pre-processing below changes shape.
+SPEC_CACHE_VERSION = 3
+
+# Cached specs kept per cache folder; the oldest are removed past this.
+SPEC_CACHE_ENTRIES = 8
+
+
+@dataclass
+class LoadedSpec:
+    spec: dict
+    allowlists: dict[tuple[str, str], Allowlist] = field(default_factory=dict)
+    prunes: dict[str, Allowlist] = field(default_factory=dict)
+    errors: list[str] = field(default_factory=list)
+    # Allowlists and prune rules of the wrong shape; compile_plan turns these
+    # into a SpecError, unlike the bad patterns in `errors`.
+    invalid: list[str] = field(default_factory=list)
+
+
+def parse_spec(path: Path) -> dict:
+    # Imported here so a cache hit never loads PyYAML. libyaml's loader is
+    # several times faster; fall back when PyYAML was built without it.
+    import yaml
+
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    with open(path, "r", encoding="utf-8") as f:
+        spec = yaml.load(f, Loader=loader)
+    if not isinstance(spec, dict):
+        raise ValueError(f"{path}: spec must be a mapping")
+    return spec
+
+
+def _shape_errors(config, keys: tuple[str, ...], where: str) -> list[str]:
+    if config is None:
+        return []
+    if not isinstance(config, dict):
+        return [f"{where}: expected a mapping"]
+    return [
+        f"{where}.{key}: expected a list of strings"
+        for key in keys
+        if config.get(key) is not None
+        and not (
+            isinstance(config[key], list) and all(isinstance(item, str) for item in config[key])
+        )
+    ]
+
+
+def prepare_spec(spec: dict) -> LoadedSpec:
+    loaded = LoadedSpec(spec=spec)
+    # Allowlists are compiled once here; bad patterns are reported, not fatal.
+    # Sections that are not mappings are left for compile_plan to report.
+    for section_name in ("hygiene", "cleanup"):
+        section = spec.get(section_name)
+        if not isinstance(section, dict):
+            continue
+        if isinstance(section.get("prune"), dict):
+            where = f"{section_name}.prune"
+            invalid = _shape_errors(section["prune"], ("names", "globs", "patterns"), where)
+            loaded.invalid.extend(invalid)
+            if not invalid:
+                matcher, errors = compile_prune(section["prune"], where)
+                loaded.prunes[section_name] = matcher
+                loaded.errors.extend(errors)
+        for key, config in section.items():
+            if not isinstance(config, dict) or "allowlist" not in config:
+                continue
+            where = f"{section_name}.{key}.allowlist"
+            invalid = _shape_errors(config["allowlist"], ("names", "patterns"), where)
+            loaded.invalid.extend(invalid)
+            if invalid:
+                continue
+            matcher, errors = compile_allowlist(config["allowlist"], where)
+            loaded.allowlists[(section_name, key)] = matcher
+            loaded.errors.extend(errors)
+    return loaded
+
+
+def _cache_file(cache_dir: Path, path: Path) -> Path:
+    digest = hashlib.sha1(os.fsencode(path)).hexdigest()[:16]
+    return cache_dir / f"spec-{digest}.pickle"
+
+
+def load_spec(path: Path, cache_dir: Path | None = None) -> LoadedSpec:
+    # With a cache_dir, the prepared spec is pickled next to a key of
+    # (path, mtime_ns, size); an unchanged spec is then loaded without YAML.
+    path = Path(path).resolve()
+    if cache_dir is None:
+        return prepare_spec(parse_spec(path))
+
+    st = path.stat()
+    key = (SPEC_CACHE_VERSION, str(path), st.st_mtime_ns, st.st_size)
+    cache_file = _cache_file(cache_dir, path)
+    try:
+        with open(cache_file, "rb") as f:
+            cached_key, loaded = pickle.load(f)
+        if cached_key == key and isinstance(loaded, LoadedSpec):
+            return loaded
+    except Exception:
+        # Missing, stale or unreadable cache: parse the YAML instead.
+        pass
+
+    loaded = prepare_spec(parse_spec(path))
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            pickle.dump((key, loaded), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, cache_file)
+        _evict(cache_dir)
+    except OSError:
+        pass
+    return loaded
+
+
+def _evict(cache_dir: Path) -> None:
+    # One file per spec path, so the folder only grows with the number of
+    # specs used; drop the least recently written beyond SPEC_CACHE_ENTRIES.
+    entries = []
+    for cached in cache_dir.glob("spec-*.pickle"):
+        try:
+            entries.append((cached.stat().st_mtime_ns, cached))
+        except OSError:
+            continue
+    entries.sort(reverse=True)
+    for _, cached in entries[SPEC_CACHE_ENTRIES:]:
+        try:
+            cached.unlink()
+        except OSError:
+            pass
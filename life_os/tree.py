@@ -0,0 +1,203 @@
+import os
+import threading
+from array import array
+from collections.abc import Iterator
+from pathlib import Path
+
+
+FLAG_DIR = 1
+FLAG_FILE = 2
+
+_NONE = -1
+
+
+class CompactTree:
+    # Scan results as parallel array columns instead of Path-keyed dicts.
+    # Node 0 is the root and is named by its full path; every other node
+    # stores an id into a shared name pool, so a name like "node_modules" is
+    # kept once however often it appears. Children form a singly linked list
+    # (first_child / next_sibling), which lets parallel walkers append nodes
+    # in any order. Paths are only rebuilt for nodes that get reported.
+    __slots__ = (
+        "parent",
+        "name",
+        "size",
+        "mtime",
+        "flags",
+        "first_child",
+        "next_sibling",
+        "names",
+        "_name_ids",
+        "_children",
+        "_lock",
+    )
+
+    def __init__(self, root: str | Path):
+        self.parent = array("i")
+        self.name = array("i")
+        self.size = array("q")
+        self.mtime = array("q")
+        self.flags = array("B")
+        self.first_child = array("i")
+        self.next_sibling = array("i")
+        self.names: list[str] = []
+        self._name_ids: dict[str, int] = {}
+        self._children: dict[int, dict[int, int]] = {}
+        self._lock = threading.Lock()
+        self._append(_NONE, os.fspath(root), 0, 0, FLAG_DIR)
+
+    def __len__(self) -> int:
+        return len(self.parent)
+
+    @property
+    def root(self) -> str:
+        return self.names[self.name[0]]
+
+    def _name_id(self, name: str) -> int:
+        name_id = self._name_ids.get(name)
+        if name_id is None:
+            name_id = len(self.names)
+            self.names.append(name)
+            self._name_ids[name] = name_id
+        return name_id
+
+    def _append(self, parent: int, name: str, size: int, mtime: int, flags: int) -> int:
+        node = len(self.parent)
+        self.parent.append(parent)
+        self.name.append(self._name_id(name))
+        self.size.append(size)
+        self.mtime.append(mtime)
+        self.flags.append(flags)
+        self.first_child.append(_NONE)
+        self.next_sibling.append(_NONE)
+        if parent != _NONE:
+            self.next_sibling[node] = self.first_child[parent]
+            self.first_child[parent] = node
+            self._children.pop(parent, None)
+        return node
+
+    def add(self, parent: int, name: str, size: int = 0, mtime: int = 0, flags: int = FLAG_DIR) -> int:
+        with self._lock:
+            return self._append(parent, name, size, mtime, flags)
+
+    def is_dir(self, node: int) -> bool:
+        return bool(self.flags[node] & FLAG_DIR)
+
+    def children(self, node: int) -> Iterator[int]:
+        child = self.first_child[node]
+        while child != _NONE:
+            yield child
+            child = self.next_sibling[child]
+
+    def walk(self, node: int = 0) -> Iterator[int]:
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            yield current
+            stack.extend(self.children(current))
+
+    def path_str(self, node: int) -> str:
+        parts = []
+        while node != 0:
+            parts.append(self.names[self.name[node]])
+            node = self.parent[node]
+        parts.append(self.root)
+        return os.path.join(*reversed(parts))
+
+    def path(self, node: int) -> Path:
+        return Path(self.path_str(node))
+
+    def _child(self, node: int, name: str) -> int | None:
+        name_id = self._name_ids.get(name)
+        if name_id is None:
+            return None
+        index = self._children.get(node)
+        if index is None:
+            # Built on demand, only for folders that actually get looked into.
+            index = {self.name[child]: child for child in self.children(node)}
+            self._children[node] = index
+        return index.get(name_id)
+
+    def find(self, path: str | Path) -> int | None:
+        path = os.fspath(path)
+        root = self.root
+        if path == root:
+            return 0
+        if not path.startswith(root.rstrip(os.sep) + os.sep):
+            return None
+        node = 0
+        for part in path[len(root) :].strip(os.sep).split(os.sep):
+            node = self._child(node, part)
+            if node is None:
+                return None
+        return node
+
+    def graft(self, parent: int, other: "CompactTree") -> int:
+        # Copy `other` in as a child of `parent`; its root keeps its basename.
+        with self._lock:
+            mapping = {}
+            for node in other.walk():
+                if node == 0:
+                    new_parent = parent
+                    name = os.path.basename(other.root)
+                else:
+                    new_parent = mapping[other.parent[node]]
+                    name = other.names[other.name[node]]
+                mapping[node] = self._append(
+                    new_parent, name, other.size[node], other.mtime[node], other.flags[node]
+                )
+            return mapping[0]
+
+    def detach(self, node: int) -> None:
+        # Unlink a subtree (its rows stay as garbage) and shrink its ancestors.
+        with self._lock:
+            parent = self.parent[node]
+            if parent == _NONE:
+                return
+            previous = _NONE
+            current = self.first_child[parent]
+            while current != node:
+                previous, current = current, self.next_sibling[current]
+            if previous == _NONE:
+                self.first_child[parent] = self.next_sibling[node]
+            else:
+                self.next_sibling[previous] = self.next_sibling[node]
+            self._children.pop(parent, None)
+            self._shrink(parent, self.size[node])
+
+    def shrink(self, node: int, amount: int) -> None:
+        # Take `amount` bytes off `node` and every folder above it.
+        with self._lock:
+            self._shrink(node, amount)
+
+    def _shrink(self, node: int, amount: int) -> None:
+        while node != _NONE:
+            self.size[node] -= amount
+            node = self.parent[node]
+
+    def items_over(self, node: int, threshold: int) -> list[tuple[int, str, Path]]:
+        # Sizes only shrink going down, so a folder under the threshold hides
+        # nothing worth reporting and its subtree is skipped.
+        items = []
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            size = self.size[current]
+            if size < threshold:
+                continue
+            kind = "folder" if self.is_dir(current) else "file"
+            items.append((size, kind, self.path(current)))
+            stack.extend(self.children(current))
+        return items
+
+    def nbytes(self) -> int:
+        columns = (
+            self.parent,
+            self.name,
+            self.size,
+            self.mtime,
+            self.flags,
+            self.first_child,
+            self.next_sibling,
+        )
+        return sum(column.itemsize * len(column) for column in columns)
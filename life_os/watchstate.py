@@ -0,0 +1,159 @@
+import json
+import os
+import time
+from pathlib import Path
+
+from life_os.matcher import Allowlist
+from life_os.scan import ScanResult
+
+
+STATE_VERSION = 2
+
+# `life-os watch` rewrites the state at least this often, even when idle.
+HEARTBEAT_SECONDS = 30
+
+# Older states are ignored: the daemon has stopped or is stuck.
+MAX_AGE_SECONDS = 4 * HEARTBEAT_SECONDS
+
+
+class _WatchedStat:
+    __slots__ = ("st_size", "st_mtime")
+
+    def __init__(self, size: int, mtime: float):
+        self.st_size = size
+        self.st_mtime = mtime
+
+
+class WatchedEntry:
+    # Stands in for os.DirEntry when a listing comes from the watch state, so
+    # checks work unchanged. `size` is the rolled-up size for folders.
+    __slots__ = ("name", "path", "size", "_is_dir", "_stat")
+
+    def __init__(self, parent: str, name: str, is_dir: bool, size: int, mtime: float):
+        self.name = name
+        self.path = os.path.join(parent, name)
+        self.size = size
+        self._is_dir = is_dir
+        self._stat = _WatchedStat(size, mtime)
+
+    def is_dir(self, follow_symlinks: bool = True) -> bool:
+        return self._is_dir
+
+    def is_file(self, follow_symlinks: bool = True) -> bool:
+        return not self._is_dir
+
+    def stat(self, follow_symlinks: bool = True) -> _WatchedStat:
+        return self._stat
+
+
+class WatchState:
+    def __init__(self, payload: dict):
+        self.updated = payload["updated"]
+        self.roots: dict[str, dict] = payload["roots"]
+
+    def discard(self, path: str) -> None:
+        # Something under `path` changed behind the daemon's back (cleanup
+        # moved it); stop trusting every root that contains it.
+        for root in list(self.roots):
+            if path == root or path.startswith(root.rstrip(os.sep) + os.sep):
+                del self.roots[root]
+
+    def _matches_walk(self, root: dict, one_filesystem: bool, prune: Allowlist | None) -> bool:
+        # The daemon counts every file once per link, crosses mount points and
+        # never prunes; its numbers stand in for a walk only where the walk
+        # would arrive at the same total.
+        if root["links"] or (one_filesystem and root["mounts"]):
+            return False
+        return prune is None or not any(name in prune for name in root["dirs"])
+
+    def listing(self, path: Path) -> list[WatchedEntry] | None:
+        # Folder entries carry sizes that entry_size answers with, which are
+        # measured without crossing mounts and without prune rules.
+        key = os.fspath(path)
+        root = self.roots.get(key)
+        if root is None or root.get("entries") is None:
+            return None
+        if not self._matches_walk(root, True, None):
+            return None
+        return [
+            WatchedEntry(key, name, is_dir, size, mtime)
+            for name, is_dir, size, mtime in root["entries"]
+        ]
+
+    def size(
+        self, path: Path, one_filesystem: bool = True, prune: Allowlist | None = None
+    ) -> int | None:
+        key = os.fspath(path)
+        root = self.roots.get(key)
+        if root is not None:
+            return root["size"] if self._matches_walk(root, one_filesystem, prune) else None
+        # Top-level items of a listed root (e.g. a folder in ~/Downloads).
+        parent = self.roots.get(os.path.dirname(key))
+        if parent is not None and not self._matches_walk(parent, one_filesystem, prune):
+            return None
+        if parent is not None and parent.get("entries") is not None:
+            name = os.path.basename(key)
+            for entry_name, _, size, _ in parent["entries"]:
+                if entry_name == name:
+                    return size
+        return None
+
+    def scan(
+        self,
+        path: Path,
+        threshold: int | None,
+        one_filesystem: bool = True,
+        prune: Allowlist | None = None,
+    ) -> ScanResult | None:
+        root = self.roots.get(os.fspath(path))
+        if root is None or not self._matches_walk(root, one_filesystem, prune):
+            return None
+        if threshold is not None and threshold < root["floor"]:
+            return None
+        result = ScanResult(root=Path(path), size=root["size"])
+        if threshold is not None:
+            result.large = [
+                (size, kind, Path(item)) for size, kind, item in root["large"] if size >= threshold
+            ]
+        return result
+
+
+def _pid_alive(pid: int) -> bool:
+    if pid <= 0:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def load_watch_state(path: Path, max_age: float = MAX_AGE_SECONDS) -> WatchState | None:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if payload.get("version") != STATE_VERSION:
+        return None
+    if time.time() - payload.get("updated", 0) > max_age:
+        return None
+    if not _pid_alive(int(payload.get("pid", 0))):
+        return None
+    return WatchState(payload)
+
+
+def write_watch_state(path: Path, roots: dict[str, dict]) -> None:
+    payload = {
+        "version": STATE_VERSION,
+        "pid": os.getpid(),
+        "updated": time.time(),
+        "roots": roots,
+    }
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(payload, f, separators=(",", ":"))
+    os.replace(tmp, path)
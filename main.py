@@ -1,11 +1,18 @@
 import argparse
+import sys
 
 from life_os.app import LifeOSApp
-from life_os.context import Context
 
-from commands.doctor import run as doctor_run
-from commands.init import run as init_run
-from commands.cleanup import run as cleanup_run
+
+# Handlers are imported only when their command runs, so `--help` and shell
+# hooks do not pay for Rich, YAML or the scanners.
+COMMANDS = {
+    "doctor": "commands.doctor:run",
+    "init": "commands.init:run",
+    "cleanup": "commands.cleanup:run",
+    "watch": "commands.watch:run",
+    "dedupe": "commands.dedupe:run",
+}
 
 
 def main() -> None:
@@ -18,13 +25,15 @@ def main() -> None:
         "command",
         nargs="?",
         default="doctor",
-        help="Command to run (default: doctor)",
+        help=f"Command to run: {', '.join(COMMANDS)} (default: doctor)",
     )
 
+    # Everything after the command is the command's own; each one declares
+    # the flags it accepts (including --verbose) and rejects the rest.
     parser.add_argument(
         "args",
-        nargs="*",
-        help="Command arguments (e.g. doctor workspace)",
+        nargs=argparse.REMAINDER,
+        help="Command arguments (e.g. doctor workspace --jobs 4)",
     )
 
     parser.add_argument(
@@ -33,17 +42,43 @@ def main() -> None:
         help="Enable verbose output",
     )
 
+    parser.add_argument(
+        "--no-spec-cache",
+        action="store_true",
+        help="Parse the spec YAML instead of using the cached copy",
+    )
+
     args, unknown_args = parser.parse_known_args()
+    # --no-spec-cache matters before the command runs (the spec is loaded to
+    # build its context), so it is taken out wherever it was given.
+    command_args = [*args.args, *unknown_args]
+    use_spec_cache = not args.no_spec_cache and "--no-spec-cache" not in command_args
+    command_args = [arg for arg in command_args if arg != "--no-spec-cache"]
+
+    def make_context():
+        from life_os.context import Context
+        from life_os.plan import SpecError
+
+        try:
+            context = Context(verbose=args.verbose, use_spec_cache=use_spec_cache)
+        except SpecError as exc:
+            for error in exc.errors:
+                print(f"life-os: spec: {error}", file=sys.stderr)
+            sys.exit(2)
+        for error in context.spec_errors:
+            print(f"life-os: spec: {error}", file=sys.stderr)
+        return context
 
-    context = Context(verbose=args.verbose)
-    app = LifeOSApp(context)
+    app = LifeOSApp(make_context)
 
     # Register commands
-    app.register("doctor", doctor_run)
-    app.register("init", init_run)
-    app.register("cleanup", cleanup_run)
+    for name, handler in COMMANDS.items():
+        app.register(name, handler)
 
-    app.run([args.command, *args.args, *unknown_args])
+    try:
+        app.run([args.command, *command_args])
+    finally:
+        app.close()
 
 
 if __name__ == "__main__":
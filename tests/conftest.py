@@ -1,7 +1,15 @@
 import sys
 from pathlib import Path
 
+import pytest
+
 
 ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
+
+
+@pytest.fixture(autouse=True)
+def _isolated_home(tmp_path_factory, monkeypatch) -> None:
+    # Contexts cache the spec under ~/.cache; keep that out of the real home.
+    monkeypatch.setenv("HOME", str(tmp_path_factory.mktemp("home")))
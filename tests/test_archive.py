@@ -0,0 +1,128 @@
+import os
+import tarfile
+import zipfile
+from pathlib import Path
+
+import pytest
+
+import commands._archive as archive_module
+from commands._archive import ArchiveError, _verify, _write_tar, archive_items
+from commands._cleanup import CleanupItem
+
+
+def _project(root: Path) -> Path:
+    project = root / "old-project"
+    (project / "src").mkdir(parents=True)
+    (project / "src" / "main.py").write_text("print('hi')\n" * 200, encoding="utf-8")
+    (project / "notes.txt").write_text("notes\n" * 500, encoding="utf-8")
+    return project
+
+
+def test_archive_items_compresses_verifies_and_removes(tmp_path: Path) -> None:
+    project = _project(tmp_path)
+    loose = tmp_path / "report.txt"
+    loose.write_text("report\n" * 1000, encoding="utf-8")
+    archive_dir = tmp_path / "archive"
+    archive_dir.mkdir()
+    (archive_dir / "report.txt.tar.gz").write_bytes(b"older archive")
+    items = [
+        CleanupItem(path=project, size=8400, classification="might-need"),
+        CleanupItem(path=loose, size=7000, classification="might-need"),
+    ]
+
+    archived, failed = archive_items(items, archive_dir, jobs=2, max_in_flight=1)
+
+    assert failed == []
+    assert not project.exists() and not loose.exists()
+    by_name = {done.item.path.name: done for done in archived}
+    assert by_name["old-project"].archive == archive_dir / "old-project.tar.gz"
+    # The existing archive is left alone.
+    assert by_name["report.txt"].archive.name.startswith("report.txt.")
+    assert (archive_dir / "report.txt.tar.gz").read_bytes() == b"older archive"
+    assert all(done.reclaimed > 0 for done in archived)
+    with tarfile.open(archive_dir / "old-project.tar.gz") as tar:
+        assert tar.extractfile("old-project/src/main.py").read() == b"print('hi')\n" * 200
+    assert not list(archive_dir.glob("*.partial"))
+
+
+def test_zip_keeps_originals_it_cannot_hold(tmp_path: Path) -> None:
+    project = _project(tmp_path)
+    os.symlink("notes.txt", project / "link")
+    item = CleanupItem(path=project, size=8400, classification="might-need")
+
+    archived, failed = archive_items([item], tmp_path / "archive", fmt="zip", jobs=1)
+
+    assert archived == []
+    assert [path for path, _ in failed] == [project]
+    assert (project / "link").is_symlink()
+    assert list((tmp_path / "archive").iterdir()) == []
+
+
+def test_zip_round_trip(tmp_path: Path) -> None:
+    project = _project(tmp_path)
+    item = CleanupItem(path=project, size=8400, classification="might-need")
+
+    archived, failed = archive_items([item], tmp_path / "archive", fmt="zip", jobs=1)
+
+    assert failed == [] and not project.exists()
+    with zipfile.ZipFile(archived[0].archive) as archive:
+        assert archive.read("old-project/notes.txt") == b"notes\n" * 500
+
+
+def test_verify_rejects_a_damaged_archive(tmp_path: Path) -> None:
+    project = _project(tmp_path)
+    target = tmp_path / "project.tar.gz"
+    with open(target, "wb") as fileobj:
+        manifest = _write_tar(os.fspath(project), fileobj, "w:gz")
+    _verify(os.fspath(target), "tar.gz", manifest)
+
+    data = target.read_bytes()
+    target.write_bytes(data[: len(data) // 2])
+    with pytest.raises((ArchiveError, EOFError, OSError, tarfile.TarError)):
+        _verify(os.fspath(target), "tar.gz", manifest)
+
+
+def test_original_changed_while_archiving_is_kept(tmp_path: Path, monkeypatch) -> None:
+    project = _project(tmp_path)
+    item = CleanupItem(path=project, size=8400, classification="might-need")
+    real_wait = archive_module.wait
+
+    def wait_then_write(*args, **kwargs):
+        # The archive is finished; a file is saved into the folder before
+        # the original would be removed.
+        result = real_wait(*args, **kwargs)
+        (project / "src" / "new.py").write_text("print('new')\n", encoding="utf-8")
+        return result
+
+    monkeypatch.setattr(archive_module, "wait", wait_then_write)
+    archived, failed = archive_items([item], tmp_path / "archive", jobs=1)
+
+    assert archived == []
+    assert [path for path, _ in failed] == [project]
+    assert "changed while archiving" in failed[0][1]
+    assert (project / "src" / "new.py").exists() and (project / "notes.txt").exists()
+    assert (tmp_path / "archive" / "old-project.tar.gz").exists()
+
+
+def test_nested_items_go_into_the_enclosing_archive(tmp_path: Path) -> None:
+    project = _project(tmp_path)
+    items = [
+        CleanupItem(path=project / "src", size=2400, classification="might-need"),
+        CleanupItem(path=project, size=8400, classification="might-need"),
+    ]
+
+    archived, failed = archive_items(items, tmp_path / "archive", jobs=2)
+
+    assert failed == []
+    assert [done.item.path for done in archived] == [project]
+    assert [path.name for path in (tmp_path / "archive").iterdir()] == ["old-project.tar.gz"]
+    assert not project.exists()
+
+
+def test_dry_run_archives_nothing(tmp_path: Path) -> None:
+    project = _project(tmp_path)
+    item = CleanupItem(path=project, size=8400, classification="might-need")
+
+    assert archive_items([item], tmp_path / "archive", dry_run=True) == ([], [])
+    assert project.exists()
+    assert not (tmp_path / "archive").exists()
@@ -0,0 +1,39 @@
+import os
+from pathlib import Path
+
+from benchmarks.run import compare
+from benchmarks.treegen import TreeSpec, generate
+
+
+def _listing(root: Path) -> list[tuple[str, int]]:
+    found = []
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            path = Path(dirpath) / name
+            found.append((str(path.relative_to(root)), path.stat().st_size))
+    return sorted(found)
+
+
+def test_tree_generator_is_seeded(tmp_path: Path) -> None:
+    spec = TreeSpec(files=60, width=2, depth=1, large_ratio=0.1)
+    manifest = generate(tmp_path / "a", spec)
+    generate(tmp_path / "b", spec)
+
+    first = [entry for entry in _listing(tmp_path / "a") if not entry[0].startswith(".")]
+    assert len(first) == 60
+    assert first == [entry for entry in _listing(tmp_path / "b") if not entry[0].startswith(".")]
+    assert manifest["bytes"] == sum(size for _, size in first)
+    # Large files are sparse: far less is allocated than their size.
+    largest = max(first, key=lambda entry: entry[1])
+    assert largest[1] >= 300 * 1024 * 1024
+    assert (tmp_path / "a" / largest[0]).stat().st_blocks * 512 < largest[1]
+
+
+def test_compare_flags_regressions_over_threshold() -> None:
+    baseline = {"results": {"fast": {"median": 0.001}, "slow": {"median": 0.1}, "ok": {"median": 0.1}}}
+    current = {"results": {"fast": {"median": 0.004}, "slow": {"median": 0.13}, "ok": {"median": 0.105}}}
+
+    regressions = compare(baseline, current, threshold=10, min_seconds=0.005)
+
+    assert len(regressions) == 1
+    assert regressions[0].startswith("slow:")
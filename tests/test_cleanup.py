@@ -1,8 +1,9 @@
 import os
+import threading
 import time
 from pathlib import Path
 
-from commands._cleanup import CleanupItem, downloads_candidates, move_to_trash
+from commands._cleanup import CleanupItem, downloads_candidates, move_to_trash, recheck
 from life_os.context import Context
 
 
@@ -24,6 +25,8 @@ def _make_context(tmp_path: Path) -> Context:
                 "  downloads:",
                 "    path: " + str(tmp_path / "Downloads"),
                 "cleanup:",
+                "  prune:",
+                "    names: [node_modules]",
                 "  actions:",
                 "    trash_dir: " + str(tmp_path / ".Trash"),
                 "  downloads:",
@@ -77,3 +80,117 @@ def test_move_to_trash_dry_run(tmp_path: Path) -> None:
 
     assert moved == []
     assert file_path.exists()
+
+
+def test_prune_rules_do_not_hide_download_contents(tmp_path: Path) -> None:
+    # Pruning is for cache and large-file walks; a folder in Downloads is
+    # sized with everything in it.
+    context = _make_context(tmp_path)
+    context.use_prune("cleanup")
+    modules = context.downloads / "proj" / "node_modules"
+    modules.mkdir(parents=True)
+    (modules / "dep.bin").write_bytes(b"x" * 5 * 1024 * 1024)
+
+    [item] = downloads_candidates(context)
+
+    assert item.path == context.downloads / "proj"
+    assert item.size == 5 * 1024 * 1024
+    assert context.scan.item_size(item.path, prune=True) == 0
+
+
+def test_recheck_drops_moved_items_and_remeasures_changed_ones(tmp_path: Path) -> None:
+    folder = tmp_path / "project"
+    folder.mkdir()
+    (folder / "keep.bin").write_bytes(b"x" * 100)
+    (folder / "nested").mkdir()
+    (folder / "nested" / "moved.bin").write_bytes(b"x" * 50)
+    grown = tmp_path / "grown.log"
+    grown.write_bytes(b"x" * 10)
+
+    items = [
+        CleanupItem(path=folder, size=150, classification="might-need"),
+        CleanupItem(path=grown, size=10, classification="trash"),
+        CleanupItem(path=tmp_path / "gone.dmg", size=5, classification="trash"),
+    ]
+    # An earlier step moved a file out of the folder; another file grew.
+    (folder / "nested" / "moved.bin").unlink()
+    grown.write_bytes(b"x" * 40)
+
+    fresh, gone, resized = recheck(items)
+
+    assert gone == 1
+    assert resized == 2
+    assert {item.path: item.size for item in fresh} == {folder: 100, grown: 40}
+
+
+def test_recheck_sees_changes_below_the_top_folder(tmp_path: Path) -> None:
+    # A file added two levels down leaves the candidate folder's own mtime
+    # alone; the indexed re-walk still picks it up.
+    from life_os.index import SizeIndex
+    from life_os.scan import scan_tree
+
+    folder = tmp_path / "project"
+    (folder / "deep" / "er").mkdir(parents=True)
+    (folder / "deep" / "er" / "a.bin").write_bytes(b"x" * 100)
+    index = SizeIndex(tmp_path / "index.db")
+    item = CleanupItem(
+        path=folder, size=scan_tree(folder, index=index).size, classification="might-need"
+    )
+    top_mtime = folder.stat().st_mtime_ns
+
+    (folder / "deep" / "er" / "b.bin").write_bytes(b"x" * 50)
+    assert folder.stat().st_mtime_ns == top_mtime
+
+    fresh, gone, resized = recheck([item], index=index)
+
+    assert (gone, resized) == (0, 1)
+    assert fresh[0].size == 150
+
+
+def test_recheck_walks_items_the_way_they_were_measured(tmp_path: Path, monkeypatch) -> None:
+    import commands._cleanup as cleanup_module
+    from life_os.matcher import Allowlist
+    from life_os.scan import scan_tree
+
+    walks = []
+
+    def recording(path, **options):
+        walks.append((path, options["jobs"], options["one_filesystem"], options["prune"]))
+        return scan_tree(path, **options)
+
+    monkeypatch.setattr(cleanup_module, "scan_tree", recording)
+    prune = Allowlist(names=["node_modules"])
+    cache = tmp_path / "cache"
+    download = tmp_path / "download"
+    cache.mkdir()
+    download.mkdir()
+    items = [
+        CleanupItem(cache, 0, "trash", jobs=4, one_filesystem=False, pruned=True),
+        CleanupItem(download, 0, "might-need"),
+    ]
+
+    fresh, gone, resized = recheck(items, prune=prune)
+
+    assert (gone, resized) == (0, 0)
+    assert walks == [(cache, 4, False, prune), (download, 1, True, None)]
+
+
+def test_prefetch_cancels_scans_that_are_no_longer_wanted(tmp_path: Path) -> None:
+    from commands._scheduler import prefetch
+    from life_os.scan import ScanCancelled, scan_tree
+
+    for number in range(200):
+        (tmp_path / f"d{number}").mkdir()
+    started = threading.Event()
+
+    def slow_walk(_context):
+        started.set()
+        time.sleep(0.2)
+        return scan_tree(tmp_path)
+
+    [(label, future, cancel)] = prefetch([("Walk", slow_walk)], None)
+    started.wait(5)
+    cancel.set()
+
+    assert label == "Walk"
+    assert isinstance(future.exception(timeout=5), ScanCancelled)
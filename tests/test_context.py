@@ -33,4 +33,4 @@ def test_context_expands_paths(tmp_path: Path) -> None:
 
     assert context.desktop == home / "Desktop"
     assert context.downloads == home / "Downloads"
-    assert context.hygiene["downloads"]["age_days"] == 7
+    assert context.plan.hygiene.downloads.age_days == 7
@@ -0,0 +1,43 @@
+import os
+from pathlib import Path
+
+import commands._dedupe as dedupe
+from commands._dedupe import duplicate_items, find_duplicates
+
+
+def test_find_duplicates_stages(tmp_path: Path, monkeypatch) -> None:
+    docs = tmp_path / "Documents"
+    downloads = tmp_path / "Downloads"
+    docs.mkdir()
+    downloads.mkdir()
+    big = b"a" * 5000 + b"middle" + b"z" * 5000
+    (docs / "report.pdf").write_bytes(big)
+    (downloads / "report (1).pdf").write_bytes(big)
+    # Same size and edges, different middle: only the full hash tells them apart.
+    (downloads / "other.pdf").write_bytes(b"a" * 5000 + b"MIDDLE" + b"z" * 5000)
+    (docs / "small.txt").write_bytes(b"s" * 2000)
+    (downloads / "small.txt").write_bytes(b"s" * 2000)
+    (downloads / "unique.bin").write_bytes(b"u" * 3333)
+    os.link(docs / "report.pdf", docs / "hardlink.pdf")
+
+    opened: list[str] = []
+    original = dedupe._edge_digest
+
+    def recording(path, size, edge):
+        opened.append(path)
+        return original(path, size, edge)
+
+    monkeypatch.setattr(dedupe, "_edge_digest", recording)
+    report = find_duplicates([docs, downloads], min_size=1024, edge=4096)
+
+    assert str(downloads / "unique.bin") not in opened
+    assert report.full_hashed == 3
+    assert [(group.keeper, group.losers) for group in report.groups] == [
+        (docs / "report.pdf", (downloads / "report (1).pdf",)),
+        (docs / "small.txt", (downloads / "small.txt",)),
+    ]
+    assert report.reclaimable == len(big) + 2000
+
+    items = duplicate_items(report)
+    assert {item.path for item in items} == {downloads / "report (1).pdf", downloads / "small.txt"}
+    assert all(item.classification == "trash" for item in items)
@@ -0,0 +1,93 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from commands.doctor import run
+from life_os.context import Context
+
+
+def _make_context(tmp_path: Path) -> Context:
+    spec_path = tmp_path / "spec.yaml"
+    spec_path.write_text(
+        "\n".join(
+            [
+                "version: 0.4",
+                "filesystem:",
+                "  workspace:",
+                "    path: " + str(tmp_path / "Workspace"),
+                "  system:",
+                "    path: " + str(tmp_path / "System"),
+                "  documents:",
+                "    path: " + str(tmp_path / "Documents"),
+                "hygiene:",
+                "  caches:",
+                "    warn_over_mb: 1",
+                "    paths:",
+                "      - " + str(tmp_path / "Caches"),
+            ]
+        ),
+        encoding="utf-8",
+    )
+    return Context(spec_path=spec_path, use_spec_cache=False)
+
+
+def test_doctor_json_streams_one_line_per_check(tmp_path: Path, capsys) -> None:
+    context = _make_context(tmp_path)
+    (tmp_path / "Caches").mkdir()
+    (tmp_path / "Caches" / "blob").write_bytes(b"x" * 2048)
+
+    with pytest.raises(SystemExit) as exit_info:
+        run(context, ["--json", "--no-index", "--no-watch"])
+
+    lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert exit_info.value.code == 1
+    assert [line["type"] for line in lines] == ["check"] * 7 + ["summary"]
+    by_name = {line["name"]: line for line in lines[:-1]}
+    assert by_name["Workspace"]["fixable"] is True
+    [cache] = by_name["Caches Reporting"]["sizes"]
+    assert cache["path"] == str(tmp_path / "Caches")
+    assert cache["size"] == 2048
+    assert cache["allocated"] >= 0
+    assert all(line["elapsed_ms"] is not None for line in lines[:-1])
+    assert lines[-1] == {**lines[-1], "ok": False, "checks": 7}
+
+
+def test_doctor_json_stops_quietly_when_the_reader_goes_away(tmp_path: Path) -> None:
+    read_end, write_end = os.pipe()
+    os.close(read_end)
+    try:
+        proc = subprocess.run(
+            [sys.executable, "main.py", "doctor", "--json", "--no-index", "--no-watch"],
+            cwd=Path(__file__).resolve().parents[1],
+            env={**os.environ, "HOME": str(tmp_path)},
+            stdout=write_end,
+            stderr=subprocess.PIPE,
+            text=True,
+            timeout=60,
+        )
+    finally:
+        os.close(write_end)
+
+    assert "Traceback" not in proc.stderr
+    assert "BrokenPipeError" not in proc.stderr
+    assert proc.returncode in (0, 1)
+
+
+def test_no_spec_cache_is_accepted_after_the_command(tmp_path: Path) -> None:
+    proc = subprocess.run(
+        [sys.executable, "main.py", "doctor", "--no-spec-cache", "--json", "--no-index"],
+        cwd=Path(__file__).resolve().parents[1],
+        env={**os.environ, "HOME": str(tmp_path)},
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+
+    assert "unrecognized arguments" not in proc.stderr
+    assert proc.returncode in (0, 1)
+    assert json.loads(proc.stdout.splitlines()[-1])["type"] == "summary"
+    assert not (tmp_path / ".cache" / "life-os").exists()
@@ -0,0 +1,131 @@
+import json
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+import commands._homes as homes_module
+from commands._homes import doctor_homes, resolve_homes
+from commands.doctor import run
+from life_os.context import Context
+
+
+def _write_spec(tmp_path: Path) -> Path:
+    spec_path = tmp_path / "spec.yaml"
+    spec_path.write_text(
+        "\n".join(
+            [
+                "version: 0.4",
+                "filesystem:",
+                "  workspace:",
+                "    path: ~/Workspace",
+                "    required_folders: [code]",
+                "  system:",
+                "    path: ~/System",
+                "  documents:",
+                "    path: ~/Documents",
+            ]
+        ),
+        encoding="utf-8",
+    )
+    return spec_path
+
+
+def _make_home(root: Path, name: str, complete: bool) -> Path:
+    home = root / name
+    for folder in ("Workspace", "System", "Documents"):
+        (home / folder).mkdir(parents=True)
+    if complete:
+        (home / "Workspace" / "code").mkdir()
+    return home
+
+
+def test_resolve_homes_from_glob_and_file(tmp_path: Path) -> None:
+    first = _make_home(tmp_path / "homes", "alice", complete=True)
+    second = _make_home(tmp_path / "homes", "bob", complete=True)
+    (tmp_path / "homes" / "notes.txt").write_text("not a home", encoding="utf-8")
+
+    assert resolve_homes(str(tmp_path / "homes" / "*")) == [first, second]
+
+    listing = tmp_path / "homes.txt"
+    listing.write_text(f"# staff\n{second}\n\n{first}\n", encoding="utf-8")
+    assert resolve_homes(str(listing)) == [second, first]
+
+
+def test_doctor_homes_checks_each_home_separately(tmp_path: Path) -> None:
+    spec_path = _write_spec(tmp_path)
+    good = _make_home(tmp_path / "homes", "good", complete=True)
+    bad = _make_home(tmp_path / "homes", "bad", complete=False)
+
+    summaries = list(
+        doctor_homes([good, bad], spec_path, "workspace", {"no_index": True}, workers=2)
+    )
+
+    assert [summary["home"] for summary in summaries] == [str(good), str(bad)]
+    assert summaries[0]["ok"] is True
+    assert summaries[1]["ok"] is False
+    assert summaries[1]["failed"] == ["Workspace"]
+    assert all(summary["checks"] == 1 for summary in summaries)
+
+
+def test_doctor_homes_json_ends_with_summary(tmp_path: Path, capsys) -> None:
+    spec_path = _write_spec(tmp_path)
+    _make_home(tmp_path / "homes", "good", complete=True)
+    context = Context(spec_path=spec_path, use_spec_cache=False)
+
+    with pytest.raises(SystemExit) as exit_info:
+        run(
+            context,
+            ["workspace", "--homes", str(tmp_path / "homes" / "*"), "--json", "--no-index"],
+        )
+
+    lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert exit_info.value.code == 0
+    assert [line["type"] for line in lines] == ["home", "summary"]
+    assert lines[-1]["homes"] == 1 and lines[-1]["failing"] == 0
+
+
+def test_queued_homes_are_timed_from_their_own_start(tmp_path: Path, monkeypatch) -> None:
+    # Twelve homes through two workers take longer than one home's limit
+    # plus grace; none may be reported as timed out for waiting in line.
+    monkeypatch.setattr(homes_module, "_GRACE_SECONDS", 0.5)
+    spec_path = _write_spec(tmp_path)
+    homes = [_make_home(tmp_path / "homes", f"user{n}", complete=True) for n in range(12)]
+    options = {"no_index": True, "home_timeout": 1.0}
+
+    summaries = list(doctor_homes(homes, spec_path, "workspace", options, workers=2))
+
+    assert [summary["home"] for summary in summaries] == [str(home) for home in homes]
+    assert [summary.get("error") for summary in summaries] == [None] * len(homes)
+
+
+def test_stuck_home_is_terminated(tmp_path: Path, monkeypatch) -> None:
+    # Reading a FIFO with no writer blocks the worker before any check runs.
+    monkeypatch.setattr(homes_module, "_GRACE_SECONDS", 0.2)
+    spec_path = tmp_path / "spec.yaml"
+    os.mkfifo(spec_path)
+    home = _make_home(tmp_path / "homes", "stuck", complete=True)
+
+    started = time.monotonic()
+    [summary] = doctor_homes([home], spec_path, None, {"home_timeout": 0.5}, workers=1)
+
+    assert summary["ok"] is False
+    assert summary["error"] == "Timed out after 0.5s."
+    assert time.monotonic() - started < 10
+
+
+def test_audited_homes_get_their_index_outside_the_home(tmp_path: Path) -> None:
+    spec_path = _write_spec(tmp_path)
+    with open(spec_path, "a", encoding="utf-8") as spec:
+        spec.write("\nindex:\n  path: ~/System/index.sqlite\n")
+    home = _make_home(tmp_path / "homes", "audited", complete=True)
+    before = sorted(path.relative_to(home) for path in home.rglob("*"))
+    index_dir = tmp_path / "auditor-cache"
+    index_dir.mkdir()
+
+    [summary] = doctor_homes([home], spec_path, None, {"index_dir": str(index_dir)}, workers=1)
+
+    assert summary.get("error") is None
+    assert sorted(path.relative_to(home) for path in home.rglob("*")) == before
+    assert [path.suffix for path in index_dir.iterdir()] == [".sqlite"]
@@ -0,0 +1,112 @@
+import os
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from life_os.index import SizeIndex
+from life_os.scan import ScanCancelled, cancellable, scan_tree
+
+
+def _age(root: Path) -> None:
+    old_time = time.time() - 60
+    for current, dirs, _ in root.walk():
+        for name in dirs:
+            os.utime(current / name, (old_time, old_time))
+    os.utime(root, (old_time, old_time))
+
+
+def test_index_reuses_unchanged_directories(tmp_path: Path) -> None:
+    root = tmp_path / "root"
+    (root / "a" / "b").mkdir(parents=True)
+    (root / "a" / "b" / "big.bin").write_bytes(b"x" * 2 * 1024 * 1024)
+    (root / "a" / "small.bin").write_bytes(b"x" * 10)
+    _age(root)
+    index_path = tmp_path / "index.sqlite"
+
+    index = SizeIndex(index_path)
+    cold = scan_tree(root, threshold=1024 * 1024, index=index)
+    index.close()
+
+    index = SizeIndex(index_path)
+    warm = scan_tree(root, threshold=1024 * 1024, index=index)
+    index.close()
+
+    assert index.misses == 0
+    assert index.hits == 3
+    assert warm.size == cold.size
+    assert sorted(warm.large) == sorted(cold.large)
+
+
+def test_index_rescans_changed_directories(tmp_path: Path) -> None:
+    root = tmp_path / "root"
+    (root / "a").mkdir(parents=True)
+    (root / "a" / "one.bin").write_bytes(b"x" * 10)
+    _age(root)
+    index_path = tmp_path / "index.sqlite"
+
+    index = SizeIndex(index_path)
+    scan_tree(root, index=index)
+    index.close()
+
+    (root / "a" / "two.bin").write_bytes(b"x" * 5)
+    index = SizeIndex(index_path)
+    result = scan_tree(root, index=index)
+    index.close()
+
+    assert result.size == 15
+    assert index.misses == 1
+
+    rebuilt = SizeIndex(index_path, rebuild=True)
+    assert rebuilt.records == {}
+    rebuilt.close()
+
+
+def test_index_sizes_hard_links_the_same_from_any_root(tmp_path: Path) -> None:
+    # The record for "b" must not depend on "a" having claimed the link
+    # during the walk that stored it.
+    root = tmp_path / "root"
+    (root / "a").mkdir(parents=True)
+    (root / "b").mkdir()
+    (root / "a" / "f").write_bytes(b"x" * 1000)
+    os.link(root / "a" / "f", root / "b" / "f")
+    (root / "b" / "other").write_bytes(b"x" * 10)
+    _age(root)
+    index = SizeIndex(tmp_path / "index.sqlite")
+
+    assert scan_tree(root, index=index).size == 1010
+    assert scan_tree(root / "b", index=index).size == 1010
+    assert index.misses == 3
+
+    (root / "b" / "other").unlink()
+    assert scan_tree(root, index=index).size == 1000
+    index.close()
+
+
+def test_cancelled_walk_keeps_records_it_did_not_reach(tmp_path: Path) -> None:
+    root = tmp_path / "root"
+    for number in range(50):
+        (root / f"d{number}").mkdir(parents=True)
+    _age(root)
+    index_path = tmp_path / "index.sqlite"
+    index = SizeIndex(index_path)
+    scan_tree(root, index=index)
+    index.close()
+
+    index = SizeIndex(index_path)
+    original = index.lookup
+    stop = threading.Event()
+
+    def lookup_then_stop(path, st):
+        # Stop after the root and a few folders have been read.
+        if len(index.seen) >= 4:
+            stop.set()
+        return original(path, st)
+
+    index.lookup = lookup_then_stop
+    with pytest.raises(ScanCancelled), cancellable(stop):
+        scan_tree(root, index=index)
+    index.close()
+
+    assert len(SizeIndex(index_path).records) == 51
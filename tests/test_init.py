@@ -0,0 +1,46 @@
+from pathlib import Path
+
+import pytest
+
+from commands.init import run
+from life_os.context import Context
+
+
+def _context(tmp_path: Path) -> Context:
+    spec_path = tmp_path / "spec.yaml"
+    spec_path.write_text(
+        "\n".join(
+            [
+                "version: 0.4",
+                "filesystem:",
+                "  workspace:",
+                "    path: " + str(tmp_path / "Workspace"),
+                "    required_folders: [code]",
+                "  system:",
+                "    path: " + str(tmp_path / "System"),
+                "  documents:",
+                "    path: " + str(tmp_path / "Documents"),
+            ]
+        ),
+        encoding="utf-8",
+    )
+    return Context(spec_path=spec_path, use_spec_cache=False)
+
+
+def test_init_takes_verbose_as_a_flag(tmp_path: Path) -> None:
+    context = _context(tmp_path)
+
+    with pytest.raises(SystemExit) as exit_info:
+        run(context, ["--verbose"])
+
+    assert exit_info.value.code == 0
+    assert context.verbose is True
+    assert (tmp_path / "Workspace" / "code").is_dir()
+
+
+def test_init_rejects_unknown_flags(tmp_path: Path) -> None:
+    with pytest.raises(SystemExit) as exit_info:
+        run(_context(tmp_path), ["--quiet"])
+
+    assert exit_info.value.code == 2
+    assert not (tmp_path / "Workspace").exists()
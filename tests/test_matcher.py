@@ -0,0 +1,62 @@
+import re
+
+from life_os.matcher import compile_allowlist, compile_prune
+
+
+def test_allowlist_matches_like_search() -> None:
+    patterns = [
+        "^_Inbox$",
+        "^tmp",
+        r"\.part$",
+        "backup",
+        r"^IMG_\d+\.HEIC$",
+        "(?i)^readme",
+        r"(a)\1",
+    ]
+    names = [".DS_Store"]
+    allowlist, errors = compile_allowlist({"names": names, "patterns": patterns})
+
+    assert errors == []
+    assert "_Inbox" in allowlist.names
+    assert allowlist.prefixes == ("tmp",)
+    assert allowlist.suffixes == (".part",)
+    assert allowlist.substrings == ("backup",)
+
+    samples = [
+        ".DS_Store",
+        "_Inbox",
+        "_Inbox2",
+        "tmpfile",
+        "x.part",
+        "old-backup.zip",
+        "IMG_0042.HEIC",
+        "IMG_x.HEIC",
+        "README.md",
+        "Readme",
+        "aa",
+        "notes.txt",
+    ]
+    for name in samples:
+        expected = name in names or any(re.search(p, name) for p in patterns)
+        assert (name in allowlist) == expected, name
+
+
+def test_allowlist_reports_invalid_patterns() -> None:
+    allowlist, errors = compile_allowlist({"patterns": ["^ok$", "([unclosed"]}, "hygiene.desktop.allowlist")
+
+    assert "ok" in allowlist
+    assert len(errors) == 1
+    assert errors[0].startswith("hygiene.desktop.allowlist: invalid pattern '([unclosed'")
+
+
+def test_prune_rules_accept_names_globs_and_regexes() -> None:
+    prune, errors = compile_prune(
+        {"names": [".git"], "globs": ["*.egg-info", "build"], "patterns": ["^venv\\d*$"]}
+    )
+
+    assert errors == []
+    assert {".git", "build"} <= prune.names
+    for name in (".git", "pkg.egg-info", "build", "venv", "venv3"):
+        assert name in prune, name
+    for name in ("src", "egg-info.bak", "rebuild", "myvenv"):
+        assert name not in prune, name
@@ -0,0 +1,134 @@
+import dataclasses
+from pathlib import Path
+
+import pytest
+
+from life_os.plan import MB, Root, SpecError, compile_plan
+from life_os.spec import prepare_spec
+
+
+FILESYSTEM = {
+    "workspace": {"path": "~/Workspace", "required_folders": ["code"]},
+    "system": {"path": "~/System"},
+    "documents": {"path": "~/Documents"},
+}
+
+
+def _compile(tmp_path: Path, **sections):
+    return compile_plan(prepare_spec({"filesystem": FILESYSTEM, **sections}), tmp_path)
+
+
+def test_plan_expands_paths_against_home_and_converts_units(tmp_path: Path) -> None:
+    plan = _compile(
+        tmp_path,
+        hygiene={
+            "downloads": {"groups": {"disk images": [".DMG", ".iso"]}},
+            "large_files": {"min_size_mb": 2, "roots": [{"path": "~/big", "jobs": 3}]},
+        },
+        cleanup={
+            "actions": {"trash_dir": "~/.Trash"},
+            "downloads": {"rules": {"trash_extensions": [".DMG"]}},
+            "large_files": {"min_size_mb": 1},
+        },
+    )
+
+    assert plan.workspace == tmp_path / "Workspace"
+    assert plan.desktop == tmp_path / "Desktop"
+    assert plan.cleanup.trash_dir == tmp_path / ".Trash"
+    assert plan.hygiene.downloads.groups == {".dmg": "disk images", ".iso": "disk images"}
+    assert plan.cleanup.trash_extensions == {".dmg"}
+    assert plan.hygiene.large_files.roots == (Root(tmp_path / "big", jobs=3),)
+    assert plan.large_floor() == 1 * MB
+    assert [folder.label for folder in plan.folders] == ["Workspace", "System", "Documents"]
+    assert plan.folders[0].tree == {"code": {}}
+
+
+def test_plan_is_frozen(tmp_path: Path) -> None:
+    plan = _compile(tmp_path)
+
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        plan.home = Path("/")
+    with pytest.raises(TypeError):
+        plan.hygiene.downloads.groups[".zip"] = "zip"
+
+
+def test_plan_reports_every_problem_at_once(tmp_path: Path) -> None:
+    spec = {
+        "filesystem": {"workspace": {"path": "~/Workspace"}, "system": {}},
+        "hygiene": {"downloads": {"age_days": "soon"}},
+        "cleanup": {"large_files": {"roots": [{"path": "~/x", "jobs": -1}]}},
+    }
+
+    with pytest.raises(SpecError) as raised:
+        compile_plan(prepare_spec(spec), tmp_path)
+
+    assert raised.value.errors == [
+        "filesystem.documents.path: required",
+        "filesystem.system.path: required",
+        "hygiene.downloads.age_days: expected a number, got 'soon'",
+        "cleanup.large_files.roots[0].jobs: must not be negative",
+    ]
+
+
+def test_root_paths_expand_globs(tmp_path: Path) -> None:
+    (tmp_path / "a-cache").mkdir()
+    (tmp_path / "b-cache").mkdir()
+
+    root = Root(tmp_path / "*-cache")
+
+    assert root.paths() == [tmp_path / "a-cache", tmp_path / "b-cache"]
+    assert Root(tmp_path / "plain").paths() == [tmp_path / "plain"]
+    assert Root(tmp_path, jobs=2).workers() == 2
+    assert Root(tmp_path, jobs=2).workers(5) == 5
+
+
+def test_null_numbers_take_their_defaults(tmp_path: Path) -> None:
+    plan = _compile(
+        tmp_path,
+        hygiene={"downloads": {"top_n": None, "age_days": None}, "large_files": {"top_n": None}},
+        dedupe={"jobs": None},
+    )
+
+    assert plan.hygiene.downloads.top_n == 5
+    assert plan.hygiene.downloads.age_days == 7
+    assert plan.hygiene.large_files.top_n == 10
+    assert plan.dedupe.jobs == 4
+
+
+def test_empty_download_groups_stay_empty(tmp_path: Path) -> None:
+    assert dict(_compile(tmp_path).hygiene.downloads.groups) == {
+        ".dmg": "dmg",
+        ".pkg": "pkg",
+        ".zip": "zip",
+    }
+    plan = _compile(tmp_path, hygiene={"downloads": {"groups": {}}})
+    assert dict(plan.hygiene.downloads.groups) == {}
+
+
+@pytest.mark.parametrize(
+    ("sections", "error"),
+    [
+        ({"hygiene": [1]}, "spec.hygiene: expected a mapping"),
+        (
+            {"hygiene": {"desktop": {"allowlist": ["x"]}}},
+            "hygiene.desktop.allowlist: expected a mapping",
+        ),
+        (
+            {"hygiene": {"desktop": {"allowlist": {"patterns": "x"}}}},
+            "hygiene.desktop.allowlist.patterns: expected a list of strings",
+        ),
+        (
+            {"cleanup": {"prune": {"names": "node_modules"}}},
+            "cleanup.prune.names: expected a list of strings",
+        ),
+        (
+            {"filesystem": {**FILESYSTEM, "documents": {"path": "~/D", "subfolders": ["a"]}}},
+            "filesystem.documents: subfolders must map a folder name to its subfolders",
+        ),
+    ],
+)
+def test_plan_rejects_sections_of_the_wrong_shape(tmp_path: Path, sections, error) -> None:
+    with pytest.raises(SpecError) as raised:
+        _compile(tmp_path, **sections)
+
+    assert raised.value.errors == [error]
@@ -0,0 +1,54 @@
+from pathlib import Path
+
+from life_os import profile
+from life_os.scan import list_dir, scan_tree
+
+
+def test_profile_counts_walks_inside_spans(tmp_path: Path) -> None:
+    for name in ("a", "b", "c"):
+        folder = tmp_path / name / "inner"
+        folder.mkdir(parents=True)
+        (folder / "data.bin").write_bytes(b"x" * 100)
+
+    profiler = profile.enable()
+    try:
+        with profile.span("Check", "check") as check:
+            scan_tree(tmp_path, jobs=2)
+            list_dir(tmp_path / "missing")
+    finally:
+        profile.disable()
+
+    assert check.dirs == 7
+    assert check.stats == 3
+    assert check.bytes == 300
+    assert check.errors == 1
+
+    events = profiler.chrome_trace()["traceEvents"]
+    assert [(event["name"], event["cat"]) for event in events] == [
+        ("Check", "check"),
+        (str(tmp_path), "walk"),
+    ]
+    assert events[1]["args"]["dirs"] == 7
+    assert events[0]["dur"] >= events[1]["dur"]
+
+
+def test_profile_credits_listing_and_sizing_to_the_check(tmp_path: Path) -> None:
+    from life_os.session import ScanSession
+
+    (tmp_path / "old.dmg").write_bytes(b"x" * 40)
+    (tmp_path / "project").mkdir()
+    (tmp_path / "project" / "data.bin").write_bytes(b"x" * 60)
+    session = ScanSession()
+    session.item_size(tmp_path)
+
+    profile.enable()
+    try:
+        with profile.span("Downloads Aging", "check") as check:
+            sizes = [session.entry_size(entry) for entry in session.list_dir(tmp_path)]
+    finally:
+        profile.disable()
+
+    assert sorted(sizes) == [40, 60]
+    assert check.dirs == 1
+    assert check.stats == 1
+    assert check.bytes == 100
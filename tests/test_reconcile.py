@@ -0,0 +1,83 @@
+import os
+from pathlib import Path
+
+from commands._folders import check_folder
+from life_os import reconcile
+from life_os.reconcile import folder_tree, plan_folders
+
+
+def test_folder_tree_merges_every_spelling() -> None:
+    tree = folder_tree(
+        {
+            "required_folders": ["school", "files"],
+            "subfolders": {"school": ["notes"]},
+            "folders": {
+                "school": {"notes": ["2025/spring"], "assignments": None},
+                "finance": [{"taxes": ["receipts"]}, "budgets"],
+            },
+        }
+    )
+
+    assert tree == {
+        "school": {"notes": {"2025": {"spring": {}}}, "assignments": {}},
+        "files": {},
+        "finance": {"taxes": {"receipts": {}}, "budgets": {}},
+    }
+
+
+def test_plan_lists_only_existing_parents_and_creates_branches_in_order(
+    tmp_path: Path, monkeypatch
+) -> None:
+    tree = folder_tree(
+        {"folders": {"a": {"b": {"c": None}}, "d": {"e": None, "f": None}, "g": None}}
+    )
+    (tmp_path / "a").mkdir()
+    (tmp_path / "g").write_text("not a folder", encoding="utf-8")
+    listed = []
+    original = os.scandir
+    monkeypatch.setattr(
+        reconcile.os, "scandir", lambda path: listed.append(path) or original(path)
+    )
+
+    plan = plan_folders(tmp_path, tree)
+
+    # The root and "a" exist; nothing below a missing folder is listed.
+    assert listed == [tmp_path, tmp_path / "a"]
+    names = [path.relative_to(tmp_path).as_posix() for path in plan.create]
+    assert sorted(names) == ["a/b", "a/b/c", "d", "d/e", "d/f"]
+    # Parents come before their children.
+    for index, name in enumerate(names):
+        parent = os.path.dirname(name)
+        assert parent not in names or names.index(parent) < index
+    leaves = sorted(path.relative_to(tmp_path).as_posix() for path in plan.leaves)
+    assert leaves == ["a/b/c", "d/e", "d/f"]
+    assert plan.conflicts == [tmp_path / "g"]
+
+    plan.apply()
+    assert all(path.is_dir() for path in plan.create)
+
+
+def test_check_folder_reports_branches_and_reuses_its_plan(tmp_path: Path) -> None:
+    root = tmp_path / "Documents"
+    root.mkdir()
+
+    result = check_folder(root, "Documents", ["files"], folders={"school": ["notes", "exams"]})
+
+    assert result["ok"] is False
+    assert result["issues"] == ["files", "school (+2 inside)"]
+    created = result["fix"]()
+    assert str(root / "school" / "exams") in created
+    assert check_folder(root, "Documents", ["files"], folders={"school": ["notes", "exams"]})["ok"]
+
+
+def test_check_folder_with_a_conflict_is_not_fixable(tmp_path: Path) -> None:
+    root = tmp_path / "Documents"
+    root.mkdir()
+    (root / "files").write_text("not a folder", encoding="utf-8")
+
+    result = check_folder(root, "Documents", ["files", "school"])
+
+    assert result["ok"] is False
+    assert result["fix"] is None
+    assert "files exists but is not a folder" in result["issues"]
+    assert "school" in result["issues"]
@@ -0,0 +1,128 @@
+import os
+import time
+from pathlib import Path
+from types import MappingProxyType
+
+from life_os.matcher import Allowlist
+from life_os.plan import compile_plan
+from life_os.rules import DAY, MB, Rule, RuleSet, compile_rule
+from life_os.spec import prepare_spec
+
+
+def _entries(path: Path) -> list[os.DirEntry]:
+    with os.scandir(path) as it:
+        return sorted(it, key=lambda entry: entry.name)
+
+
+def _age(path: Path, days: int) -> None:
+    stamp = time.time() - days * DAY
+    os.utime(path, (stamp, stamp))
+
+
+def test_rules_select_and_tag_in_one_pass(tmp_path: Path) -> None:
+    for name in ("old.dmg", "old.txt", "new.dmg", ".DS_Store"):
+        (tmp_path / name).write_bytes(b"x" * 10)
+    (tmp_path / "folder.dmg").mkdir()
+    for name in ("old.dmg", "old.txt", ".DS_Store", "folder.dmg"):
+        _age(tmp_path / name, 30)
+
+    rules = RuleSet(
+        [
+            Rule(older_than=7 * DAY),
+            Rule(extensions=frozenset({".dmg"}), select=False, tags={"group": "dmg"}),
+        ],
+        exclude=Allowlist([".DS_Store"]),
+    )
+    matches = rules.evaluate(_entries(tmp_path), lambda entry: 10)
+
+    assert [(match.path.name, match.tags) for match in matches] == [
+        ("folder.dmg", {}),
+        ("old.dmg", {"group": "dmg"}),
+        ("old.txt", {}),
+    ]
+    assert all(match.size == 10 and match.age >= 7 * DAY for match in matches)
+
+
+def test_cheap_predicates_run_before_sizes(tmp_path: Path) -> None:
+    for name in ("a.iso", "b.txt", "c.txt"):
+        (tmp_path / name).write_bytes(b"x")
+    measured: list[str] = []
+
+    def size_of(entry: os.DirEntry) -> int:
+        measured.append(entry.name)
+        return 2 * MB
+
+    rules = RuleSet(
+        [
+            Rule(extensions=frozenset({".iso"}), min_size=MB),
+            Rule(names=Allowlist(["b.txt"]), min_size=MB),
+        ]
+    )
+    matches = rules.evaluate(_entries(tmp_path), size_of, measure=False)
+
+    assert [match.path.name for match in matches] == ["a.iso", "b.txt"]
+    assert measured == ["a.iso", "b.txt"]
+
+
+def test_first_rule_to_set_a_tag_wins(tmp_path: Path) -> None:
+    (tmp_path / "a.zip").write_bytes(b"x")
+
+    rules = RuleSet(
+        [
+            Rule(tags=MappingProxyType({"classification": "might-need"})),
+            Rule(extensions=frozenset({".zip"}), select=False, tags={"classification": "trash"}),
+        ]
+    )
+
+    assert rules.evaluate(_entries(tmp_path), lambda entry: 1)[0].tags == {
+        "classification": "might-need"
+    }
+
+
+def test_compile_rule_reports_problems() -> None:
+    rule, errors = compile_rule(
+        {"globs": ["*.iso"], "ext": ".ISO", "older_than_days": 30, "set": {"group": "images"}},
+        "rule",
+    )
+    assert errors == []
+    assert rule.extensions == {".iso"}
+    assert rule.older_than == 30 * DAY
+    assert "x.iso" in rule.names
+
+    rule, errors = compile_rule({"type": "link", "min_size_mb": "big", "when": 1}, "rule")
+    assert rule is None
+    assert errors == [
+        "rule: unknown key 'when'",
+        "rule.type: expected file or dir, got 'link'",
+        "rule.min_size_mb: expected a non-negative number, got 'big'",
+    ]
+
+
+def test_spec_match_rules_come_before_built_in_ones(tmp_path: Path) -> None:
+    spec = {
+        "filesystem": {
+            "workspace": {"path": "~/Workspace"},
+            "system": {"path": "~/System"},
+            "documents": {"path": "~/Documents"},
+        },
+        "cleanup": {
+            "downloads": {
+                "rules": {"trash_extensions": [".iso"], "max_age_days": 7},
+                "match": [
+                    {"ext": [".iso"], "newer_than_days": 1, "set": {"classification": "keep"}}
+                ],
+            }
+        },
+    }
+    plan = compile_plan(prepare_spec(spec), tmp_path)
+    (tmp_path / "fresh.iso").write_bytes(b"x")
+    (tmp_path / "old.iso").write_bytes(b"x")
+    (tmp_path / "new.txt").write_bytes(b"x")
+    _age(tmp_path / "old.iso", 30)
+
+    matches = plan.cleanup.downloads.rules.evaluate(_entries(tmp_path), lambda entry: 1)
+
+    assert [(match.path.name, match.tags["classification"]) for match in matches] == [
+        ("fresh.iso", "keep"),
+        ("old.iso", "trash"),
+    ]
@@ -0,0 +1,192 @@
+import os
+from pathlib import Path
+
+from life_os.scan import estimate_tree, item_size, scan_top, scan_tree
+
+
+def _make_tree(root: Path) -> None:
+    (root / "a" / "b").mkdir(parents=True)
+    (root / "c").mkdir()
+    (root / "top.bin").write_bytes(b"x" * 100)
+    (root / "a" / "mid.bin").write_bytes(b"x" * 200)
+    (root / "a" / "b" / "big.bin").write_bytes(b"x" * 4000)
+    (root / "c" / "small.bin").write_bytes(b"x" * 10)
+
+
+def test_scan_tree_rolls_up_directory_sizes(tmp_path: Path) -> None:
+    _make_tree(tmp_path)
+
+    result = scan_tree(tmp_path, keep_dir_sizes=True)
+
+    assert result.size == 4310
+    assert result.files == 4
+    assert result.dirs == 4
+    assert result.dir_sizes[tmp_path / "a"] == 4200
+    assert result.dir_sizes[tmp_path / "a" / "b"] == 4000
+    assert result.dir_sizes[tmp_path / "c"] == 10
+    assert item_size(tmp_path / "a") == 4200
+    assert item_size(tmp_path / "top.bin") == 100
+
+
+def test_scan_tree_collects_large_files_and_folders(tmp_path: Path) -> None:
+    _make_tree(tmp_path)
+
+    result = scan_tree(tmp_path, threshold=4000)
+    found = {(kind, path) for _, kind, path in result.large}
+
+    assert found == {
+        ("file", tmp_path / "a" / "b" / "big.bin"),
+        ("folder", tmp_path / "a" / "b"),
+        ("folder", tmp_path / "a"),
+        ("folder", tmp_path),
+    }
+
+
+def test_parallel_scan_matches_serial(tmp_path: Path) -> None:
+    for i in range(6):
+        for j in range(5):
+            folder = tmp_path / f"d{i}" / f"e{j}" / "f"
+            folder.mkdir(parents=True)
+            (folder / "data.bin").write_bytes(b"x" * (i * 100 + j * 10 + 1))
+            (folder.parent / "side.bin").write_bytes(b"x" * (j + 1))
+    _make_tree(tmp_path)
+
+    serial = scan_tree(tmp_path, threshold=300, keep_dir_sizes=True)
+    parallel = scan_tree(tmp_path, threshold=300, keep_dir_sizes=True, jobs=4)
+
+    assert parallel.size == serial.size
+    assert parallel.files == serial.files
+    assert parallel.dirs == serial.dirs
+    assert parallel.dir_sizes == serial.dir_sizes
+    assert sorted(parallel.large) == sorted(serial.large)
+
+
+def test_scan_top_keeps_only_the_largest_items(tmp_path: Path) -> None:
+    _make_tree(tmp_path)
+
+    full = scan_tree(tmp_path, threshold=100)
+    expected = sorted(full.large, key=lambda item: (-item[0], str(item[2])))[:2]
+
+    assert scan_top(tmp_path, threshold=100, top_n=2) == expected
+
+
+def test_scan_top_collapses_folders_dominated_by_one_child(tmp_path: Path) -> None:
+    _make_tree(tmp_path)
+
+    items = scan_top(tmp_path, threshold=1000, top_n=10, collapse_ratio=0.9)
+
+    # a/b and a are ~all big.bin, the root is ~all of a: only the file remains.
+    assert items == [(4000, "file", tmp_path / "a" / "b" / "big.bin")]
+
+
+def test_scan_tree_counts_hard_links_once(tmp_path: Path) -> None:
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    (tmp_path / "a" / "data.bin").write_bytes(b"x" * 5000)
+    os.link(tmp_path / "a" / "data.bin", tmp_path / "b" / "data.bin")
+
+    serial = scan_tree(tmp_path)
+    parallel = scan_tree(tmp_path, jobs=3)
+
+    assert serial.size == parallel.size == 5000
+    assert serial.files == parallel.files == 1
+
+
+def test_scan_tree_reports_allocated_bytes_of_sparse_files(tmp_path: Path) -> None:
+    with open(tmp_path / "sparse.img", "wb") as handle:
+        handle.truncate(64 * 1024 * 1024)
+
+    result = scan_tree(tmp_path)
+
+    assert result.size == 64 * 1024 * 1024
+    assert result.allocated is not None
+    assert result.allocated < result.size
+    assert result.device == os.lstat(tmp_path).st_dev
+    assert result.mounts == []
+
+
+def test_scan_tree_never_opens_pruned_folders(tmp_path: Path, monkeypatch) -> None:
+    from life_os import scan
+    from life_os.index import SizeIndex
+    from life_os.matcher import compile_prune
+
+    root = tmp_path / "root"
+    (root / "app" / "node_modules" / "dep").mkdir(parents=True)
+    (root / "app" / "node_modules" / "dep" / "index.js").write_bytes(b"x" * 700)
+    (root / "app" / "main.py").write_bytes(b"x" * 30)
+    for path in (root / "app" / "node_modules" / "dep", root / "app" / "node_modules"):
+        os.utime(path, (1_600_000_000, 1_600_000_000))
+    os.utime(root / "app", (1_600_000_000, 1_600_000_000))
+    os.utime(root, (1_600_000_000, 1_600_000_000))
+    index = SizeIndex(tmp_path / "index.sqlite")
+    assert scan_tree(root, index=index).size == 730
+    index.close()
+
+    opened = []
+    original = scan._read_dir
+    monkeypatch.setattr(
+        scan, "_read_dir", lambda path, *args: opened.append(path) or original(path, *args)
+    )
+    prune, _ = compile_prune({"names": ["node_modules"]})
+    index = SizeIndex(tmp_path / "index.sqlite")
+    result = scan_tree(root, index=index, prune=prune, estimate_pruned=True)
+    index.close()
+
+    assert result.size == 30
+    assert result.pruned == 1
+    assert result.pruned_size == 700
+    assert not any("node_modules" in path for path in opened)
+    # The pruned folder's record survives so the estimate is there next time.
+    index = SizeIndex(tmp_path / "index.sqlite")
+    assert os.fspath(root / "app" / "node_modules") in index.records
+    index.close()
+
+
+class _Clock:
+    # Stands in for the time module: each monotonic() call advances by one.
+    def __init__(self):
+        self.now = 0
+
+    def monotonic(self) -> float:
+        self.now += 1
+        return self.now
+
+
+def _make_wide_tree(root: Path, folders: int = 40) -> None:
+    for number in range(folders):
+        folder = root / f"f{number:02d}"
+        folder.mkdir(parents=True)
+        (folder / "data.bin").write_bytes(b"x" * (1000 + number % 5))
+
+
+def test_estimate_tree_is_exact_when_it_finishes(tmp_path: Path) -> None:
+    _make_tree(tmp_path)
+
+    estimate = estimate_tree(tmp_path, deadline=float("inf"))
+
+    assert estimate.exact
+    assert estimate.size == estimate.low == estimate.high == scan_tree(tmp_path).size
+
+
+def test_estimate_tree_extrapolates_unvisited_folders(tmp_path: Path, monkeypatch) -> None:
+    from life_os import scan
+
+    _make_wide_tree(tmp_path)
+    exact = scan_tree(tmp_path).size
+    monkeypatch.setattr(scan, "time", _Clock())
+
+    estimate = estimate_tree(tmp_path, deadline=30, seed=7)
+
+    assert not estimate.exact and not estimate.stopped
+    assert estimate.unvisited > 0
+    assert estimate.low <= exact <= estimate.high
+    assert abs(estimate.size - exact) < exact * 0.05
+
+
+def test_estimate_tree_stops_once_over_the_limit(tmp_path: Path) -> None:
+    _make_wide_tree(tmp_path)
+
+    estimate = estimate_tree(tmp_path, deadline=float("inf"), stop_over=5000, seed=1)
+
+    assert estimate.stopped
+    assert 5000 <= estimate.low < scan_tree(tmp_path).size
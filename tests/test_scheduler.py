@@ -0,0 +1,50 @@
+import threading
+import time
+
+from commands._scheduler import run_checks
+
+
+def _ok(_context) -> dict:
+    return {"ok": True, "issues": [], "fix": None, "notes": []}
+
+
+def test_run_checks_keeps_declared_order_and_runs_concurrently() -> None:
+    release = threading.Event()
+
+    def slow(_context):
+        release.wait(5)
+        return _ok(_context)
+
+    def fast(_context):
+        release.set()
+        return _ok(_context)
+
+    # "slow" can only finish once "fast" has run, so a serial runner would hang.
+    results = list(run_checks([("slow", slow), ("fast", fast)], None, {"slow": 5}))
+
+    assert [name for name, _ in results] == ["slow", "fast"]
+    assert all(result["ok"] for _, result in results)
+
+
+def test_run_checks_times_out_individual_checks() -> None:
+    def stuck(_context):
+        time.sleep(5)
+        return _ok(_context)
+
+    def broken(_context):
+        raise OSError("boom")
+
+    started = time.monotonic()
+    results = dict(
+        run_checks(
+            [("stuck", stuck), ("broken", broken), ("fine", _ok)],
+            None,
+            {"stuck": 0.1},
+        )
+    )
+
+    assert time.monotonic() - started < 2
+    assert results["stuck"]["ok"] is False
+    assert "Timed out" in results["stuck"]["issues"][0]
+    assert "boom" in results["broken"]["issues"][0]
+    assert results["fine"]["ok"] is True
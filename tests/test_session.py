@@ -0,0 +1,82 @@
+from pathlib import Path
+
+import life_os.scan as scan
+from life_os.session import ScanSession
+
+
+def _make_tree(root: Path) -> None:
+    for name, size in (("a", 3 * 1024 * 1024), ("b", 2 * 1024 * 1024)):
+        folder = root / name / "inner"
+        folder.mkdir(parents=True)
+        (folder / "data.bin").write_bytes(b"x" * size)
+        (root / name / "note.txt").write_bytes(b"x" * 10)
+
+
+def test_session_reuses_nested_subtrees(tmp_path: Path, monkeypatch) -> None:
+    _make_tree(tmp_path)
+    session = ScanSession()
+
+    assert session.item_size(tmp_path / "a") == 3 * 1024 * 1024 + 10
+
+    reads: list[str] = []
+    original = scan._read_dir
+
+    def counting(path, *args, **kwargs):
+        reads.append(path)
+        return original(path, *args, **kwargs)
+
+    monkeypatch.setattr(scan, "_read_dir", counting)
+    result = session.scan_tree(tmp_path, threshold=1024 * 1024)
+
+    assert str(tmp_path / "a") not in reads
+    assert str(tmp_path / "a" / "inner") not in reads
+    assert result.size == 5 * 1024 * 1024 + 20
+    found = {(kind, path) for _, kind, path in result.large}
+    assert ("file", tmp_path / "a" / "inner" / "data.bin") in found
+    assert ("folder", tmp_path / "b" / "inner") in found
+
+    # Sizing a folder inside the scanned root is answered without reading it.
+    reads.clear()
+    assert session.item_size(tmp_path / "b") == 2 * 1024 * 1024 + 10
+    assert reads == []
+
+
+def test_session_forget_corrects_enclosing_scan(tmp_path: Path) -> None:
+    _make_tree(tmp_path)
+    session = ScanSession()
+    session.scan_tree(tmp_path, threshold=1024 * 1024)
+
+    session.forget(tmp_path / "a", 3 * 1024 * 1024 + 10)
+    result = session.scan_tree(tmp_path, threshold=1024 * 1024)
+
+    assert result.size == 2 * 1024 * 1024 + 10
+    assert all("/a/" not in str(path) and path != tmp_path / "a" for _, _, path in result.large)
+
+
+def test_session_keeps_trees_per_filesystem_setting(tmp_path: Path, monkeypatch) -> None:
+    # A walk that crossed mount points must not answer for one that stops at
+    # them (and the other way round), even for folders inside it.
+    _make_tree(tmp_path)
+    session = ScanSession()
+    crossing = session.scan_tree(tmp_path, threshold=1024 * 1024, one_filesystem=False)
+
+    reads: list[str] = []
+    original = scan._read_dir
+
+    def counting(path, *args, **kwargs):
+        reads.append(path)
+        return original(path, *args, **kwargs)
+
+    monkeypatch.setattr(scan, "_read_dir", counting)
+    assert session.item_size(tmp_path / "a", one_filesystem=True) == 3 * 1024 * 1024 + 10
+    assert str(tmp_path / "a") in reads
+
+    reads.clear()
+    staying = session.scan_tree(tmp_path, threshold=1024 * 1024, one_filesystem=True)
+    assert staying.size == crossing.size
+    assert str(tmp_path / "b") in reads and str(tmp_path / "a") not in reads
+
+    reads.clear()
+    session.scan_tree(tmp_path, threshold=1024 * 1024, one_filesystem=False)
+    session.item_size(tmp_path / "b", one_filesystem=False)
+    assert reads == []
@@ -0,0 +1,60 @@
+import os
+from pathlib import Path
+
+import life_os.spec as spec_module
+from life_os.spec import SPEC_CACHE_ENTRIES, _cache_file, load_spec
+
+
+def test_spec_cache_skips_yaml_until_spec_changes(tmp_path: Path, monkeypatch) -> None:
+    spec_path = tmp_path / "spec.yaml"
+    spec_path.write_text(
+        "\n".join(
+            [
+                "hygiene:",
+                "  desktop:",
+                "    allowlist:",
+                "      names: [.DS_Store]",
+                "      patterns: ['^_Inbox$', '([bad']",
+            ]
+        ),
+        encoding="utf-8",
+    )
+    cache_dir = tmp_path / "cache"
+
+    first = load_spec(spec_path, cache_dir=cache_dir)
+    assert "_Inbox" in first.allowlists[("hygiene", "desktop")]
+    assert len(first.errors) == 1
+
+    parses: list[Path] = []
+    original = spec_module.parse_spec
+
+    def counting(path):
+        parses.append(path)
+        return original(path)
+
+    monkeypatch.setattr(spec_module, "parse_spec", counting)
+    cached = load_spec(spec_path, cache_dir=cache_dir)
+    assert parses == []
+    assert cached.spec == first.spec
+    assert "_Inbox" in cached.allowlists[("hygiene", "desktop")]
+    assert cached.errors == first.errors
+
+    spec_path.write_text("hygiene: {}\n", encoding="utf-8")
+    st = spec_path.stat()
+    os.utime(spec_path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    assert load_spec(spec_path, cache_dir=cache_dir).spec == {"hygiene": {}}
+    assert len(parses) == 1
+
+    assert load_spec(spec_path).spec == {"hygiene": {}}
+    assert len(parses) == 2
+
+
+def test_spec_cache_keeps_a_bounded_number_of_entries(tmp_path: Path) -> None:
+    cache_dir = tmp_path / "cache"
+    for number in range(SPEC_CACHE_ENTRIES + 3):
+        spec_path = tmp_path / f"spec{number}.yaml"
+        spec_path.write_text("hygiene: {}\n", encoding="utf-8")
+        load_spec(spec_path, cache_dir=cache_dir)
+
+    assert len(list(cache_dir.glob("spec-*.pickle"))) == SPEC_CACHE_ENTRIES
+    assert _cache_file(cache_dir, spec_path.resolve()).exists()
@@ -0,0 +1,44 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Import time `main.py --help` may add on top of a bare interpreter.
+IMPORT_BUDGET_MS = float(os.environ.get("LIFE_OS_IMPORT_BUDGET_MS", "60"))
+
+# Modules that only the commands themselves may pull in.
+DEFERRED = {"rich", "yaml", "questionary", "sqlite3", "life_os.context", "commands"}
+
+
+def _import_times(*args: str) -> list[tuple[str, int, bool]]:
+    # (module, cumulative microseconds, imported at top level) for every
+    # import reported by `python -X importtime ...`.
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        rows.append((name.strip(), int(cumulative), not name.startswith("  ")))
+    return rows
+
+
+def test_help_does_not_import_commands() -> None:
+    imported = {name for name, _, _ in _import_times("main.py", "--help")}
+    assert not {name for name in imported if name.split(".")[0] in DEFERRED or name in DEFERRED}
+
+
+def test_help_import_time_budget() -> None:
+    baseline = {name for name, _, _ in _import_times("-c", "pass")}
+    startup = _import_times("main.py", "--help")
+    added = sum(us for name, us, top in startup if top and name not in baseline) / 1000
+    assert added <= IMPORT_BUDGET_MS, f"--help imports take {added:.1f} ms (budget {IMPORT_BUDGET_MS} ms)"
@@ -0,0 +1,99 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from commands._trash import TrashJournal, commit_to_trash, undo_batch
+
+
+def test_commit_names_collisions_and_undo_restores(tmp_path: Path) -> None:
+    trash = tmp_path / ".Trash"
+    trash.mkdir()
+    (trash / "report.pdf").write_text("older")
+    sources = []
+    for folder in ("a", "b", "c"):
+        (tmp_path / folder).mkdir()
+        path = tmp_path / folder / "report.pdf"
+        path.write_text(folder)
+        sources.append(path)
+    journal = TrashJournal(tmp_path / "journal.jsonl")
+
+    moved = commit_to_trash(sources + [tmp_path / "missing"], trash, journal=journal, batch_id="b1")
+
+    assert moved == sources
+    assert len(list(trash.iterdir())) == 4
+    assert (trash / "report.pdf").read_text() == "older"
+    assert journal.last_batch() == "b1"
+
+    (tmp_path / "b" / "report.pdf").write_text("new")
+    restored, skipped = undo_batch(journal, "b1")
+
+    assert sorted(restored) == [sources[0], sources[2]]
+    assert skipped == [sources[1]]
+    assert sources[0].read_text() == "a"
+    # The skipped item keeps the batch open so undo can be retried.
+    assert journal.last_batch() == "b1"
+    assert [record["from"] for record in journal.batch("b1")] == [str(sources[1])]
+
+    (tmp_path / "b" / "report.pdf").unlink()
+    restored, skipped = undo_batch(journal, "b1")
+
+    assert restored == [sources[1]] and skipped == []
+    assert journal.last_batch() is None
+
+
+def test_batch_is_journaled_before_renames(tmp_path: Path, monkeypatch) -> None:
+    trash = tmp_path / ".Trash"
+    source = tmp_path / "a.txt"
+    source.write_text("a")
+    journal = TrashJournal(tmp_path / "journal.jsonl")
+    real_rename = os.rename
+
+    def killed(src, dst):
+        # Moves the file, then dies before the batch is finished.
+        real_rename(src, dst)
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(os, "rename", killed)
+    with pytest.raises(KeyboardInterrupt):
+        commit_to_trash([source], trash, journal=journal, batch_id="b1", jobs=1)
+    monkeypatch.undo()
+
+    assert not source.exists()
+    restored, skipped = undo_batch(journal, "b1")
+    assert restored == [source] and skipped == []
+    assert source.read_text() == "a"
+
+
+def test_unwritable_journal_moves_nothing(tmp_path: Path) -> None:
+    source = tmp_path / "a.txt"
+    source.write_text("a")
+    journal = TrashJournal(tmp_path / "missing-dir" / "journal.jsonl")
+
+    with pytest.raises(OSError):
+        commit_to_trash([source], tmp_path / ".Trash", journal=journal)
+
+    assert source.exists()
+
+
+def test_rename_never_replaces_a_name_taken_meanwhile(tmp_path: Path, monkeypatch) -> None:
+    trash = tmp_path / ".Trash"
+    trash.mkdir()
+    source = tmp_path / "a.txt"
+    source.write_text("mine")
+    real_listdir = os.listdir
+
+    def stale_listing(path):
+        names = real_listdir(path)
+        # Someone else drops a file in right after the listing.
+        (trash / "a.txt").write_text("theirs")
+        return names
+
+    monkeypatch.setattr(os, "listdir", stale_listing)
+    journal = TrashJournal(tmp_path / "journal.jsonl")
+    moved = commit_to_trash([source], trash, journal=journal, batch_id="b1")
+
+    assert moved == []
+    assert (trash / "a.txt").read_text() == "theirs"
+    assert source.read_text() == "mine"
+    assert journal.last_batch() is None
@@ -0,0 +1,37 @@
+from pathlib import Path
+
+from life_os.scan import scan_tree
+from life_os.tree import FLAG_FILE, CompactTree
+
+
+def test_compact_tree_matches_dict_scan(tmp_path: Path) -> None:
+    for name in ("a", "b"):
+        inner = tmp_path / name / "node_modules"
+        inner.mkdir(parents=True)
+        (inner / "pkg.bin").write_bytes(b"x" * 300)
+        (tmp_path / name / "small.txt").write_bytes(b"x" * 5)
+
+    plain = scan_tree(tmp_path, threshold=300, keep_dir_sizes=True)
+    tree = CompactTree(tmp_path)
+    compact = scan_tree(tmp_path, threshold=300, tree=tree, jobs=2)
+
+    assert compact.size == plain.size
+    assert sorted(tree.items_over(0, 300)) == sorted(plain.large)
+    for path, size in plain.dir_sizes.items():
+        assert tree.size[tree.find(path)] == size
+    # Repeated names share one pool entry.
+    assert tree.names.count("node_modules") == 1
+
+
+def test_compact_tree_detach_shrinks_ancestors(tmp_path: Path) -> None:
+    tree = CompactTree(tmp_path)
+    folder = tree.add(0, "a", size=100)
+    tree.add(folder, "big.bin", size=60, flags=FLAG_FILE)
+    tree.size[0] = 150
+
+    tree.detach(tree.find(tmp_path / "a" / "big.bin"))
+
+    assert tree.size[folder] == 40
+    assert tree.size[0] == 90
+    assert tree.find(tmp_path / "a" / "big.bin") is None
+    assert tree.path(folder) == tmp_path / "a"
@@ -0,0 +1,134 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+from commands._inotify import IN_CREATE, IN_DELETE, IN_Q_OVERFLOW
+from commands._watch import WatchModel
+from life_os.matcher import Allowlist
+from life_os.session import ScanSession
+from life_os.watchstate import load_watch_state, write_watch_state
+
+
+class FakeInotify:
+    def __init__(self):
+        self.next_wd = 1
+        self.watches: dict[int, str] = {}
+
+    def add_watch(self, path: str) -> int:
+        wd = self.next_wd
+        self.next_wd += 1
+        self.watches[wd] = path
+        return wd
+
+    def rm_watch(self, wd: int) -> None:
+        self.watches.pop(wd, None)
+
+    def wd_for(self, path: Path) -> int:
+        return next(wd for wd, watched in self.watches.items() if watched == str(path))
+
+
+def _model(root: Path) -> tuple[WatchModel, FakeInotify]:
+    inotify = FakeInotify()
+    model = WatchModel(inotify, floor=1024)
+    model.add_root(str(root), listing=True)
+    model.start()
+    return model, inotify
+
+
+def test_watch_model_applies_events(tmp_path: Path) -> None:
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "big.bin").write_bytes(b"x" * 2048)
+    (tmp_path / "small.txt").write_bytes(b"x" * 10)
+    model, inotify = _model(tmp_path)
+
+    state = model.snapshot()[str(tmp_path)]
+    assert state["size"] == 2058
+    assert [2048, "file", str(tmp_path / "sub" / "big.bin")] in state["large"]
+
+    (tmp_path / "sub" / "more.bin").write_bytes(b"x" * 100)
+    (tmp_path / "small.txt").unlink()
+    model.apply(
+        [
+            (inotify.wd_for(tmp_path / "sub"), IN_CREATE, "more.bin"),
+            (inotify.wd_for(tmp_path), IN_DELETE, "small.txt"),
+        ]
+    )
+    state = model.snapshot()[str(tmp_path)]
+    assert state["size"] == 2148
+    assert {entry[0]: entry[2] for entry in state["entries"]} == {"sub": 2148}
+
+
+def test_watch_model_rescans_on_overflow(tmp_path: Path) -> None:
+    model, _ = _model(tmp_path)
+    (tmp_path / "late.bin").write_bytes(b"x" * 50)
+
+    model.apply([(-1, IN_Q_OVERFLOW, "")])
+
+    assert model.snapshot()[str(tmp_path)]["size"] == 50
+
+
+def test_session_reads_fresh_watch_state(tmp_path: Path) -> None:
+    (tmp_path / "folder").mkdir()
+    (tmp_path / "folder" / "data.bin").write_bytes(b"x" * 4096)
+    model, _ = _model(tmp_path)
+    state_path = tmp_path / "state.json"
+    write_watch_state(state_path, model.snapshot())
+
+    watch = load_watch_state(state_path)
+    assert watch is not None
+    session = ScanSession(watch=watch)
+    os.remove(tmp_path / "folder" / "data.bin")
+
+    # Answers come from the state file, not the disk.
+    assert session.item_size(tmp_path / "folder") == 4096
+    found = {(kind, path) for _, kind, path in session.scan_tree(tmp_path, threshold=2048).large}
+    assert ("file", tmp_path / "folder" / "data.bin") in found
+    # Below the daemon's floor the state cannot answer; scan the disk.
+    assert session.scan_tree(tmp_path / "folder", threshold=100).size == 0
+
+    session.forget(tmp_path / "folder", 4096)
+    assert session.item_size(tmp_path / "folder") == 0
+
+    assert load_watch_state(state_path, max_age=-1) is None
+
+
+def test_session_walks_where_watch_sizes_would_differ(tmp_path: Path) -> None:
+    # The daemon counts both links of a file and looks inside every folder;
+    # a walk that deduplicates links or prunes must not take its numbers.
+    linked = tmp_path / "linked"
+    linked.mkdir()
+    (linked / "a.bin").write_bytes(b"x" * 100)
+    os.link(linked / "a.bin", linked / "b.bin")
+    modules = tmp_path / "app" / "node_modules"
+    modules.mkdir(parents=True)
+    (modules / "dep.bin").write_bytes(b"x" * 50)
+    watches = {}
+    for root in (linked, tmp_path / "app"):
+        model, _ = _model(root)
+        watches.update(model.snapshot())
+    state_path = tmp_path / "state.json"
+    write_watch_state(state_path, watches)
+    session = ScanSession(watch=load_watch_state(state_path))
+    session.prune = Allowlist(names=["node_modules"])
+
+    assert watches[str(linked)]["size"] == 200
+    assert session.item_size(linked) == 100
+    assert session.item_size(tmp_path / "app") == 50
+    assert session.scan_tree(tmp_path / "app", prune=True).size == 0
+    assert session.item_size(tmp_path / "app", prune=True) == 0
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux only")
+def test_inotify_reports_created_files(tmp_path: Path) -> None:
+    from commands._inotify import Inotify
+
+    inotify = Inotify()
+    try:
+        wd = inotify.add_watch(str(tmp_path))
+        (tmp_path / "new.txt").write_text("x")
+        events = inotify.read_events(timeout=1)
+    finally:
+        inotify.close()
+    assert any(event[0] == wd and event[1] & IN_CREATE and event[2] == "new.txt" for event in events)